@@ -1,6 +1,6 @@
 from .version import __version__
 from .csv_model import CSVModel
-from .dual_quaternion import DualQuaternion
+from .dual_quaternion import DualQuaternion, DualQuaternionArray
 from .experiment_logger import ExperimentLogger
 from .json_serialization import dump, load
 from .points import BagOfPoints, BagOfVectors, Point, Direction, Plane3D
@@ -13,7 +13,12 @@ from .points import (
     PointNormalCloud,
 )
 from .primitives import Box, Contour
-from .rigid_transformations import RigidTransform, SimilarityTransform
+from .rigid_transformations import (
+    RigidTransform,
+    RigidTransformArray,
+    SimilarityTransform,
+)
+from .frame_graph import FrameGraph
 from .utils import (
     gen_experiment_id,
     histogram,
@@ -67,6 +72,11 @@ from .feature_matcher import (
     RawDistanceFeatureMatcher,
     PointToPlaneFeatureMatcher,
 )
+from .feature_index import (
+    FeatureIndex,
+    BruteForceFeatureIndex,
+    IVFFeatureIndex,
+)
 from .image import (
     Image,
     ColorImage,
@@ -79,6 +89,7 @@ from .image import (
     BinaryImage,
     PointCloudImage,
     NormalCloudImage,
+    ImageAccumulator,
 )
 from .chessboard_registration import (
     ChessboardRegistrationResult,
@@ -97,4 +108,4 @@ from .detector import (
     PointCloudBoxDetector,
     RgbdDetectorFactory,
 )
-from .camera_intrinsics import CameraIntrinsics
+from .camera_intrinsics import CameraIntrinsics, MultiCameraProjector
@@ -3,6 +3,7 @@ Encapsulates camera intrinsic parameters for projecting / deprojecting points
 Author: Jeff Mahler
 """
 import copy
+import cv2
 import numpy as np
 import json
 import os
@@ -27,6 +28,7 @@ class CameraIntrinsics(object):
         skew=0.0,
         height=None,
         width=None,
+        dist_coeffs=None,
     ):
         """Initialize a CameraIntrinsics model.
 
@@ -48,6 +50,15 @@ class CameraIntrinsics(object):
             The height of the camera image in pixels.
         width : float
             The width of the camera image in pixels
+        dist_coeffs : :obj:`numpy.ndarray`
+            The lens distortion coefficients (k1, k2, p1, p2[, k3[, k4, k5,
+            k6]]) of the OpenCV radial-tangential model. None or all zeros
+            means the camera has no distortion.
+
+        Raises
+        ------
+        ValueError
+            If the number of distortion coefficients is not 4, 5 or 8.
         """
         self._frame = frame
         self._fx = float(fx)
@@ -67,6 +78,27 @@ class CameraIntrinsics(object):
             ]
         )
 
+        # set lens distortion
+        self._dist_coeffs = None
+        if dist_coeffs is not None:
+            dist_coeffs = np.array(dist_coeffs, dtype=np.float64).ravel()
+            if dist_coeffs.shape[0] not in (4, 5, 8):
+                raise ValueError(
+                    "Must provide 4, 5 or 8 distortion coefficients, got %d"
+                    % (dist_coeffs.shape[0])
+                )
+            if np.any(dist_coeffs != 0):
+                self._dist_coeffs = dist_coeffs
+
+        self._clear_cache()
+
+    def _clear_cache(self):
+        """Clears the deprojection rays and undistortion maps, which are
+        cached per image shape.
+        """
+        self._rays = {}
+        self._undistort_maps = {}
+
     @property
     def frame(self):
         """:obj:`str` : The frame of reference for the point cloud."""
@@ -97,6 +129,7 @@ class CameraIntrinsics(object):
                 [0, 0, 1],
             ]
         )
+        self._clear_cache()
 
     @property
     def cy(self):
@@ -113,6 +146,7 @@ class CameraIntrinsics(object):
                 [0, 0, 1],
             ]
         )
+        self._clear_cache()
 
     @property
     def skew(self):
@@ -129,6 +163,18 @@ class CameraIntrinsics(object):
         """float : The width of the camera image in pixels"""
         return self._width
 
+    @property
+    def dist_coeffs(self):
+        """:obj:`numpy.ndarray` : The lens distortion coefficients, or None
+        if the camera has no distortion.
+        """
+        return self._dist_coeffs
+
+    @property
+    def is_distorted(self):
+        """bool : True if the camera has lens distortion."""
+        return self._dist_coeffs is not None
+
     @property
     def proj_matrix(self):
         """:obj:`numpy.ndarray` : The 3x3 projection matrix for this camera."""
@@ -174,6 +220,10 @@ class CameraIntrinsics(object):
         msg.width = self._width
         msg.distortion_model = "plumb_bob"
         msg.D = [0.0, 0.0, 0.0, 0.0, 0.0]
+        if self.is_distorted:
+            msg.D = self._dist_coeffs.tolist()
+            if len(msg.D) == 8:
+                msg.distortion_model = "rational_polynomial"
         msg.K = [
             self._fx,
             0.0,
@@ -249,6 +299,7 @@ class CameraIntrinsics(object):
             cy=cy,
             height=height,
             width=width,
+            dist_coeffs=self._dist_coeffs,
         )
         return cropped_intrinsics
 
@@ -287,11 +338,13 @@ class CameraIntrinsics(object):
             cy=cy,
             height=height,
             width=width,
+            dist_coeffs=self._dist_coeffs,
         )
         return scaled_intrinsics
 
     def project(self, point_cloud, round_px=True):
-        """Projects a point cloud onto the camera image plane.
+        """Projects a point cloud onto the camera image plane, applying the
+        lens distortion of the camera if it has any.
 
         Parameters
         ----------
@@ -332,6 +385,8 @@ class CameraIntrinsics(object):
             points_proj = points_proj[:, np.newaxis]
         point_depths = np.tile(points_proj[2, :], [3, 1])
         points_proj = np.divide(points_proj, point_depths)
+        if self.is_distorted:
+            points_proj[:2, :] = self._distort_pixels(points_proj[:2, :])
         if round_px:
             points_proj = np.round(points_proj)
 
@@ -343,10 +398,20 @@ class CameraIntrinsics(object):
             data=points_proj[:2, :].astype(np.int16), frame=self._frame
         )
 
-    def project_to_image(self, point_cloud, round_px=True):
+    def project_to_image(
+        self,
+        point_cloud,
+        round_px=True,
+        splat_radius=0,
+        dtype=np.float64,
+        return_indices=False,
+    ):
         """Projects a point cloud onto the camera image plane and creates
         a depth image. Zero depth means no point projected into the camera
-        at that pixel location (i.e. infinite depth).
+        at that pixel location (i.e. infinite depth). When several points
+        project onto the same pixel, the nearest one is kept. Points with
+        nonpositive depth are ignored. The lens distortion of the camera is
+        applied if it has any.
 
         Parameters
         ----------
@@ -355,13 +420,29 @@ class CameraIntrinsics(object):
             A PointCloud or Point to project onto the camera image plane.
 
         round_px : bool
-            If True, projections are rounded to the nearest pixel.
+            If True, projections are rounded to the nearest pixel. Otherwise
+            they are truncated to the pixel that contains them.
+
+        splat_radius : int
+            Each point fills the square of pixels within this many pixels
+            of its projection, which closes holes when rendering sparse
+            clouds.
+
+        dtype : :obj:`numpy.dtype`
+            Float type of the depth image.
+
+        return_indices : bool
+            If True, also returns the index of the point that filled each
+            pixel.
 
         Returns
         -------
         :obj:`DepthImage`
             A DepthImage generated from projecting the point cloud into the
             camera.
+        :obj:`numpy.ndarray`
+            HxW array of the index of the point that filled each pixel, or
+            -1 for empty pixels. Only returned if return_indices is True.
 
         Raises
         ------
@@ -385,26 +466,74 @@ class CameraIntrinsics(object):
         if len(points_proj.shape) == 1:
             points_proj = points_proj[:, np.newaxis]
         point_depths = points_proj[2, :]
-        point_z = np.tile(point_depths, [3, 1])
-        points_proj = np.divide(points_proj, point_z)
-        if round_px:
-            points_proj = np.round(points_proj)
-        points_proj = points_proj[:2, :].astype(np.int16)
-
-        valid_ind = np.where(
-            (points_proj[0, :] >= 0)
-            & (points_proj[1, :] >= 0)
-            & (points_proj[0, :] < self.width)
-            & (points_proj[1, :] < self.height)
-        )[0]
-
-        depth_data = np.zeros([self.height, self.width])
-        depth_data[
-            points_proj[1, valid_ind], points_proj[0, valid_ind]
-        ] = point_depths[valid_ind]
-        return DepthImage(depth_data, frame=self.frame)
-
-    def deproject(self, depth_image):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pixels = points_proj[:2, :] / point_depths
+        if self.is_distorted:
+            pixels = self._distort_pixels(pixels)
+
+        depth_data, index_data = _render_depth(
+            pixels,
+            point_depths,
+            self.height,
+            self.width,
+            round_px=round_px,
+            splat_radius=splat_radius,
+            dtype=dtype,
+            return_indices=return_indices,
+        )
+        depth_im = DepthImage(depth_data, frame=self.frame)
+        if return_indices:
+            return depth_im, index_data
+        return depth_im
+
+    def deprojection_rays(self, height=None, width=None, dtype=np.float64):
+        """Returns the ray through each pixel of an image from this camera,
+        scaled to unit depth. Deprojecting a depth image is a multiplication
+        of these rays by the depth at each pixel. For a camera with lens
+        distortion the rays are undistorted, so raw depth images can be
+        deprojected directly. Rays are cached per image shape and dtype, so
+        repeated calls are free.
+
+        Parameters
+        ----------
+        height : int
+            The height of the image in pixels. Defaults to the camera height.
+
+        width : int
+            The width of the image in pixels. Defaults to the camera width.
+
+        dtype : :obj:`numpy.dtype`
+            The data type of the rays.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            A read-only 3xHxW array of rays, where rays[:, i, j] is the point
+            at unit depth that projects onto pixel (i, j).
+        """
+        if height is None:
+            height = self._height
+        if width is None:
+            width = self._width
+        key = (int(height), int(width), np.dtype(dtype))
+        rays = self._rays.get(key)
+        if rays is None:
+            K_inv = np.linalg.inv(self._K)
+            rows = np.arange(key[0])[:, np.newaxis]
+            cols = np.arange(key[1])
+            rays = np.empty((3, key[0], key[1]), dtype=dtype)
+            rays[0] = K_inv[0, 0] * cols + K_inv[0, 1] * rows + K_inv[0, 2]
+            rays[1] = K_inv[1, 1] * rows + K_inv[1, 2]
+            rays[2] = 1.0
+            if self.is_distorted:
+                rays[:2] = self._undistort_normalized(
+                    rays[:2].reshape(2, -1).astype(np.float64)
+                ).reshape(2, key[0], key[1])
+            rays.flags.writeable = False
+            self._rays[key] = rays
+        return rays
+
+    def deproject(self, depth_image, dtype=np.float64, nonzero_only=False):
         """Deprojects a DepthImage into a PointCloud.
 
         Parameters
@@ -412,6 +541,14 @@ class CameraIntrinsics(object):
         depth_image : :obj:`DepthImage`
             The 2D depth image to projet into a point cloud.
 
+        dtype : :obj:`numpy.dtype`
+            The data type of the point cloud, e.g. np.float32 to halve the
+            memory and time needed for large images.
+
+        nonzero_only : bool
+            If True, only pixels with nonzero depth are deprojected, in
+            row-major order. Otherwise the cloud has one point per pixel.
+
         Returns
         -------
         :obj:`autolab_core.PointCloud`
@@ -432,19 +569,19 @@ class CameraIntrinsics(object):
                 % (depth_image.frame, self._frame)
             )
 
-        # create homogeneous pixels
-        row_indices = np.arange(depth_image.height)
-        col_indices = np.arange(depth_image.width)
-        pixel_grid = np.meshgrid(col_indices, row_indices)
-        pixels = np.c_[pixel_grid[0].flatten(), pixel_grid[1].flatten()].T
-        pixels_homog = np.r_[pixels, np.ones([1, pixels.shape[1]])]
-        depth_arr = np.tile(depth_image.data.flatten(), [3, 1])
-
-        # deproject
-        points_3d = depth_arr * np.linalg.inv(self._K).dot(pixels_homog)
+        # scale the cached rays by depth
+        rays = self.deprojection_rays(
+            depth_image.height, depth_image.width, dtype=dtype
+        ).reshape(3, -1)
+        depths = depth_image.raw_data.reshape(-1).astype(dtype, copy=False)
+        if nonzero_only:
+            ind = np.flatnonzero(depths)
+            rays = rays[:, ind]
+            depths = depths[ind]
+        points_3d = rays * depths
         return PointCloud(data=points_3d, frame=self._frame)
 
-    def deproject_to_image(self, depth_image):
+    def deproject_to_image(self, depth_image, dtype=np.float64):
         """Deprojects a DepthImage into a PointCloudImage.
 
         Parameters
@@ -452,6 +589,9 @@ class CameraIntrinsics(object):
         depth_image : :obj:`DepthImage`
             The 2D depth image to projet into a point cloud.
 
+        dtype : :obj:`numpy.dtype`
+            The data type of the point cloud image.
+
         Returns
         -------
         :obj:`PointCloudImage`
@@ -463,7 +603,7 @@ class CameraIntrinsics(object):
             If depth_image is not a valid DepthImage in the same
             reference frame as the camera.
         """
-        point_cloud = self.deproject(depth_image)
+        point_cloud = self.deproject(depth_image, dtype=dtype)
         point_cloud_im_data = point_cloud.data.T.reshape(
             depth_image.height, depth_image.width, 3
         )
@@ -501,9 +641,256 @@ class CameraIntrinsics(object):
                 % (pixel.frame, self._frame)
             )
 
-        point_3d = depth * np.linalg.inv(self._K).dot(np.r_[pixel.data, 1.0])
+        point_3d = np.linalg.inv(self._K).dot(np.r_[pixel.data, 1.0])
+        if self.is_distorted:
+            point_3d[:2] = self._undistort_normalized(
+                point_3d[:2, np.newaxis]
+            ).ravel()
+        point_3d = depth * point_3d
         return Point(data=point_3d, frame=self._frame)
 
+    def deproject_pixels(self, depths, pixels):
+        """Deprojects a set of pixels with given depths into 3D points.
+
+        Parameters
+        ----------
+        depths : :obj:`numpy.ndarray` or float or :obj:`DepthImage`
+            N array of depths at the pixels, a single depth for all of them,
+            or a depth image to sample the depths from with bilinear
+            interpolation.
+
+        pixels : :obj:`numpy.ndarray` or :obj:`autolab_core.ImageCoords`
+            Nx2 array of (x, y) pixel locations, which may be fractional, or
+            image coordinates in the frame of the camera.
+
+        Returns
+        -------
+        :obj:`autolab_core.PointCloud`
+            The deprojected 3D points.
+
+        Raises
+        ------
+        ValueError
+            If the pixels or depth image are not in the same reference frame
+            as the camera.
+        """
+        pixels, depths = _pixels_and_depths(pixels, depths, self._frame)
+        K_inv = np.linalg.inv(self._K)
+        points_3d = np.empty((3, pixels.shape[1]))
+        points_3d[0] = K_inv[0, 0] * pixels[0] + K_inv[0, 1] * pixels[1]
+        points_3d[0] += K_inv[0, 2]
+        points_3d[1] = K_inv[1, 1] * pixels[1] + K_inv[1, 2]
+        points_3d[2] = 1.0
+        if self.is_distorted:
+            points_3d[:2] = self._undistort_normalized(points_3d[:2])
+        points_3d *= depths
+        return PointCloud(data=points_3d, frame=self._frame)
+
+    def without_distortion(self):
+        """Returns the intrinsics of images from this camera after they are
+        undistorted with undistort.
+
+        Returns
+        -------
+        :obj:`CameraIntrinsics`
+            The same camera without lens distortion.
+        """
+        return CameraIntrinsics(
+            frame=self.frame,
+            fx=self.fx,
+            fy=self.fy,
+            cx=self.cx,
+            cy=self.cy,
+            skew=self.skew,
+            height=self.height,
+            width=self.width,
+        )
+
+    def undistort_maps(self, height=None, width=None):
+        """Returns the pixel maps that undistort an image from this camera
+        with cv2.remap. Maps are cached per image shape.
+
+        Parameters
+        ----------
+        height : int
+            The height of the image in pixels. Defaults to the camera height.
+
+        width : int
+            The width of the image in pixels. Defaults to the camera width.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            HxW float32 array of the column in the distorted image to sample
+            for each pixel of the undistorted image.
+        :obj:`numpy.ndarray`
+            HxW float32 array of the row to sample for each pixel.
+        """
+        if height is None:
+            height = self._height
+        if width is None:
+            width = self._width
+        key = (int(height), int(width))
+        maps = self._undistort_maps.get(key)
+        if maps is None:
+            rows, cols = np.mgrid[0 : key[0], 0 : key[1]]
+            pixels = np.array([cols.ravel(), rows.ravel()], dtype=np.float64)
+            if self.is_distorted:
+                pixels = self._distort_pixels(pixels)
+            maps = (
+                pixels[0].reshape(key).astype(np.float32),
+                pixels[1].reshape(key).astype(np.float32),
+            )
+            self._undistort_maps[key] = maps
+        return maps
+
+    def undistort(self, image, interp="nearest"):
+        """Removes the lens distortion of this camera from an image with a
+        single remap. The result is an image from the camera given by
+        without_distortion.
+
+        Parameters
+        ----------
+        image : :obj:`Image`
+            An image taken with this camera.
+
+        interp : :obj:`str`
+            Interpolation to use, 'nearest' or 'bilinear'. Nearest neighbor
+            interpolation avoids mixing depths or labels across edges.
+
+        Returns
+        -------
+        :obj:`Image`
+            The undistorted image, of the same type as the input. Pixels
+            that map outside of the input are zero.
+
+        Raises
+        ------
+        ValueError
+            If the image is not in the same frame as the camera or the
+            interpolation is not supported.
+        """
+        if image.frame != self._frame:
+            raise ValueError(
+                "Cannot undistort image in frame %s with camera in frame %s"
+                % (image.frame, self._frame)
+            )
+        if interp == "nearest":
+            interpolation = cv2.INTER_NEAREST
+        elif interp == "bilinear":
+            interpolation = cv2.INTER_LINEAR
+        else:
+            raise ValueError("Interpolation %s not supported" % (interp))
+        if not self.is_distorted:
+            return image.copy()
+
+        map_x, map_y = self.undistort_maps(image.height, image.width)
+        undistorted_data = cv2.remap(
+            image.raw_data,
+            map_x,
+            map_y,
+            interpolation,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=0,
+        )
+        return image._new_like(undistorted_data.reshape(image.raw_data.shape))
+
+    def _distortion_terms(self, points):
+        """Evaluates the lens distortion model at points on the normalized
+        image plane.
+
+        Parameters
+        ----------
+        points : :obj:`numpy.ndarray`
+            2xN array of undistorted normalized coordinates.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            N array of radial scale factors.
+        :obj:`numpy.ndarray`
+            2xN array of tangential offsets.
+        """
+        k1, k2, p1, p2, k3, k4, k5, k6 = np.r_[
+            self._dist_coeffs, np.zeros(8 - self._dist_coeffs.shape[0])
+        ]
+        x, y = points
+        r2 = x**2 + y**2
+        radial = (1 + r2 * (k1 + r2 * (k2 + r2 * k3))) / (
+            1 + r2 * (k4 + r2 * (k5 + r2 * k6))
+        )
+        tangential = np.array(
+            [
+                2 * p1 * x * y + p2 * (r2 + 2 * x**2),
+                p1 * (r2 + 2 * y**2) + 2 * p2 * x * y,
+            ]
+        )
+        return radial, tangential
+
+    def _distort_normalized(self, points):
+        """Applies the lens distortion model to points on the normalized
+        image plane.
+
+        Parameters
+        ----------
+        points : :obj:`numpy.ndarray`
+            2xN array of undistorted normalized coordinates.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            2xN array of distorted normalized coordinates.
+        """
+        radial, tangential = self._distortion_terms(points)
+        return points * radial + tangential
+
+    def _undistort_normalized(self, points, num_iters=20):
+        """Inverts the lens distortion model for points on the normalized
+        image plane by fixed point iteration, as in cv2.undistortPoints.
+
+        Parameters
+        ----------
+        points : :obj:`numpy.ndarray`
+            2xN array of distorted normalized coordinates.
+
+        num_iters : int
+            The maximum number of iterations.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            2xN array of undistorted normalized coordinates.
+        """
+        undistorted = points
+        for _ in range(num_iters):
+            radial, tangential = self._distortion_terms(undistorted)
+            prev_undistorted = undistorted
+            undistorted = (points - tangential) / radial
+            if np.all(np.abs(undistorted - prev_undistorted) < 1e-12):
+                break
+        return undistorted
+
+    def _distort_pixels(self, pixels):
+        """Moves ideal pinhole pixel coordinates to where the lens of this
+        camera images them.
+
+        Parameters
+        ----------
+        pixels : :obj:`numpy.ndarray`
+            2xN array of undistorted (x, y) pixel coordinates.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            2xN array of distorted pixel coordinates.
+        """
+        y = (pixels[1] - self._cy) / self._fy
+        x = (pixels[0] - self._cx - self._skew * y) / self._fx
+        x, y = self._distort_normalized(np.array([x, y]))
+        return np.array(
+            [self._fx * x + self._skew * y + self._cx, self._fy * y + self._cy]
+        )
+
     def save(self, filename):
         """Save the CameraIntrinsics object to a .intr file.
 
@@ -528,6 +915,10 @@ class CameraIntrinsics(object):
 
         camera_intr_dict = copy.deepcopy(self.__dict__)
         camera_intr_dict["_K"] = 0  # can't save matrix
+        if self.is_distorted:
+            camera_intr_dict["_dist_coeffs"] = self._dist_coeffs.tolist()
+        del camera_intr_dict["_rays"]
+        del camera_intr_dict["_undistort_maps"]
         f = open(filename, "w")
         json.dump(camera_intr_dict, f)
         f.close()
@@ -572,4 +963,380 @@ class CameraIntrinsics(object):
             skew=ci["_skew"],
             height=ci["_height"],
             width=ci["_width"],
+            dist_coeffs=ci.get("_dist_coeffs"),
+        )
+
+
+class MultiCameraProjector(object):
+    """Projects point clouds into a rig of calibrated cameras at once. The
+    projection matrices P = K [R | t] of all cameras are stacked, so a cloud
+    is projected into every camera with a single batched matrix multiply.
+    """
+
+    def __init__(self, camera_intrs, T_camera_world):
+        """Initialize a MultiCameraProjector.
+
+        Parameters
+        ----------
+        camera_intrs : :obj:`CameraIntrinsics` or :obj:`list` of
+          :obj:`CameraIntrinsics`
+            The intrinsics of each camera, or a single set of intrinsics
+            shared by all of the cameras.
+        T_camera_world : :obj:`list` of :obj:`autolab_core.RigidTransform`
+            The pose of each camera, as a transform from the frame of its
+            intrinsics to a common world frame.
+
+        Raises
+        ------
+        ValueError
+            If the numbers of intrinsics and poses differ, or the frames of
+            the poses do not match the intrinsics and a common world frame.
+        """
+        if isinstance(camera_intrs, CameraIntrinsics):
+            camera_intrs = [camera_intrs] * len(T_camera_world)
+        camera_intrs = list(camera_intrs)
+        T_camera_world = list(T_camera_world)
+        if len(camera_intrs) != len(T_camera_world):
+            raise ValueError(
+                "Must provide one pose per camera, got %d intrinsics and "
+                "%d poses" % (len(camera_intrs), len(T_camera_world))
+            )
+        if len(camera_intrs) == 0:
+            raise ValueError("Must provide at least one camera")
+
+        self._world_frame = T_camera_world[0].to_frame
+        for camera_intr, T in zip(camera_intrs, T_camera_world):
+            if T.from_frame != camera_intr.frame:
+                raise ValueError(
+                    "Pose from frame %s does not match camera frame %s"
+                    % (T.from_frame, camera_intr.frame)
+                )
+            if T.to_frame != self._world_frame:
+                raise ValueError(
+                    "All poses must map to the same world frame, got %s "
+                    "and %s" % (T.to_frame, self._world_frame)
+                )
+        self._camera_intrs = camera_intrs
+        self._T_camera_world = T_camera_world
+
+        # stack P = K [R^T | -R^T t] for the world to camera transforms
+        K = np.array([camera_intr.K for camera_intr in camera_intrs])
+        R = np.array([T.rotation for T in T_camera_world])
+        t = np.array([T.translation for T in T_camera_world])
+        R_inv = R.transpose(0, 2, 1)
+        t_inv = -np.einsum("cij,cj->ci", R_inv, t)
+        self._P = np.concatenate(
+            [
+                np.matmul(K, R_inv),
+                np.einsum("cij,cj->ci", K, t_inv)[:, :, np.newaxis],
+            ],
+            axis=2,
         )
+
+    @property
+    def num_cameras(self):
+        """int : The number of cameras in the rig."""
+        return len(self._camera_intrs)
+
+    @property
+    def world_frame(self):
+        """:obj:`str` : The frame of the point clouds to project."""
+        return self._world_frame
+
+    @property
+    def camera_intrs(self):
+        """:obj:`list` of :obj:`CameraIntrinsics` : The intrinsics of each
+        camera.
+        """
+        return self._camera_intrs
+
+    @property
+    def T_camera_world(self):
+        """:obj:`list` of :obj:`autolab_core.RigidTransform` : The pose of
+        each camera in the world frame.
+        """
+        return self._T_camera_world
+
+    @property
+    def P(self):
+        """:obj:`numpy.ndarray` : Cx3x4 stacked projection matrices that map
+        homogeneous world points to homogeneous pixels in each camera.
+        """
+        return self._P
+
+    def _project_data(self, point_cloud):
+        """Projects a world point cloud into every camera.
+
+        Parameters
+        ----------
+        point_cloud : :obj:`autolab_core.PointCloud`
+            A PointCloud in the world frame.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            Cx2xN array of pixel coordinates in each camera.
+        :obj:`numpy.ndarray`
+            CxN array of point depths in each camera.
+        """
+        if not isinstance(point_cloud, PointCloud):
+            raise ValueError("Must provide PointCloud object for projection")
+        if point_cloud.frame != self._world_frame:
+            raise ValueError(
+                "Cannot project points in frame %s into cameras in frame %s"
+                % (point_cloud.frame, self._world_frame)
+            )
+        # a single (3C)x3 by 3xN product for all cameras
+        P = self._P.reshape(-1, 4)
+        points_proj = P[:, :3].dot(point_cloud.data)
+        points_proj += P[:, 3:]
+        points_proj = points_proj.reshape(self.num_cameras, 3, -1)
+        point_depths = points_proj[:, 2, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pixels = points_proj[:, :2, :] / point_depths[:, np.newaxis, :]
+        for camera_pixels, camera_intr in zip(pixels, self._camera_intrs):
+            if camera_intr.is_distorted:
+                camera_pixels[...] = camera_intr._distort_pixels(camera_pixels)
+        return pixels, point_depths
+
+    def project(self, point_cloud, round_px=True):
+        """Projects a world point cloud onto the image plane of each camera.
+
+        Parameters
+        ----------
+        point_cloud : :obj:`autolab_core.PointCloud`
+            A PointCloud in the world frame.
+
+        round_px : bool
+            If True, projections are rounded to the nearest pixel.
+
+        Returns
+        -------
+        :obj:`list` of :obj:`autolab_core.ImageCoords`
+            The projections of the cloud in each camera, in the frame of
+            the camera.
+
+        Raises
+        ------
+        ValueError
+            If the input is not a PointCloud in the world frame.
+        """
+        pixels, _ = self._project_data(point_cloud)
+        if round_px:
+            np.round(pixels, out=pixels)
+        pixels = pixels.astype(np.int16)
+        return [
+            ImageCoords(data=camera_pixels, frame=camera_intr.frame)
+            for camera_pixels, camera_intr in zip(pixels, self._camera_intrs)
+        ]
+
+    def project_to_image(
+        self,
+        point_cloud,
+        round_px=True,
+        splat_radius=0,
+        dtype=np.float64,
+        return_indices=False,
+    ):
+        """Projects a world point cloud into a z-buffered depth image for
+        each camera, as in CameraIntrinsics.project_to_image.
+
+        Parameters
+        ----------
+        point_cloud : :obj:`autolab_core.PointCloud`
+            A PointCloud in the world frame.
+
+        round_px : bool
+            If True, projections are rounded to the nearest pixel. Otherwise
+            they are truncated to the pixel that contains them.
+
+        splat_radius : int
+            Each point fills the square of pixels within this many pixels
+            of its projection.
+
+        dtype : :obj:`numpy.dtype`
+            Float type of the depth images.
+
+        return_indices : bool
+            If True, also returns the index of the point that filled each
+            pixel of each image.
+
+        Returns
+        -------
+        :obj:`list` of :obj:`DepthImage`
+            A depth image for each camera, in the frame of the camera.
+        :obj:`list` of :obj:`numpy.ndarray`
+            HxW arrays of the index of the point that filled each pixel, or
+            -1 for empty pixels. Only returned if return_indices is True.
+
+        Raises
+        ------
+        ValueError
+            If the input is not a PointCloud in the world frame.
+        """
+        pixels, point_depths = self._project_data(point_cloud)
+        depth_ims = []
+        index_ims = []
+        for camera_intr, camera_pixels, camera_depths in zip(
+            self._camera_intrs, pixels, point_depths
+        ):
+            depth_data, index_data = _render_depth(
+                camera_pixels,
+                camera_depths,
+                camera_intr.height,
+                camera_intr.width,
+                round_px=round_px,
+                splat_radius=splat_radius,
+                dtype=dtype,
+                return_indices=return_indices,
+            )
+            depth_ims.append(DepthImage(depth_data, frame=camera_intr.frame))
+            index_ims.append(index_data)
+        if return_indices:
+            return depth_ims, index_ims
+        return depth_ims
+
+
+def _pixels_and_depths(pixels, depths, frame):
+    """Converts the pixel and depth inputs of deproject_pixels to arrays.
+
+    Parameters
+    ----------
+    pixels : :obj:`numpy.ndarray` or :obj:`autolab_core.ImageCoords`
+        Nx2 array of (x, y) pixel locations, or image coordinates.
+
+    depths : :obj:`numpy.ndarray` or float or :obj:`DepthImage`
+        Depths at the pixels, or a depth image to sample them from.
+
+    frame : :obj:`str`
+        The frame of the camera.
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        2xN float array of (x, y) pixel locations.
+    :obj:`numpy.ndarray`
+        N array of depths.
+
+    Raises
+    ------
+    ValueError
+        If the inputs are not in the given frame or their sizes differ.
+    """
+    if isinstance(pixels, ImageCoords):
+        if pixels.frame != frame:
+            raise ValueError(
+                "Cannot deproject pixels in frame %s from camera with frame %s"
+                % (pixels.frame, frame)
+            )
+        pixels = pixels.data.reshape(2, -1).astype(np.float64)
+    else:
+        pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2).T
+
+    if isinstance(depths, DepthImage):
+        if depths.frame != frame:
+            raise ValueError(
+                "Cannot deproject points in frame %s from camera with frame %s"
+                % (depths.frame, frame)
+            )
+        depths = depths.sample_depths(pixels[::-1].T)
+    depths = np.asarray(depths, dtype=np.float64)
+    if depths.ndim > 0:
+        depths = depths.ravel()
+        if depths.shape[0] != pixels.shape[1]:
+            raise ValueError(
+                "Got %d depths for %d pixels"
+                % (depths.shape[0], pixels.shape[1])
+            )
+    return pixels, depths
+
+
+def _render_depth(
+    pixels,
+    depths,
+    height,
+    width,
+    round_px=True,
+    splat_radius=0,
+    dtype=np.float64,
+    return_indices=False,
+):
+    """Renders projected points into a z-buffered depth image, keeping the
+    point with the smallest positive depth at each pixel.
+
+    Parameters
+    ----------
+    pixels : :obj:`numpy.ndarray`
+        2xN array of projected (x, y) pixel coordinates.
+
+    depths : :obj:`numpy.ndarray`
+        N array of point depths. Points with nonpositive depth are skipped.
+
+    height : int
+        The height of the image in pixels.
+
+    width : int
+        The width of the image in pixels.
+
+    round_px : bool
+        If True, pixel coordinates are rounded rather than truncated.
+
+    splat_radius : int
+        Each point fills the (2r+1)x(2r+1) square around its pixel.
+
+    dtype : :obj:`numpy.dtype`
+        Float type of the depth image.
+
+    return_indices : bool
+        If True, also computes the index of the point at each pixel.
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        HxW depth image data.
+    :obj:`numpy.ndarray`
+        HxW array of the index of the point at each pixel, or -1. None if
+        return_indices is False.
+    """
+    height, width = int(height), int(width)
+    splat_radius = int(splat_radius)
+    if splat_radius < 0:
+        raise ValueError("Splat radius must be nonnegative")
+    valid = (depths > 0) & np.all(np.isfinite(pixels), axis=0)
+    point_ind = np.flatnonzero(valid)
+    pixels = pixels[:, point_ind]
+    pixels = np.round(pixels) if round_px else np.floor(pixels)
+    cols = pixels[0].astype(np.intp)
+    rows = pixels[1].astype(np.intp)
+
+    # expand each point to its splat
+    if splat_radius > 0:
+        offsets = np.arange(-splat_radius, splat_radius + 1)
+        rows = rows[:, np.newaxis, np.newaxis] + offsets[:, np.newaxis]
+        cols = cols[:, np.newaxis, np.newaxis] + offsets
+        rows, cols = np.broadcast_arrays(rows, cols)
+        point_ind = np.repeat(point_ind, offsets.shape[0] ** 2)
+        rows = rows.ravel()
+        cols = cols.ravel()
+
+    in_image = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    point_ind = point_ind[in_image]
+    pixel_ind = rows[in_image] * width + cols[in_image]
+
+    # z-buffer the nearest depth at each pixel, breaking ties in favor of
+    # the lowest point index
+    point_depths = depths[point_ind]
+    zbuffer = np.full(height * width, np.inf)
+    np.minimum.at(zbuffer, pixel_ind, point_depths)
+    filled = np.isfinite(zbuffer)
+    depth_data = np.zeros(height * width, dtype=dtype)
+    depth_data[filled] = zbuffer[filled]
+    depth_data = depth_data.reshape(height, width)
+    if not return_indices:
+        return depth_data, None
+
+    nearest = point_depths == zbuffer[pixel_ind]
+    index_data = np.full(height * width, np.iinfo(np.intp).max)
+    np.minimum.at(index_data, pixel_ind[nearest], point_ind[nearest])
+    index_data[~filled] = -1
+    return depth_data, index_data.reshape(height, width)
@@ -7,7 +7,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import time
 
-from .image import DepthImage
+from .image import DepthImage, ImageAccumulator
 from .points import PointCloud, Point
 from .rigid_transformations import RigidTransform
 
@@ -96,19 +96,18 @@ class CameraChessboardRegistration:
         k = 0
         while k < num_transform_avg:
             # average a bunch of depth images together
-            depth_ims = None
+            # keep the median exact over all of the images
+            depth_accumulator = ImageAccumulator(
+                buffer_size=max(num_images, 2)
+            )
             for i in range(num_images):
                 start = time.time()
                 small_color_im, new_depth_im, _ = sensor.frames()
                 end = time.time()
                 logging.info("Frames Runtime: %.3f" % (end - start))
-                if depth_ims is None:
-                    depth_ims = np.zeros(
-                        [new_depth_im.height, new_depth_im.width, num_images]
-                    )
-                depth_ims[:, :, i] = new_depth_im.data
+                depth_accumulator.add(new_depth_im.data)
 
-            med_depth_im = np.median(depth_ims, axis=2)
+            med_depth_im = depth_accumulator.result("median")
             depth_im = DepthImage(med_depth_im, sensor.ir_frame)
 
             # find the corner pixels in an upsampled version of the color image
@@ -53,6 +53,15 @@ class RgbdDetection(object):
         camera_intr=None,
         contour=None,
     ):
+        # detectors crop without copying, so copy any thumbnails that are
+        # still views to keep them writeable and release the full frames
+        if color_thumbnail.is_view:
+            color_thumbnail = color_thumbnail.copy()
+        if depth_thumbnail.is_view:
+            depth_thumbnail = depth_thumbnail.copy()
+        if binary_thumbnail is not None and binary_thumbnail.is_view:
+            binary_thumbnail = binary_thumbnail.copy()
+
         self.color_thumbnail = (
             color_thumbnail  # cropped color image from bounding box
         )
@@ -240,13 +249,13 @@ class RgbdForegroundMaskDetector(RgbdDetector):
         for contour in contours:
             box = contour.bounding_box
             color_thumbnail = color_im.crop(
-                box.height, box.width, box.ci, box.cj
+                box.height, box.width, box.ci, box.cj, copy=False
             )
             depth_thumbnail = depth_im.crop(
-                box.height, box.width, box.ci, box.cj
+                box.height, box.width, box.ci, box.cj, copy=False
             )
             binary_thumbnail = binary_im_filtered.crop(
-                box.height, box.width, box.ci, box.cj
+                box.height, box.width, box.ci, box.cj, copy=False
             )
             thumbnail_intr = camera_intr
             if camera_intr is not None:
@@ -484,6 +493,7 @@ class RgbdForegroundMaskQueryImageDetector(RgbdDetector):
                     query_box.width,
                     query_box.ci,
                     query_box.cj,
+                    copy=False,
                 )
                 (
                     binary_thumbnail,
@@ -511,14 +521,23 @@ class RgbdForegroundMaskQueryImageDetector(RgbdDetector):
                     query_box.width,
                     query_box.ci,
                     query_box.cj,
+                    copy=False,
                 )
 
             # crop to get thumbnails
             color_thumbnail = color_im.crop(
-                query_box.height, query_box.width, query_box.ci, query_box.cj
+                query_box.height,
+                query_box.width,
+                query_box.ci,
+                query_box.cj,
+                copy=False,
             )
             depth_thumbnail = depth_im.crop(
-                query_box.height, query_box.width, query_box.ci, query_box.cj
+                query_box.height,
+                query_box.width,
+                query_box.ci,
+                query_box.cj,
+                copy=False,
             )
             thumbnail_intr = camera_intr
             if camera_intr is not None:
@@ -677,10 +696,14 @@ class PointCloudBoxDetector(RgbdDetector):
             ci = center_px[0]
             cj = center_px[1]
             binary_thumbnail = binary_im_filtered.crop(
-                crop_height, crop_width, ci, cj
+                crop_height, crop_width, ci, cj, copy=False
+            )
+            color_thumbnail = color_im.crop(
+                crop_height, crop_width, ci, cj, copy=False
+            )
+            depth_thumbnail = depth_im.crop(
+                crop_height, crop_width, ci, cj, copy=False
             )
-            color_thumbnail = color_im.crop(crop_height, crop_width, ci, cj)
-            depth_thumbnail = depth_im.crop(crop_height, crop_width, ci, cj)
             thumbnail_intr = camera_intr
             if camera_intr is not None:
                 thumbnail_intr = camera_intr.crop(
@@ -719,6 +742,7 @@ class PointCloudBoxDetector(RgbdDetector):
                     query_box.width,
                     query_box.ci,
                     query_box.cj,
+                    copy=False,
                 )
 
             else:
@@ -734,14 +758,23 @@ class PointCloudBoxDetector(RgbdDetector):
                     query_box.width,
                     query_box.ci,
                     query_box.cj,
+                    copy=False,
                 )
 
             # crop to get thumbnails
             color_thumbnail = color_im.crop(
-                query_box.height, query_box.width, query_box.ci, query_box.cj
+                query_box.height,
+                query_box.width,
+                query_box.ci,
+                query_box.cj,
+                copy=False,
             )
             depth_thumbnail = depth_im.crop(
-                query_box.height, query_box.width, query_box.ci, query_box.cj
+                query_box.height,
+                query_box.width,
+                query_box.ci,
+                query_box.cj,
+                copy=False,
             )
             thumbnail_intr = camera_intr
             if camera_intr is not None:
@@ -8,7 +8,12 @@ Author: Jacky Liang
 from numbers import Number
 import numpy as np
 
-from .transformations import quaternion_multiply, quaternion_conjugate
+from .transformations import (
+    quaternion_multiply,
+    quaternion_conjugate,
+    quaternion_multiply_batch,
+    quaternion_conjugate_batch,
+)
 
 
 class DualQuaternion(object):
@@ -253,3 +258,280 @@ class DualQuaternion(object):
 
     def __repr__(self):
         return "DualQuaternion({0},{1})".format(repr(self.qr), repr(self.qd))
+
+
+class DualQuaternionArray(object):
+    """Class for handling arrays of dual quaternions with vectorized
+    arithmetic and blending.
+
+    The conventions match DualQuaternion: both parts are stored in wxyz
+    format, and for rigid transforms qd holds half of the translation as a
+    pure quaternion.
+
+    Attributes
+    ----------
+    qr : :obj:`numpy.ndarray` of float
+        An Nx4 array of quaternions in wxyz format.
+
+    qd : :obj:`numpy.ndarray` of float
+        An Nx4 array of quaternions in wxyz format.
+
+    conjugate : :obj:`DualQuaternionArray`
+        The conjugates of the dual quaternions.
+
+    norm : :obj:`tuple` of :obj:`numpy.ndarray`
+        The norms of the real and dual parts, respectively.
+
+    normalized : :obj:`DualQuaternionArray`
+        The dual quaternions with qr normalized.
+    """
+
+    def __init__(self, qr, qd=None, enforce_unit_norm=True):
+        """Initialize an array of dual quaternions.
+
+        Parameters
+        ----------
+        qr : :obj:`numpy.ndarray` of float
+            An Nx4 array of quaternions in wxyz format.
+
+        qd : :obj:`numpy.ndarray` of float
+            An Nx4 array of quaternions in wxyz format. Defaults to zero.
+
+        enforce_unit_norm : bool
+            If true, raises a ValueError when a quaternion in qr is not
+            normalized.
+
+        Raises
+        ------
+        ValueError
+            If the arrays do not have shape Nx4, or enforce_unit_norm is True
+            and the norm of a quaternion in qr is not 1.
+        """
+        qr = np.array(qr, dtype=np.float64, ndmin=2)
+        if qd is None:
+            qd = np.zeros(qr.shape)
+        qd = np.array(qd, dtype=np.float64, ndmin=2)
+        if qr.ndim != 2 or qr.shape[1] != 4 or qd.shape != qr.shape:
+            raise ValueError(
+                "qr and qd must be Nx4 arrays of the same shape. "
+                f"Got {qr.shape} and {qd.shape}"
+            )
+        self._qr = qr
+        self._qd = qd
+
+        if enforce_unit_norm:
+            norm = self.norm
+            if not np.allclose(norm[0], 1):
+                raise ValueError(
+                    "Dual quaternions do not have norm 1! Got {0}".format(
+                        norm[0]
+                    )
+                )
+
+    @staticmethod
+    def _from_trusted(qr, qd):
+        """Creates a DualQuaternionArray from arrays that are already known
+        to be valid, without copying or validating them.
+        """
+        dqs = DualQuaternionArray.__new__(DualQuaternionArray)
+        dqs._qr = qr
+        dqs._qd = qd
+        return dqs
+
+    @staticmethod
+    def from_dual_quaternions(dqs):
+        """Creates a DualQuaternionArray from a list of DualQuaternions.
+
+        Parameters
+        ----------
+        dqs : :obj:`list` of :obj:`DualQuaternion`
+            The dual quaternions.
+
+        Returns
+        -------
+        :obj:`DualQuaternionArray`
+            The array of the dual quaternions.
+        """
+        return DualQuaternionArray._from_trusted(
+            np.array([dq.qr for dq in dqs], dtype=np.float64),
+            np.array([dq.qd for dq in dqs], dtype=np.float64),
+        )
+
+    @property
+    def qr(self):
+        """:obj:`numpy.ndarray` of float: An Nx4 array of quaternions in
+        wxyz format."""
+        return self._qr
+
+    @property
+    def qd(self):
+        """:obj:`numpy.ndarray` of float: An Nx4 array of quaternions in
+        wxyz format."""
+        return self._qd
+
+    @property
+    def conjugate(self):
+        """:obj:`DualQuaternionArray`: The conjugates of the dual
+        quaternions."""
+        qr_c = self._qr.copy()
+        qr_c[:, 1:] *= -1.0
+        qd_c = self._qd.copy()
+        qd_c[:, 1:] *= -1.0
+        return DualQuaternionArray._from_trusted(qr_c, qd_c)
+
+    @property
+    def norm(self):
+        """:obj:`tuple` of :obj:`numpy.ndarray`: The norms of qr and qd,
+        computed as in DualQuaternion.norm."""
+        qr = np.roll(self._qr, -1, axis=1)
+        qd = np.roll(self._qd, -1, axis=1)
+        qr_c = quaternion_conjugate_batch(qr)
+        qd_c = quaternion_conjugate_batch(qd)
+
+        qr_norm = np.linalg.norm(quaternion_multiply_batch(qr, qr_c), axis=1)
+        qd_norm = np.linalg.norm(
+            quaternion_multiply_batch(qr, qd_c)
+            + quaternion_multiply_batch(qd, qr_c),
+            axis=1,
+        )
+        return (qr_norm, qd_norm)
+
+    @property
+    def normalized(self):
+        """:obj:`DualQuaternionArray`: The dual quaternions with qr
+        normalized."""
+        qr = self._qr / np.linalg.norm(self._qr, axis=1)[:, np.newaxis]
+        return DualQuaternionArray._from_trusted(qr, self._qd.copy())
+
+    def copy(self):
+        """Return a copy of this array.
+
+        Returns
+        -------
+        :obj:`DualQuaternionArray`
+            The copied DualQuaternionArray.
+        """
+        return DualQuaternionArray._from_trusted(
+            self._qr.copy(), self._qd.copy()
+        )
+
+    def __len__(self):
+        return self._qr.shape[0]
+
+    def __getitem__(self, key):
+        """Returns a DualQuaternion for an integer index, and a
+        DualQuaternionArray for a slice, index array or mask."""
+        if isinstance(key, (int, np.integer)):
+            return DualQuaternion(self._qr[key], self._qd[key], False)
+        return DualQuaternionArray._from_trusted(self._qr[key], self._qd[key])
+
+    def blend(self, weights=None):
+        """Blends the dual quaternions with Dual Quaternion Linear Blending,
+        as in DualQuaternion.interpolate but with any number of inputs.
+
+        Each qr is sign-aligned with the first one, so that antipodal
+        quaternions of the same rotation do not cancel out. qd is left as is,
+        since it holds the translation independently of the sign of qr.
+
+        Parameters
+        ----------
+        weights : :obj:`numpy.ndarray` of float
+            An N array of blend weights, or an MxN array to compute M blends
+            at once. Defaults to uniform weights. Weights are normalized to
+            sum to one.
+
+        Returns
+        -------
+        :obj:`DualQuaternion` or :obj:`DualQuaternionArray`
+            The blended dual quaternion, or an array of M blends for 2D
+            weights.
+
+        Raises
+        ------
+        ValueError
+            If the weights do not match the length of the array or do not
+            have a positive sum.
+        """
+        if weights is None:
+            weights = np.ones(len(self))
+        weights = np.asarray(weights, dtype=np.float64)
+        single = weights.ndim == 1
+        weights = np.atleast_2d(weights)
+        if weights.ndim != 2 or weights.shape[1] != len(self):
+            raise ValueError(
+                "Expected weights for {0} dual quaternions, got shape "
+                "{1}".format(len(self), weights.shape)
+            )
+        total = np.sum(weights, axis=1)
+        if np.any(total <= 0):
+            raise ValueError("Blend weights must have a positive sum")
+        weights = weights / total[:, np.newaxis]
+
+        signs = np.where(self._qr.dot(self._qr[0]) < 0, -1.0, 1.0)
+        qr = weights.dot(signs[:, np.newaxis] * self._qr)
+        qr /= np.linalg.norm(qr, axis=1)[:, np.newaxis]
+        qd = weights.dot(self._qd)
+        if single:
+            return DualQuaternion(qr[0], qd[0], False)
+        return DualQuaternionArray._from_trusted(qr, qd)
+
+    def __mul__(self, val):
+        """Multiplies the dual quaternions elementwise by other dual
+        quaternions, or scales them by a scalar.
+
+        Parameters
+        ----------
+        val : :obj:`DualQuaternionArray`, :obj:`DualQuaternion` or number
+            The values by which to multiply. A single dual quaternion on
+            either side is broadcast against the array.
+
+        Returns
+        -------
+        :obj:`DualQuaternionArray`
+            A new DualQuaternionArray that results from the multiplication.
+
+        Raises
+        ------
+        ValueError
+            If val is not a DualQuaternionArray, DualQuaternion or Number,
+            or the lengths of the arrays do not match.
+        """
+        if isinstance(val, DualQuaternion):
+            val = DualQuaternionArray._from_trusted(
+                val.qr[np.newaxis], val.qd[np.newaxis]
+            )
+        if isinstance(val, DualQuaternionArray):
+            if len(self) != len(val) and 1 not in (len(self), len(val)):
+                raise ValueError(
+                    "Cannot multiply arrays of {0} and {1} dual "
+                    "quaternions".format(len(self), len(val))
+                )
+            qr0 = np.roll(self._qr, -1, axis=1)
+            qd0 = np.roll(self._qd, -1, axis=1)
+            qr1 = np.roll(val._qr, -1, axis=1)
+            qd1 = np.roll(val._qd, -1, axis=1)
+            new_qr_xyzw = quaternion_multiply_batch(qr0, qr1)
+            new_qd_xyzw = quaternion_multiply_batch(
+                qr0, qd1
+            ) + quaternion_multiply_batch(qd0, qr1)
+            return DualQuaternionArray._from_trusted(
+                np.roll(new_qr_xyzw, 1, axis=1),
+                np.roll(new_qd_xyzw, 1, axis=1),
+            )
+        elif isinstance(val, Number):
+            return DualQuaternionArray._from_trusted(
+                val * self._qr, val * self._qd
+            )
+
+        raise ValueError(
+            "Cannot multiply dual quaternion array with object of type "
+            "{0}".format(type(val))
+        )
+
+    def __str__(self):
+        return "DualQuaternionArray of {0} dual quaternions".format(len(self))
+
+    def __repr__(self):
+        return "DualQuaternionArray({0},{1})".format(
+            repr(self._qr), repr(self._qd)
+        )
@@ -0,0 +1,415 @@
+"""
+Nearest neighbor indexes over feature descriptors for retrieval.
+"""
+from abc import ABCMeta, abstractmethod
+import os
+
+import numpy as np
+from scipy.cluster.vq import kmeans2
+
+from .features import BagOfFeatures
+
+INDEX_EXTENSION = ".npz"
+
+
+def _squared_dists(queries, descriptors, descriptor_sq_norms):
+    """Returns the squared euclidean distances between queries and
+    descriptors, computed with a matrix product."""
+    dists = (
+        np.sum(queries**2, axis=1)[:, np.newaxis]
+        - 2 * queries.dot(descriptors.T)
+        + descriptor_sq_norms[np.newaxis, :]
+    )
+    return np.maximum(dists, 0)
+
+
+def _merge_top_k(dists, inds, new_dists, new_inds, k):
+    """Merges two sets of candidate neighbors per query into the k closest,
+    sorted by distance."""
+    dists = np.concatenate([dists, new_dists], axis=1)
+    inds = np.concatenate([inds, new_inds], axis=1)
+    if dists.shape[1] > k:
+        top = np.argpartition(dists, k - 1, axis=1)[:, :k]
+        dists = np.take_along_axis(dists, top, axis=1)
+        inds = np.take_along_axis(inds, top, axis=1)
+    order = np.argsort(dists, axis=1, kind="stable")
+    return (
+        np.take_along_axis(dists, order, axis=1),
+        np.take_along_axis(inds, order, axis=1),
+    )
+
+
+class FeatureIndex:
+    """Abstract class for nearest neighbor search over the descriptors of a
+    bag of features under the euclidean distance.
+
+    Attributes
+    ----------
+    features : :obj:`BagOfFeatures`
+        the indexed features
+    """
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self, features):
+        if not isinstance(features, BagOfFeatures):
+            raise ValueError("Must supply a bag of features to index")
+        if features.num_features == 0:
+            raise ValueError("Cannot index an empty bag of features")
+        self.features_ = features
+        self.descriptors_ = np.asarray(features.descriptors, dtype=np.float64)
+        self.descriptor_sq_norms_ = np.sum(self.descriptors_**2, axis=1)
+
+    @property
+    def features(self):
+        return self.features_
+
+    @property
+    def num_features(self):
+        return self.features_.num_features
+
+    def _check_queries(self, queries, k):
+        """Returns the queries as a 2D float array."""
+        queries = np.asarray(queries, dtype=np.float64)
+        if queries.ndim == 1:
+            queries = queries[np.newaxis, :]
+        if queries.ndim != 2 or queries.shape[1] != self.descriptors_.shape[1]:
+            raise ValueError(
+                "Queries must be %d-dimensional descriptors"
+                % (self.descriptors_.shape[1])
+            )
+        if k < 1:
+            raise ValueError("k must be positive")
+        return queries
+
+    @abstractmethod
+    def search(self, queries, k=1):
+        """Finds the nearest indexed descriptors of each query.
+
+        Parameters
+        ----------
+        queries : :obj:`numpy.ndarray`
+            QxD query descriptors, or a single descriptor
+        k : int
+            number of neighbors to return per query
+
+        Returns
+        -------
+        :obj:`tuple` of :obj:`numpy.ndarray`
+            QxK distances and indices of the neighbors in the bag of features,
+            closest first. Missing neighbors have distance inf and index -1
+        """
+        pass
+
+    def retrieve(self, queries, k=1):
+        """Finds the keys and poses of the nearest global features of each
+        query.
+
+        Parameters
+        ----------
+        queries : :obj:`numpy.ndarray`
+            QxD query descriptors, or a single descriptor
+        k : int
+            number of neighbors to return per query
+
+        Returns
+        -------
+        :obj:`tuple` of :obj:`numpy.ndarray`
+            QxK keys, poses and distances of the neighbors, closest first.
+            Missing neighbors have key and pose None and distance inf
+        """
+        dists, inds = self.search(queries, k=k)
+        valid = inds >= 0
+        keys = np.full(inds.shape, None, dtype=object)
+        poses = np.full(inds.shape, None, dtype=object)
+        keys[valid] = self.features_.keys[inds[valid]]
+        poses[valid] = self.features_.poses[inds[valid]]
+        return keys, poses, dists
+
+    def _arrays(self):
+        """Returns the arrays of the index to save, by name."""
+        return {}
+
+    def save(self, filename):
+        """Save the index and its features to a .npz file.
+
+        Parameters
+        ----------
+        filename : :obj:`str`
+            The file to save the index to.
+
+        Raises
+        ------
+        ValueError
+            If filename's extension isn't .npz.
+        """
+        _, file_ext = os.path.splitext(filename)
+        if file_ext.lower() != INDEX_EXTENSION:
+            raise ValueError(
+                f"Extension {file_ext} not supported for FeatureIndex. "
+                f"Must be stored with extension {INDEX_EXTENSION}"
+            )
+        arrays = self.features_._arrays()
+        for name, array in self._arrays().items():
+            arrays["index_" + name] = array
+        np.savez(filename, **arrays)
+
+    @classmethod
+    def load(cls, filename):
+        """Load an index saved with save.
+
+        Parameters
+        ----------
+        filename : :obj:`str`
+            The file to load the index from.
+
+        Returns
+        -------
+        :obj:`FeatureIndex`
+            The index read from the file.
+
+        Raises
+        ------
+        ValueError
+            If filename's extension isn't .npz.
+        """
+        _, file_ext = os.path.splitext(filename)
+        if file_ext.lower() != INDEX_EXTENSION:
+            raise ValueError(
+                f"Extension {file_ext} not supported for FeatureIndex. "
+                f"Can only load extension {INDEX_EXTENSION}"
+            )
+        with np.load(filename) as data:
+            features = BagOfFeatures._from_arrays(data)
+            arrays = {
+                name[len("index_") :]: data[name]
+                for name in data.files
+                if name.startswith("index_")
+            }
+        return cls._from_arrays(features, arrays)
+
+    @classmethod
+    def _from_arrays(cls, features, arrays):
+        """Creates an index from its features and the arrays returned by
+        _arrays."""
+        return cls(features)
+
+
+class BruteForceFeatureIndex(FeatureIndex):
+    """Exact nearest neighbor search by comparing each query against every
+    indexed descriptor. Distances are computed for blocks of queries and
+    descriptors at a time, so memory stays bounded for large databases.
+
+    Attributes
+    ----------
+    features : :obj:`BagOfFeatures`
+        the indexed features
+    chunk_size : int
+        number of queries and of descriptors per block of distances
+    """
+
+    def __init__(self, features, chunk_size=1024):
+        FeatureIndex.__init__(self, features)
+        self.chunk_size_ = chunk_size
+
+    def search(self, queries, k=1):
+        """Finds the nearest indexed descriptors of each query.
+
+        Parameters
+        ----------
+        queries : :obj:`numpy.ndarray`
+            QxD query descriptors, or a single descriptor
+        k : int
+            number of neighbors to return per query
+
+        Returns
+        -------
+        :obj:`tuple` of :obj:`numpy.ndarray`
+            QxK distances and indices of the neighbors in the bag of features,
+            closest first. Missing neighbors have distance inf and index -1
+        """
+        queries = self._check_queries(queries, k)
+        num_queries = queries.shape[0]
+        dists = np.full([num_queries, k], np.inf)
+        inds = np.full([num_queries, k], -1, dtype=np.intp)
+        for q_start in range(0, num_queries, self.chunk_size_):
+            q_end = min(q_start + self.chunk_size_, num_queries)
+            chunk_dists = dists[q_start:q_end]
+            chunk_inds = inds[q_start:q_end]
+            for start in range(0, self.num_features, self.chunk_size_):
+                end = min(start + self.chunk_size_, self.num_features)
+                block = _squared_dists(
+                    queries[q_start:q_end],
+                    self.descriptors_[start:end],
+                    self.descriptor_sq_norms_[start:end],
+                )
+                block_inds = np.broadcast_to(
+                    np.arange(start, end), block.shape
+                )
+                chunk_dists, chunk_inds = _merge_top_k(
+                    chunk_dists, chunk_inds, block, block_inds, k
+                )
+            dists[q_start:q_end] = chunk_dists
+            inds[q_start:q_end] = chunk_inds
+        return np.sqrt(dists), inds
+
+
+class IVFFeatureIndex(FeatureIndex):
+    """Approximate nearest neighbor search with an inverted file index.
+
+    The descriptors are partitioned by k-means into lists around centroids.
+    A query is only compared against the descriptors in the lists of its
+    num_probes nearest centroids, trading recall for speed.
+
+    Attributes
+    ----------
+    features : :obj:`BagOfFeatures`
+        the indexed features
+    num_lists : int
+        number of k-means partitions. Defaults to the square root of the
+        number of features
+    num_probes : int
+        number of partitions searched per query
+    num_train : int
+        maximum number of descriptors to run k-means on. Defaults to 256
+        per list
+    seed : int
+        seed of the random sampling and k-means initialization
+    """
+
+    def __init__(
+        self,
+        features,
+        num_lists=None,
+        num_probes=8,
+        num_train=None,
+        seed=None,
+    ):
+        FeatureIndex.__init__(self, features)
+        if num_lists is None:
+            num_lists = int(np.ceil(np.sqrt(self.num_features)))
+        if num_lists < 1 or num_lists > self.num_features:
+            raise ValueError(
+                "Number of lists must be between 1 and the number of features"
+            )
+        self.num_probes = num_probes
+
+        # partition the descriptors with k-means on a sample of them
+        rng = np.random.default_rng(seed)
+        if num_train is None:
+            num_train = 256 * num_lists
+        train = self.descriptors_
+        if self.num_features > num_train:
+            train = train[
+                rng.choice(self.num_features, size=num_train, replace=False)
+            ]
+        centroids, _ = kmeans2(
+            train, num_lists, iter=20, minit="points", seed=rng.integers(2**31)
+        )
+        self._set_lists(centroids)
+
+    def _set_lists(self, centroids):
+        """Assigns every descriptor to the list of its nearest centroid and
+        stores the descriptor indices sorted by list."""
+        self.centroids_ = centroids
+        self.centroid_sq_norms_ = np.sum(centroids**2, axis=1)
+        assignments = np.zeros(self.num_features, dtype=np.intp)
+        chunk_size = 4096
+        for start in range(0, self.num_features, chunk_size):
+            end = min(start + chunk_size, self.num_features)
+            assignments[start:end] = _squared_dists(
+                self.descriptors_[start:end],
+                centroids,
+                self.centroid_sq_norms_,
+            ).argmin(axis=1)
+        self.list_order_ = np.argsort(assignments, kind="stable")
+        self.list_offsets_ = np.zeros(centroids.shape[0] + 1, dtype=np.intp)
+        self.list_offsets_[1:] = np.cumsum(
+            np.bincount(assignments, minlength=centroids.shape[0])
+        )
+
+    @property
+    def num_lists(self):
+        return self.centroids_.shape[0]
+
+    @property
+    def num_probes(self):
+        return self.num_probes_
+
+    @num_probes.setter
+    def num_probes(self, num_probes):
+        if num_probes < 1:
+            raise ValueError("Number of probes must be positive")
+        self.num_probes_ = num_probes
+
+    def search(self, queries, k=1):
+        """Finds the approximately nearest indexed descriptors of each query.
+
+        Parameters
+        ----------
+        queries : :obj:`numpy.ndarray`
+            QxD query descriptors, or a single descriptor
+        k : int
+            number of neighbors to return per query
+
+        Returns
+        -------
+        :obj:`tuple` of :obj:`numpy.ndarray`
+            QxK distances and indices of the neighbors in the bag of features,
+            closest first. Missing neighbors have distance inf and index -1
+        """
+        queries = self._check_queries(queries, k)
+        num_queries = queries.shape[0]
+        num_probes = min(self.num_probes_, self.num_lists)
+
+        # find the lists to probe for all queries at once
+        centroid_dists = _squared_dists(
+            queries, self.centroids_, self.centroid_sq_norms_
+        )
+        probes = np.argpartition(centroid_dists, num_probes - 1, axis=1)[
+            :, :num_probes
+        ]
+
+        dists = np.full([num_queries, k], np.inf)
+        inds = np.full([num_queries, k], -1, dtype=np.intp)
+        for i in range(num_queries):
+            candidates = np.concatenate(
+                [
+                    self.list_order_[
+                        self.list_offsets_[j] : self.list_offsets_[j + 1]
+                    ]
+                    for j in probes[i]
+                ]
+            )
+            if candidates.shape[0] == 0:
+                continue
+            candidate_dists = _squared_dists(
+                queries[i : i + 1],
+                self.descriptors_[candidates],
+                self.descriptor_sq_norms_[candidates],
+            )
+            dists[i : i + 1], inds[i : i + 1] = _merge_top_k(
+                dists[i : i + 1],
+                inds[i : i + 1],
+                candidate_dists,
+                candidates[np.newaxis, :],
+                k,
+            )
+        return np.sqrt(dists), inds
+
+    def _arrays(self):
+        """Returns the arrays of the index to save, by name."""
+        return {
+            "centroids": self.centroids_,
+            "num_probes": np.array(self.num_probes_),
+        }
+
+    @classmethod
+    def _from_arrays(cls, features, arrays):
+        """Creates an index from its features and the arrays returned by
+        _arrays, without rerunning k-means."""
+        index = cls.__new__(cls)
+        FeatureIndex.__init__(index, features)
+        index.num_probes = int(arrays["num_probes"])
+        index._set_lists(arrays["centroids"])
+        return index
@@ -3,9 +3,10 @@ Classes for feature matching between point sets for registration
 Author: Jeff Mahler
 """
 from abc import ABCMeta, abstractmethod
+import itertools
+
 import numpy as np
 from scipy import spatial
-import scipy.spatial.distance as ssd
 
 from .features import BagOfFeatures
 
@@ -146,11 +147,74 @@ class FeatureMatcher:
         pass
 
 
+def _chunked_nearest_neighbors(source, target, k, chunk_size):
+    """Finds the k nearest targets of each source descriptor and the nearest
+    source of each target descriptor, computing the distance matrix
+    chunk_size rows at a time.
+
+    Returns
+    -------
+    :obj:`tuple` of :obj:`numpy.ndarray`
+        NxK distances and indices of the nearest targets of the sources and
+        the M indices of the nearest sources of the targets
+    """
+    num_source = source.shape[0]
+    source_dists = np.zeros([num_source, k])
+    source_nn = np.zeros([num_source, k], dtype=np.intp)
+    target_dists = np.full(target.shape[0], np.inf)
+    target_nn = np.zeros(target.shape[0], dtype=np.intp)
+    for start in range(0, num_source, chunk_size):
+        end = min(start + chunk_size, num_source)
+        dists = spatial.distance.cdist(source[start:end], target)
+        rows = np.arange(end - start)[:, np.newaxis]
+
+        # nearest targets of the chunk of sources, closest first
+        nn = dists.argmin(axis=1)[:, np.newaxis]
+        if k > 1:
+            nn = np.argpartition(dists, k - 1, axis=1)[:, :k]
+            nn = np.take_along_axis(
+                nn, np.argsort(dists[rows, nn], axis=1), axis=1
+            )
+        source_nn[start:end] = nn
+        source_dists[start:end] = dists[rows, nn]
+
+        # keep the first nearest source of each target, as argmin would
+        chunk_nn = dists.argmin(axis=0)
+        chunk_dists = dists[chunk_nn, np.arange(target.shape[0])]
+        closer = chunk_dists < target_dists
+        target_dists[closer] = chunk_dists[closer]
+        target_nn[closer] = chunk_nn[closer] + start
+    return source_dists, source_nn, target_nn
+
+
 class RawDistanceFeatureMatcher(FeatureMatcher):
+    """Match features to their mutual nearest neighbors in descriptor space.
+
+    Attributes
+    ----------
+    ratio : float
+        if set, a match is only kept if the distance to the nearest target
+        descriptor is below ratio times the distance to the second nearest
+    use_kdtree : bool
+        whether to find nearest neighbors with KD-trees on the descriptors
+        instead of a distance matrix, which is faster for low-dimensional
+        descriptors
+    chunk_size : int
+        number of source descriptors to compute distances for at a time,
+        which bounds the memory of the distance matrix
+    """
+
+    def __init__(self, ratio=None, use_kdtree=False, chunk_size=1024):
+        self.ratio_ = ratio
+        self.use_kdtree_ = use_kdtree
+        self.chunk_size_ = chunk_size
+        FeatureMatcher.__init__(self)
+
     def match(self, source_obj_features, target_obj_features):
         """
-        Matches features between two graspable objects based on
-        a full distance matrix.
+        Matches features between two graspable objects. Only mutual nearest
+        neighbors in descriptor space that pass the ratio test, if any, are
+        kept.
 
         Parameters
         ----------
@@ -175,40 +239,43 @@ class RawDistanceFeatureMatcher(FeatureMatcher):
         source_keypoints = source_obj_features.keypoints
         target_keypoints = target_obj_features.keypoints
 
-        # calculate distance between this model's descriptors and each of the
-        # other_model's descriptors
-        dists = spatial.distance.cdist(source_descriptors, target_descriptors)
-
-        # calculate the indices of the target_model that minimize the distance
-        # to the descriptors in this model
-        source_closest_descriptors = dists.argmin(axis=1)
-        target_closest_descriptors = dists.argmin(axis=0)
-        match_indices = []
-        source_matched_points = np.zeros((0, 3))
-        target_matched_points = np.zeros((0, 3))
-
-        # calculate which points/indices the closest descriptors correspond to
-        for i, j in enumerate(source_closest_descriptors):
-            # for now, only keep correspondences that are a 2-way match
-            if target_closest_descriptors[j] == i:
-                match_indices.append(j)
-                source_matched_points = np.r_[
-                    source_matched_points, source_keypoints[i : i + 1, :]
-                ]
-                target_matched_points = np.r_[
-                    target_matched_points, target_keypoints[j : j + 1, :]
-                ]
-            else:
-                match_indices.append(-1)
+        # find the nearest neighbors in both directions
+        k = 1 if self.ratio_ is None else min(2, target_descriptors.shape[0])
+        if self.use_kdtree_:
+            source_dists, source_nn = spatial.cKDTree(
+                target_descriptors
+            ).query(source_descriptors, k=k)
+            _, target_nn = spatial.cKDTree(source_descriptors).query(
+                target_descriptors
+            )
+            source_dists = source_dists.reshape(-1, k)
+            source_nn = source_nn.reshape(-1, k)
+        else:
+            source_dists, source_nn, target_nn = _chunked_nearest_neighbors(
+                source_descriptors, target_descriptors, k, self.chunk_size_
+            )
+
+        # only keep correspondences that are a 2-way match
+        match_indices = source_nn[:, 0]
+        valid = target_nn[match_indices] == np.arange(match_indices.shape[0])
+        if k > 1:
+            valid &= source_dists[:, 0] < self.ratio_ * source_dists[:, 1]
+        match_indices = np.where(valid, match_indices, -1)
 
         return Correspondences(
-            match_indices, source_matched_points, target_matched_points
+            match_indices,
+            source_keypoints[valid],
+            target_keypoints[match_indices[valid]],
         )
 
 
 class PointToPlaneFeatureMatcher(FeatureMatcher):
     """Match points using a point to plane criterion with thresholding.
 
+    Candidate matches are found with a KD-tree on the target points, which
+    is cached and reused for as long as the same target points are matched
+    against, e.g. across the iterations of ICP on full-resolution clouds.
+
     Attributes
     ----------
     dist_thresh : float
@@ -216,13 +283,57 @@ class PointToPlaneFeatureMatcher(FeatureMatcher):
     norm_thresh : float
         threshold cosine distance alignment betwen normals
         to consider a match valid
+    max_neighbors : int
+        if set, only the max_neighbors closest target points within
+        dist_thresh are considered for each source point, which is faster
+        but approximate. By default all points within dist_thresh are.
     """
 
-    def __init__(self, dist_thresh=0.05, norm_thresh=0.75):
+    def __init__(self, dist_thresh=0.05, norm_thresh=0.75, max_neighbors=None):
         self.dist_thresh_ = dist_thresh
         self.norm_thresh_ = norm_thresh
+        self.max_neighbors_ = max_neighbors
+        self.target_cache_ = None
         FeatureMatcher.__init__(self)
 
+    def _target_tree(self, target_points):
+        """Returns a KD-tree on the target points, rebuilding the cached
+        tree only when the target points change. The cache is replaced as a
+        whole so that threads can share a matcher."""
+        cache = self.target_cache_
+        if cache is None or not np.array_equal(cache[0], target_points):
+            points = np.array(target_points)
+            cache = (points, spatial.cKDTree(points))
+            self.target_cache_ = cache
+        return cache[1]
+
+    def _candidates(self, source_points, target_points):
+        """Returns flat arrays of source and target indices of all pairs
+        within dist_thresh of each other."""
+        tree = self._target_tree(target_points)
+        num_source = source_points.shape[0]
+        if self.max_neighbors_ is not None:
+            k = min(self.max_neighbors_, target_points.shape[0])
+            dists, target_inds = tree.query(
+                source_points,
+                k=k,
+                distance_upper_bound=np.nextafter(self.dist_thresh_, np.inf),
+            )
+            dists = dists.reshape(num_source, k)
+            target_inds = target_inds.reshape(num_source, k)
+            source_inds, cols = np.nonzero(dists <= self.dist_thresh_)
+            return source_inds, target_inds[source_inds, cols]
+
+        neighbors = tree.query_ball_point(source_points, r=self.dist_thresh_)
+        lengths = np.array([len(n) for n in neighbors], dtype=np.intp)
+        source_inds = np.repeat(np.arange(num_source), lengths)
+        target_inds = np.fromiter(
+            itertools.chain.from_iterable(neighbors),
+            dtype=np.intp,
+            count=source_inds.shape[0],
+        )
+        return source_inds, target_inds
+
     def match(
         self, source_points, target_points, source_normals, target_normals
     ):
@@ -246,30 +357,37 @@ class PointToPlaneFeatureMatcher(FeatureMatcher):
         :obj`Correspondences`
             the correspondences between source and target
         """
-        # compute the distances and inner products between the point sets
-        dists = ssd.cdist(source_points, target_points, "euclidean")
-        ip = source_normals.dot(
-            target_normals.T
-        )  # abs because we don't have correct orientations
-        source_ip = source_points.dot(target_normals.T)
-        target_ip = target_points.dot(target_normals.T)
-        target_ip = np.diag(target_ip)
-        target_ip = np.tile(target_ip, [source_points.shape[0], 1])
+        # find the pairs within the distance threshold
+        source_inds, target_inds = self._candidates(
+            source_points, target_points
+        )
+
+        # keep pairs with aligned normals
+        ip = np.einsum(
+            "ij,ij->i",
+            source_normals[source_inds],
+            target_normals[target_inds],
+        )
+        valid = ip >= self.norm_thresh_
+        source_inds = source_inds[valid]
+        target_inds = target_inds[valid]
+
+        # difference in inner products with the target normal
         abs_diff = np.abs(
-            source_ip - target_ip
-        )  # difference in inner products
-
-        # mark invalid correspondences
-        invalid_dists = np.where(dists > self.dist_thresh_)
-        abs_diff[invalid_dists[0], invalid_dists[1]] = np.inf
-        invalid_norms = np.where(ip < self.norm_thresh_)
-        abs_diff[invalid_norms[0], invalid_norms[1]] = np.inf
-
-        # choose the closest matches
-        match_indices = np.argmin(abs_diff, axis=1)
-        match_vals = np.min(abs_diff, axis=1)
-        invalid_matches = np.where(match_vals == np.inf)
-        match_indices[invalid_matches[0]] = -1
+            np.einsum(
+                "ij,ij->i",
+                source_points[source_inds] - target_points[target_inds],
+                target_normals[target_inds],
+            )
+        )
+
+        # choose the closest matches, breaking ties by lowest target index
+        order = np.lexsort((target_inds, abs_diff, source_inds))
+        source_inds = source_inds[order]
+        first = np.ones(source_inds.shape[0], dtype=bool)
+        first[1:] = source_inds[1:] != source_inds[:-1]
+        match_indices = np.full(source_points.shape[0], -1, dtype=np.intp)
+        match_indices[source_inds[first]] = target_inds[order][first]
 
         return NormalCorrespondences(
             match_indices,
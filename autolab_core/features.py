@@ -3,9 +3,12 @@ Classes for features of a 3D object surface.
 Author: Jeff Mahler
 """
 from abc import ABCMeta
+import os
 
 import numpy as np
 
+from .rigid_transformations import RigidTransform
+
 
 class Feature:
     """Abstract class for features"""
@@ -103,10 +106,32 @@ class MVCNNFeature(GlobalFeature):
         GlobalFeature.__init__(self, key, descriptor, pose)
 
 
+FEATURES_EXTENSION = ".npz"
+
+_FEATURE_TYPES = {
+    cls.__name__: cls
+    for cls in [LocalFeature, GlobalFeature, SHOTFeature, MVCNNFeature]
+}
+
+# feature columns and the attributes of features that hold them
+_LOCAL_COLUMNS = {
+    "descriptor": "descriptor_",
+    "reference_frame": "rf_",
+    "keypoint": "point_",
+    "normal": "normal_",
+}
+_GLOBAL_COLUMNS = {"key": "key_", "descriptor": "descriptor_", "pose": "pose_"}
+
+
 class BagOfFeatures:
-    """Wrapper for a list of features, created for the sake
+    """Wrapper for a set of features, created for the sake
     of future bag-of-words reps.
 
+    The features are stored column-wise in contiguous arrays that grow by
+    doubling, so the descriptors, keypoints, normals and reference frames of
+    all features are available as arrays without copying. All features in
+    a bag must be either local or global features.
+
     Attributes
     ----------
     features : :obj:`list` of :obj:`Feature`
@@ -114,11 +139,71 @@ class BagOfFeatures:
     """
 
     def __init__(self, features=None):
-        self.features_ = features
-        if self.features_ is None:
-            self.features_ = []
-
-        self.num_features_ = len(self.features_)
+        self._columns = None
+        self._attributes = None
+        self._types = []
+        self._type_inds = np.zeros(0, dtype=np.intp)
+        self.num_features_ = 0
+        if features is not None:
+            self.extend(features)
+
+    def _init_columns(self, feature):
+        """Sets the columns of the bag from its first feature."""
+        if isinstance(feature, LocalFeature):
+            self._attributes = _LOCAL_COLUMNS
+        elif isinstance(feature, GlobalFeature):
+            self._attributes = _GLOBAL_COLUMNS
+        else:
+            raise ValueError(
+                "Can only add LocalFeatures or GlobalFeatures, got %s"
+                % (type(feature))
+            )
+        self._columns = {}
+        for name, attribute in self._attributes.items():
+            value = getattr(feature, attribute)
+            if name in ["key", "pose"] or value is None:
+                column = np.empty(0, dtype=object)
+            else:
+                value = np.asarray(value)
+                column = np.empty((0,) + value.shape, dtype=value.dtype)
+            self._columns[name] = column
+
+    def _reserve(self, num_features):
+        """Grows the column arrays to hold at least num_features rows."""
+        capacity = self._type_inds.shape[0]
+        if num_features <= capacity:
+            return
+        capacity = max(num_features, 2 * capacity, 16)
+        for name, column in self._columns.items():
+            grown = np.empty(
+                (capacity,) + column.shape[1:], dtype=column.dtype
+            )
+            grown[: self.num_features_] = column[: self.num_features_]
+            self._columns[name] = grown
+        type_inds = np.empty(capacity, dtype=np.intp)
+        type_inds[: self.num_features_] = self._type_inds[: self.num_features_]
+        self._type_inds = type_inds
+
+    def _set_column(self, name, rows, values):
+        """Writes values to rows of a column, promoting its dtype if needed."""
+        column = self._columns[name]
+        if column.dtype != object:
+            values = np.asarray(values)
+            if values.dtype == object or values.shape[1:] != column.shape[1:]:
+                raise ValueError(
+                    "Feature %s of shape %s does not match the shape %s of "
+                    "the bag" % (name, values.shape[1:], column.shape[1:])
+                )
+            if not np.can_cast(values.dtype, column.dtype):
+                column = column.astype(np.result_type(column, values))
+                self._columns[name] = column
+        column[rows] = values
+
+    def _type_index(self, feature_type):
+        """Returns the index of a feature type in the types of the bag."""
+        if feature_type not in self._types:
+            self._types.append(feature_type)
+        return self._types.index(feature_type)
 
     def add(self, feature):
         """Add a new feature to the bag.
@@ -128,8 +213,7 @@ class BagOfFeatures:
         feature : :obj:`Feature`
             feature to add
         """
-        self.features_.append(feature)
-        self.num_features_ = len(self.features_)
+        self.extend([feature])
 
     def extend(self, features):
         """Add a list of features to the bag.
@@ -138,13 +222,55 @@ class BagOfFeatures:
         ----------
         feature : :obj:`list` of :obj:`Feature`
             features to add
+
+        Raises
+        ------
+        ValueError
+            If the features are not all local or all global features of the
+            same shapes as the features in the bag.
         """
-        self.features_.extend(features)
-        self.num_features_ = len(self.features_)
+        features = list(features)
+        if len(features) == 0:
+            return
+        if self._columns is None:
+            self._init_columns(features[0])
+        kind = LocalFeature if "keypoint" in self._columns else GlobalFeature
+        for feature in features:
+            if not isinstance(feature, kind):
+                raise ValueError(
+                    "Cannot mix local and global features in a bag"
+                )
+
+        start = self.num_features_
+        end = start + len(features)
+        self._reserve(end)
+        for name, attribute in self._attributes.items():
+            values = [getattr(f, attribute) for f in features]
+            if self._columns[name].dtype == object:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+                values = column
+            self._set_column(name, slice(start, end), values)
+        self._type_inds[start:end] = [
+            self._type_index(type(f)) for f in features
+        ]
+        self.num_features_ = end
+
+    def _column(self, name):
+        """Returns a read-only view of the filled rows of a column."""
+        if self._columns is None or name not in self._columns:
+            if self._columns is not None and self.num_features_ > 0:
+                raise ValueError("Features in the bag have no %s" % (name))
+            return np.zeros(0)
+        view = self._columns[name][: self.num_features_]
+        view.flags.writeable = False
+        return view
 
     def feature(self, index):
         """Returns a feature.
 
+        The arrays of the feature are read-only views into the bag.
+
         Parameters
         ----------
         index : int
@@ -156,7 +282,11 @@ class BagOfFeatures:
         """
         if index < 0 or index >= self.num_features_:
             raise ValueError("Index %d out of range" % (index))
-        return self.features_[index]
+        feature_type = self._types[self._type_inds[index]]
+        feature = feature_type.__new__(feature_type)
+        for name, attribute in self._attributes.items():
+            setattr(feature, attribute, self._column(name)[index])
+        return feature
 
     def feature_subset(self, indices):
         """Returns some subset of the features.
@@ -174,7 +304,12 @@ class BagOfFeatures:
             indices = indices.tolist()
         if not isinstance(indices, list):
             raise ValueError("Can only index with lists")
-        return [self.features_[i] for i in indices]
+        return [self.feature(i) for i in indices]
+
+    @property
+    def features(self):
+        """:obj:`list` of :obj:`Feature` : The features in the bag."""
+        return self.feature_subset(list(range(self.num_features_)))
 
     @property
     def num_features(self):
@@ -183,19 +318,261 @@ class BagOfFeatures:
     @property
     def descriptors(self):
         """Make a nice array of the descriptors"""
-        return np.array([f.descriptor for f in self.features_])
+        return self._column("descriptor")
 
     @property
     def reference_frames(self):
         """Make a nice array of the reference frames"""
-        return np.array([f.reference_frame for f in self.features_])
+        return self._column("reference_frame")
 
     @property
     def keypoints(self):
         """Make a nice array of the keypoints"""
-        return np.array([f.keypoint for f in self.features_])
+        return self._column("keypoint")
 
     @property
     def normals(self):
         """Make a nice array of the normals"""
-        return np.array([f.normal for f in self.features_])
+        return self._column("normal")
+
+    @property
+    def keys(self):
+        """Make a nice array of the keys of global features"""
+        return self._column("key")
+
+    @property
+    def poses(self):
+        """Make a nice array of the poses of global features"""
+        return self._column("pose")
+
+    @staticmethod
+    def from_arrays(
+        descriptors,
+        keypoints=None,
+        normals=None,
+        reference_frames=None,
+        keys=None,
+        poses=None,
+        feature_type=None,
+    ):
+        """Creates a bag of local or global features from arrays with one
+        row per feature, without creating intermediate feature objects.
+
+        Parameters
+        ----------
+        descriptors : :obj:`numpy.ndarray`
+            NxD descriptors of the features
+        keypoints : :obj:`numpy.ndarray`
+            Nx3 keypoints of local features
+        normals : :obj:`numpy.ndarray`
+            Nx3 normals of local features
+        reference_frames : :obj:`numpy.ndarray`
+            reference frames of local features
+        keys : :obj:`list` of :obj:`str`
+            keys of global features
+        poses : :obj:`list` of :obj:`RigidTransform`
+            poses of global features
+        feature_type : :obj:`type`
+            the class of the features. Defaults to LocalFeature, or to
+            GlobalFeature if keys are given
+
+        Returns
+        -------
+        :obj:`BagOfFeatures`
+            the bag of features
+
+        Raises
+        ------
+        ValueError
+            If the arrays have different numbers of rows, arrays of local
+            features are mixed with keys or poses, poses are given without
+            keys, or feature_type is not of the kind given by the arrays.
+        """
+        local_arrays = [keypoints, normals, reference_frames]
+        if keys is None and poses is not None:
+            raise ValueError("Poses of global features require keys")
+        if keys is not None and any(a is not None for a in local_arrays):
+            raise ValueError(
+                "Cannot mix keys and poses of global features with "
+                "keypoints, normals or reference frames of local features"
+            )
+        kind = GlobalFeature if keys is not None else LocalFeature
+        if feature_type is not None and not issubclass(feature_type, kind):
+            raise ValueError(
+                "Feature type %s is not a %s"
+                % (feature_type.__name__, kind.__name__)
+            )
+
+        descriptors = np.asarray(descriptors)
+        num_features = descriptors.shape[0]
+        if keys is not None:
+            feature_type = feature_type or GlobalFeature
+            columns = {"key": keys, "descriptor": descriptors, "pose": poses}
+        else:
+            feature_type = feature_type or LocalFeature
+            columns = {
+                "descriptor": descriptors,
+                "reference_frame": reference_frames,
+                "keypoint": keypoints,
+                "normal": normals,
+            }
+
+        bag = BagOfFeatures()
+        bag._attributes = (
+            _GLOBAL_COLUMNS if keys is not None else _LOCAL_COLUMNS
+        )
+        bag._columns = {}
+        for name, values in columns.items():
+            if values is None or name in ["key", "pose"]:
+                column = np.empty(num_features, dtype=object)
+                if values is not None:
+                    column[:] = list(values)
+            else:
+                column = np.array(values)
+            if column.shape[0] != num_features:
+                raise ValueError(
+                    "Got %d %ss for %d features"
+                    % (column.shape[0], name, num_features)
+                )
+            bag._columns[name] = column
+        bag._types = [feature_type]
+        bag._type_inds = np.zeros(num_features, dtype=np.intp)
+        bag.num_features_ = num_features
+        return bag
+
+    def _arrays(self):
+        """Returns the arrays to save the bag of features with, by name.
+
+        Raises
+        ------
+        ValueError
+            If the bag has object attributes other than keys, poses and
+            missing values.
+        """
+        arrays = {
+            "types": np.array([t.__name__ for t in self._types], dtype=str),
+            "type_inds": self._type_inds[: self.num_features_],
+        }
+        for name in (self._columns or {}).keys():
+            column = self._column(name)
+            if column.dtype != object:
+                arrays[name] = column
+            elif name == "key":
+                arrays[name] = column.astype(str)
+            elif name == "pose":
+                has_pose = np.array([T is not None for T in column])
+                poses = [
+                    T if T is not None else RigidTransform() for T in column
+                ]
+                arrays["has_pose"] = has_pose
+                arrays["pose_rotations"] = np.array(
+                    [T.rotation for T in poses]
+                )
+                arrays["pose_translations"] = np.array(
+                    [T.translation for T in poses]
+                )
+                arrays["pose_from_frames"] = np.array(
+                    [T.from_frame for T in poses], dtype=str
+                )
+                arrays["pose_to_frames"] = np.array(
+                    [T.to_frame for T in poses], dtype=str
+                )
+            elif any(v is not None for v in column):
+                raise ValueError("Cannot save %ss of type object" % (name))
+        return arrays
+
+    def save(self, filename):
+        """Save the bag of features to a .npz file.
+
+        Parameters
+        ----------
+        filename : :obj:`str`
+            The file to save the features to.
+
+        Raises
+        ------
+        ValueError
+            If filename's extension isn't .npz, or the bag has object
+            attributes other than keys, poses and missing values.
+        """
+        _, file_ext = os.path.splitext(filename)
+        if file_ext.lower() != FEATURES_EXTENSION:
+            raise ValueError(
+                f"Extension {file_ext} not supported for BagOfFeatures. "
+                f"Must be stored with extension {FEATURES_EXTENSION}"
+            )
+        np.savez(filename, **self._arrays())
+
+    @staticmethod
+    def load(filename):
+        """Load a bag of features from a .npz file.
+
+        Parameters
+        ----------
+        filename : :obj:`str`
+            The file to load the features from.
+
+        Returns
+        -------
+        :obj:`BagOfFeatures`
+            The bag of features read from the file.
+
+        Raises
+        ------
+        ValueError
+            If filename's extension isn't .npz.
+        """
+        _, file_ext = os.path.splitext(filename)
+        if file_ext.lower() != FEATURES_EXTENSION:
+            raise ValueError(
+                f"Extension {file_ext} not supported for BagOfFeatures. "
+                f"Can only load extension {FEATURES_EXTENSION}"
+            )
+        with np.load(filename) as data:
+            return BagOfFeatures._from_arrays(data)
+
+    @staticmethod
+    def _from_arrays(data):
+        """Creates a bag of features from the arrays returned by _arrays.
+
+        Parameters
+        ----------
+        data : :obj:`dict`
+            the arrays by name, e.g. an opened .npz file
+        """
+        bag = BagOfFeatures()
+        if "descriptor" not in data:
+            return bag
+        if "key" in data:
+            poses = None
+            if "has_pose" in data:
+                poses = [
+                    RigidTransform(R, t, from_frame, to_frame)
+                    if has_pose
+                    else None
+                    for R, t, from_frame, to_frame, has_pose in zip(
+                        data["pose_rotations"],
+                        data["pose_translations"],
+                        data["pose_from_frames"],
+                        data["pose_to_frames"],
+                        data["has_pose"],
+                    )
+                ]
+            bag = BagOfFeatures.from_arrays(
+                data["descriptor"],
+                keys=[str(k) for k in data["key"]],
+                poses=poses,
+            )
+        else:
+            bag = BagOfFeatures.from_arrays(
+                data["descriptor"],
+                keypoints=data.get("keypoint"),
+                normals=data.get("normal"),
+                reference_frames=data.get("reference_frame"),
+            )
+        bag._types = [
+            _FEATURE_TYPES.get(str(name), bag._types[0])
+            for name in data["types"]
+        ]
+        bag._type_inds = np.array(data["type_inds"], dtype=np.intp)
+        return bag
@@ -0,0 +1,304 @@
+"""
+In-process tree of rigid transformations between named frames.
+"""
+import bisect
+import collections
+import threading
+
+from .rigid_transformations import RigidTransform
+
+
+class FrameGraph(object):
+    """A tree of rigid transformations between named frames of reference,
+    in the spirit of tf2 but without any dependence on ROS.
+
+    Each edge of the tree stores either a single static transform or a
+    history of timestamped transforms. Lookups between any two frames in
+    the tree find the path between them and compose the transforms along
+    it. Paths and the latest composed transforms are cached, and updating
+    an edge only invalidates the cached lookups whose path uses that edge.
+
+    Examples
+    --------
+    >>> graph = FrameGraph()
+    >>> graph.add_transform(T_camera_world)
+    >>> graph.add_transform(T_object_camera, stamp=0.0)
+    >>> graph.add_transform(T_object_camera_2, stamp=1.0)
+    >>> T_object_world = graph.lookup("object", "world", stamp=0.5)
+    """
+
+    def __init__(self, max_history=100):
+        """Initialize an empty FrameGraph.
+
+        Parameters
+        ----------
+        max_history : int
+            The maximum number of timestamped transforms to keep per edge.
+            Older transforms are discarded first. If None, the history is
+            unbounded.
+        """
+        if max_history is not None and max_history < 1:
+            raise ValueError("max_history must be positive or None")
+        self._max_history = max_history
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """Removes all frames and transforms from the graph."""
+        with self._lock:
+            # edge key (from_frame, to_frame) -> (stamps, transforms), where
+            # stamps is None for static transforms
+            self._edges = {}
+            self._neighbors = collections.defaultdict(set)
+            self._path_cache = {}
+            self._tf_cache = {}
+            self._edge_dependents = collections.defaultdict(set)
+
+    @property
+    def frames(self):
+        """:obj:`list` of :obj:`str` : The frames in the graph."""
+        with self._lock:
+            return sorted(f for f, n in self._neighbors.items() if n)
+
+    @property
+    def edges(self):
+        """:obj:`list` of :obj:`tuple` of :obj:`str` : The (from_frame,
+        to_frame) pairs of the transforms stored in the graph.
+        """
+        with self._lock:
+            return list(self._edges.keys())
+
+    def has_frame(self, frame):
+        """Returns True if the frame is part of the graph."""
+        with self._lock:
+            return len(self._neighbors.get(frame, ())) > 0
+
+    def add_transform(self, T, stamp=None):
+        """Adds or updates the transform between two frames.
+
+        A transform with no stamp is static and replaces any history stored
+        for the edge. A timestamped transform is inserted into the history of
+        the edge, replacing a static transform or one with the same stamp.
+        The transform may be given in either direction of an existing edge.
+
+        Parameters
+        ----------
+        T : :obj:`RigidTransform`
+            The transform from T.from_frame to T.to_frame.
+
+        stamp : float
+            The time of the transform, or None for a static transform.
+
+        Raises
+        ------
+        ValueError
+            If T is not a RigidTransform, maps a frame to itself, or would
+            add a second path between two frames that are already connected.
+        """
+        if not isinstance(T, RigidTransform):
+            raise ValueError("Can only add RigidTransforms to a FrameGraph")
+        if T.from_frame == T.to_frame:
+            raise ValueError(
+                f"Cannot add transform from frame {T.from_frame} to itself"
+            )
+
+        with self._lock:
+            key = (T.from_frame, T.to_frame)
+            # store a copy so later changes to the caller's transform do not
+            # bypass the caches
+            if key not in self._edges and key[::-1] in self._edges:
+                key = key[::-1]
+                T = T.inverse()
+            else:
+                T = T.copy()
+
+            if key not in self._edges:
+                if self._find_path(key[0], key[1]) is not None:
+                    raise ValueError(
+                        f"Frames {key[0]} and {key[1]} are already connected. "
+                        "Adding the transform would create a cycle"
+                    )
+                self._neighbors[key[0]].add(key[1])
+                self._neighbors[key[1]].add(key[0])
+                self._edges[key] = (None, None)
+            else:
+                self._invalidate(key)
+
+            stamps, transforms = self._edges[key]
+            if stamp is None:
+                self._edges[key] = (None, [T])
+                return
+            if stamps is None:
+                stamps, transforms = [], []
+
+            stamp = float(stamp)
+            ind = bisect.bisect_left(stamps, stamp)
+            if ind < len(stamps) and stamps[ind] == stamp:
+                transforms[ind] = T
+            else:
+                stamps.insert(ind, stamp)
+                transforms.insert(ind, T)
+            if (
+                self._max_history is not None
+                and len(stamps) > self._max_history
+            ):
+                del stamps[: -self._max_history]
+                del transforms[: -self._max_history]
+            self._edges[key] = (stamps, transforms)
+
+    def remove_transform(self, from_frame, to_frame):
+        """Removes the edge between two frames in either direction.
+
+        Raises
+        ------
+        ValueError
+            If there is no edge between the frames.
+        """
+        with self._lock:
+            key = (from_frame, to_frame)
+            if key not in self._edges:
+                key = key[::-1]
+            if key not in self._edges:
+                raise ValueError(
+                    f"No transform between {from_frame} and {to_frame}"
+                )
+            self._invalidate(key, remove=True)
+            del self._edges[key]
+            self._neighbors[key[0]].discard(key[1])
+            self._neighbors[key[1]].discard(key[0])
+
+    def can_lookup(self, from_frame, to_frame):
+        """Returns True if the two frames are connected in the graph."""
+        with self._lock:
+            return self._cached_path(from_frame, to_frame) is not None
+
+    def lookup(self, from_frame, to_frame, stamp=None):
+        """Finds the transform between two frames of the graph.
+
+        Parameters
+        ----------
+        from_frame : :obj:`str`
+            The frame of the objects to transform.
+
+        to_frame : :obj:`str`
+            The frame to transform the objects into.
+
+        stamp : float
+            The time at which to look up the transform. Timestamped edges are
+            interpolated between the nearest stamps in their history, and
+            static edges hold at all times. If None, the latest transform of
+            every edge is used.
+
+        Returns
+        -------
+        :obj:`RigidTransform`
+            The transform from from_frame to to_frame. This is a new object
+            on every call, so callers may modify it freely.
+
+        Raises
+        ------
+        ValueError
+            If the frames are not connected, or stamp is outside the history
+            of a timestamped edge on the path.
+        """
+        with self._lock:
+            if stamp is None and (from_frame, to_frame) in self._tf_cache:
+                return self._tf_cache[(from_frame, to_frame)].copy()
+
+            path = self._cached_path(from_frame, to_frame)
+            if path is None:
+                raise ValueError(
+                    f"Cannot look up transform from {from_frame} to "
+                    f"{to_frame}: the frames are not connected"
+                )
+
+            T = RigidTransform(from_frame=from_frame, to_frame=from_frame)
+            for key, forward in path:
+                T_edge = self._edge_transform(key, stamp)
+                if not forward:
+                    T_edge = T_edge.inverse()
+                T = T_edge.dot(T)
+
+            if stamp is None:
+                self._tf_cache[(from_frame, to_frame)] = T.copy()
+            return T
+
+    def _edge_transform(self, key, stamp):
+        """Returns the transform stored for an edge at a given time."""
+        stamps, transforms = self._edges[key]
+        if stamps is None or stamp is None:
+            return transforms[-1]
+
+        stamp = float(stamp)
+        ind = bisect.bisect_left(stamps, stamp)
+        if ind < len(stamps) and stamps[ind] == stamp:
+            return transforms[ind]
+        if ind == 0 or ind == len(stamps):
+            raise ValueError(
+                f"Cannot extrapolate transform from {key[0]} to {key[1]} to "
+                f"time {stamp}. History spans [{stamps[0]}, {stamps[-1]}]"
+            )
+        t = (stamp - stamps[ind - 1]) / (stamps[ind] - stamps[ind - 1])
+        T = RigidTransform.interpolate(transforms[ind - 1], transforms[ind], t)
+        return T.as_frames(key[0], key[1])
+
+    def _cached_path(self, from_frame, to_frame):
+        """Returns the path between two frames as a list of (edge key,
+        forward) pairs, or None if the frames are not connected.
+        """
+        if from_frame == to_frame:
+            return []
+        pair = (from_frame, to_frame)
+        if pair in self._path_cache:
+            return self._path_cache[pair]
+        path = self._find_path(from_frame, to_frame)
+        if path is not None:
+            self._path_cache[pair] = path
+            for key, _ in path:
+                self._edge_dependents[key].add(pair)
+        return path
+
+    def _find_path(self, from_frame, to_frame):
+        """Finds the path between two frames with a breadth-first search."""
+        if from_frame == to_frame:
+            return []
+        parents = {from_frame: None}
+        queue = collections.deque([from_frame])
+        while queue:
+            frame = queue.popleft()
+            if frame == to_frame:
+                break
+            for neighbor in self._neighbors.get(frame, ()):
+                if neighbor not in parents:
+                    parents[neighbor] = frame
+                    queue.append(neighbor)
+        if to_frame not in parents:
+            return None
+
+        path = []
+        frame = to_frame
+        while parents[frame] is not None:
+            parent = parents[frame]
+            if (parent, frame) in self._edges:
+                path.append(((parent, frame), True))
+            else:
+                path.append(((frame, parent), False))
+            frame = parent
+        return path[::-1]
+
+    def _invalidate(self, key, remove=False):
+        """Drops the cached lookups whose path uses an edge. If the edge is
+        being removed, the cached paths through it are dropped as well.
+        """
+        dependents = self._edge_dependents.get(key, set())
+        for pair in dependents:
+            self._tf_cache.pop(pair, None)
+            if remove:
+                for other_key, _ in self._path_cache.pop(pair, ()):
+                    if other_key != key:
+                        self._edge_dependents[other_key].discard(pair)
+        if remove:
+            self._edge_dependents.pop(key, None)
+
+    def __contains__(self, frame):
+        return self.has_frame(frame)
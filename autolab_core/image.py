@@ -12,6 +12,7 @@ import PIL.Image as PImage
 import matplotlib.pyplot as plt
 
 import scipy.signal as ssg
+import scipy.ndimage as snd
 import scipy.ndimage.filters as sf
 import scipy.ndimage.interpolation as sni
 import scipy.ndimage.morphology as snm
@@ -22,7 +23,7 @@ import skimage.morphology as morph
 import skimage.transform as skt
 
 from .constants import MAX_DEPTH, MIN_DEPTH, MAX_IR, COLOR_IMAGE_EXTS
-from .points import PointCloud, NormalCloud, PointNormalCloud
+from .points import PointCloud, NormalCloud, PointNormalCloud, ImageCoords
 from .primitives import Contour
 
 BINARY_IM_MAX_VAL = np.iinfo(np.uint8).max
@@ -87,7 +88,7 @@ def imresize(image, size, interp="nearest"):
         raise ValueError('Invalid type for size "{}".'.format(type(size)))
 
     return skt.resize(
-        image.astype(np.float),
+        image.astype(np.float64),
         output_shape,
         order=skt_interp_map[interp],
         anti_aliasing=False,
@@ -548,13 +549,10 @@ class Image(object):
             A new Image of the same type whose data is the median of all of
             the images' data.
         """
-        images_data = np.array([image.data for image in images])
-        median_image_data = np.median(images_data, axis=0)
-
-        an_image = images[0]
-        return type(an_image)(
-            median_image_data.astype(an_image.data.dtype), an_image.frame
-        )
+        accumulator = ImageAccumulator(buffer_size=max(len(images), 2))
+        for image in images:
+            accumulator.add(image)
+        return accumulator.result("median")
 
     @staticmethod
     def min_images(images):
@@ -569,17 +567,12 @@ class Image(object):
         -------
         :obj:`Image`
             A new Image of the same type whose data is the min of all of
-            the images' data.
+            the images' nonzero data.
         """
-        images_data = np.array([image.data for image in images])
-        images_data[images_data == 0] = np.inf
-        min_image_data = np.min(images_data, axis=0)
-        min_image_data[min_image_data == np.inf] = 0.0
-
-        an_image = images[0]
-        return type(an_image)(
-            min_image_data.astype(an_image.data.dtype), an_image.frame
-        )
+        accumulator = ImageAccumulator(ignore_zeros=True, track_median=False)
+        for image in images:
+            accumulator.add(image)
+        return accumulator.result("min")
 
     def __getitem__(self, indices):
         """Index the image's data array.
@@ -678,16 +671,55 @@ class Image(object):
         return type(self)(data.astype(self.type), self.frame)
 
     def copy(self):
-        """Returns a copy of this image.
+        """Returns a copy of this image. The copy owns its data, so this is
+        also how a writeable image is obtained from a cropped view.
 
         Returns
         -------
         :obj:`Image`
             copy of this image
         """
-        return type(self)(self.data.copy(), self.frame)
+        return self._new_like(self._data.copy())
+
+    def _new_like(self, data, frame=None):
+        """Creates an image of the same type and with the same settings
+        (e.g. encoding) as this one around data that is already known to be
+        valid for this type. Validation and preprocessing are skipped, and
+        the data is not copied.
+
+        Parameters
+        ----------
+        data : :obj:`numpy.ndarray`
+            3D data array of the same dtype and channels as this image.
+
+        frame : :obj:`str`
+            The frame of the new image. Defaults to the frame of this image.
+
+        Returns
+        -------
+        :obj:`Image`
+            A new Image of the same type.
+        """
+        image = type(self).__new__(type(self))
+        image.__dict__.update(self.__dict__)
+        image._clear_cache()
+        image._data = data
+        if frame is not None:
+            image._frame = frame
+        return image
+
+    def _clear_cache(self):
+        """Clears any values cached from the image data."""
+        pass
+
+    @property
+    def is_view(self):
+        """bool : True if the image is a read-only view into the data of
+        another image, as returned by crop(..., copy=False).
+        """
+        return not self._data.flags.writeable
 
-    def crop(self, height, width, center_i=None, center_j=None):
+    def crop(self, height, width, center_i=None, center_j=None, copy=True):
         """Crop the image centered around center_i, center_j.
 
         Parameters
@@ -706,6 +738,12 @@ class Image(object):
             The center width point at which to crop. If not specified,
             the center of the image is used.
 
+        copy : bool
+            If False and the crop lies inside the image, the cropped image
+            is a read-only view of this image's data and no data is copied.
+            Use copy() on the result to get a writeable image. Crops that
+            extend past the image border are always copied and zero-padded.
+
         Returns
         -------
         :obj:`Image`
@@ -719,27 +757,38 @@ class Image(object):
         if center_j is None:
             center_j = float(self.width) / 2
 
-        # crop using PIL
-        desired_start_row = int(np.floor(center_i - float(height) / 2))
-        desired_end_row = int(np.floor(center_i + float(height) / 2))
-        desired_start_col = int(np.floor(center_j - float(width) / 2))
-        desired_end_col = int(np.floor(center_j + float(width) / 2))
-
-        pil_im = PImage.fromarray(self.data)
-        cropped_pil_im = pil_im.crop(
-            (
-                desired_start_col,
-                desired_start_row,
-                desired_end_col,
-                desired_end_row,
-            )
-        )
-        crop_data = np.array(cropped_pil_im)
+        start_row = int(np.floor(center_i - float(height) / 2))
+        end_row = start_row + height
+        start_col = int(np.floor(center_j - float(width) / 2))
+        end_col = start_col + width
 
-        if crop_data.shape[0] != height or crop_data.shape[1] != width:
-            raise ValueError("Crop dims are incorrect")
+        if (
+            start_row >= 0
+            and start_col >= 0
+            and end_row <= self.height
+            and end_col <= self.width
+        ):
+            crop_data = self._data[start_row:end_row, start_col:end_col]
+            if copy:
+                crop_data = crop_data.copy()
+            else:
+                crop_data.flags.writeable = False
+            return self._new_like(crop_data)
 
-        return type(self)(crop_data.astype(self.data.dtype), self._frame)
+        # zero-pad the region outside of the image
+        crop_data = np.zeros(
+            [height, width, self.channels], dtype=self._data.dtype
+        )
+        src_rows = np.clip([start_row, end_row], 0, self.height)
+        src_cols = np.clip([start_col, end_col], 0, self.width)
+        if src_rows[1] > src_rows[0] and src_cols[1] > src_cols[0]:
+            src = (slice(*src_rows), slice(*src_cols))
+            dst = (
+                slice(*(src_rows - start_row)),
+                slice(*(src_cols - start_col)),
+            )
+            crop_data[dst] = self._data[src]
+        return self._new_like(crop_data)
 
     def focus(self, height, width, center_i=None, center_j=None):
         """Zero out all of the image outside of a crop box.
@@ -776,11 +825,11 @@ class Image(object):
         start_col = int(max(0, center_j - width / 2))
         end_col = int(min(self.width - 1, center_j + width / 2))
 
-        focus_data = np.zeros(self._data.shape)
+        focus_data = np.zeros(self._data.shape, dtype=self._data.dtype)
         focus_data[
             start_row : end_row + 1, start_col : end_col + 1
         ] = self._data[start_row : end_row + 1, start_col : end_col + 1]
-        return type(self)(focus_data.astype(self._data.dtype), self._frame)
+        return self._new_like(focus_data)
 
     def center_nonzero(self):
         """Recenters the image on the mean of the coordinates of nonzero pixels.
@@ -1035,6 +1084,7 @@ class ColorImage(Image):
         """
         Image.__init__(self, data, frame)
         self._encoding = encoding
+        self._bgmodels = {}
         if self._encoding != "rgb8" and self._encoding != "bgr8":
             raise ValueError(
                 "Illegal encoding: %s. Please use rgb8 or bgr8"
@@ -1049,6 +1099,10 @@ class ColorImage(Image):
             self.g_axis = 1
             self.b_axis = 0
 
+    def _clear_cache(self):
+        """Clears the cached background models."""
+        self._bgmodels = {}
+
     def _check_valid_data(self, data):
         """Checks that the given data is a uint8 array with one or three
         channels.
@@ -1275,34 +1329,22 @@ class ColorImage(Image):
                 ignore_black=ignore_black, use_hsv=use_hsv, scale=scale
             )
 
-        # get the bounds
-        lower_bound = np.array(
-            [bgmodel[i] - tolerance for i in range(self.channels)]
-        )
-        upper_bound = np.array(
-            [bgmodel[i] + tolerance for i in range(self.channels)]
+        # threshold against the bounds, keeping black pixels as background
+        data = self._background_data(use_hsv)
+        bgmodel = np.asarray(bgmodel)
+        foreground = np.any(
+            np.abs(data.astype(np.int16) - bgmodel) > tolerance, axis=2
         )
-        orig_zero_indices = np.where(np.sum(self._data, axis=2) == 0)
-
-        # threshold
-        binary_data = cv2.inRange(self.data, lower_bound, upper_bound)
-        binary_data[:, :,] = (
-            BINARY_IM_MAX_VAL
-            - binary_data[
-                :,
-                :,
-            ]
-        )
-        binary_data[
-            orig_zero_indices[0],
-            orig_zero_indices[1],
-        ] = 0.0
-        binary_im = BinaryImage(binary_data.astype(np.uint8), frame=self.frame)
+        foreground &= np.any(self._data > 0, axis=2)
+        binary_data = BINARY_IM_MAX_VAL * foreground.astype(np.uint8)
+        binary_im = BinaryImage(binary_data, frame=self.frame)
         return binary_im
 
     def background_model(self, ignore_black=True, use_hsv=False, scale=8):
         """Creates a background model for the given image. The background
-        color is given by the modes of each channel's histogram.
+        color is given by the modes of each channel's histogram. Models are
+        cached on the image, so repeated calls with the same parameters are
+        free.
 
         Parameters
         ----------
@@ -1324,35 +1366,136 @@ class ColorImage(Image):
             A list containing the red, green, and blue channel modes of the
             background.
         """
-        # hsv color
+        key = (ignore_black, use_hsv, scale)
+        if key not in self._bgmodels:
+            self._bgmodels[key] = ColorImage._channel_modes(
+                self._background_data(use_hsv)[np.newaxis, ...],
+                self._data[np.newaxis, ...],
+                ignore_black,
+                scale,
+            )[0].tolist()
+        return list(self._bgmodels[key])
+
+    @staticmethod
+    def foreground_mask_batch(
+        color_ims,
+        tolerance,
+        ignore_black=True,
+        use_hsv=False,
+        scale=8,
+        bgmodel=None,
+    ):
+        """Creates foreground masks for a batch of color images of the same
+        shape in a single vectorized pass.
+
+        Parameters
+        ----------
+        color_ims : :obj:`list` of :obj:`ColorImage`
+            The images to mask.
+
+        tolerance : int
+            A +/- level from the detected mean backgroud color. Pixels withing
+            this range will be classified as background pixels and masked out.
+
+        ignore_black : bool
+            If True, the zero pixels will be ignored
+            when computing the background model.
+
+        use_hsv : bool
+            If True, images will be converted to HSV for background model
+            generation.
+
+        scale : int
+            Size of background histogram bins.
+
+        bgmodel : :obj:`list` of int
+            A background model shared by all images. If this is None, a
+            background model will be generated for each image using the
+            other parameters.
+
+        Returns
+        -------
+        :obj:`list` of :obj:`BinaryImage`
+            Binary images that mask out the background of each ColorImage.
+        """
+        if len(color_ims) == 0:
+            return []
+        data = np.array([im._background_data(use_hsv) for im in color_ims])
+        raw_data = np.array([im.raw_data for im in color_ims])
+
+        # get background models
+        if bgmodel is None:
+            bgmodels = ColorImage._channel_modes(
+                data, raw_data, ignore_black, scale
+            )
+        else:
+            bgmodels = np.tile(np.asarray(bgmodel), [len(color_ims), 1])
+        bgmodels = bgmodels[:, np.newaxis, np.newaxis, :]
+
+        # threshold
+        foreground = np.any(
+            np.abs(data.astype(np.int16) - bgmodels) > tolerance, axis=3
+        )
+        foreground &= np.any(raw_data > 0, axis=3)
+        binary_data = BINARY_IM_MAX_VAL * foreground.astype(np.uint8)
+        return [
+            BinaryImage(d, frame=im.frame)
+            for d, im in zip(binary_data, color_ims)
+        ]
+
+    def _background_data(self, use_hsv):
+        """Returns the image data in red, green, blue channel order, or
+        converted to HSV with hue scaled to the full uint8 range."""
         if use_hsv:
-            pil_im = PImage.fromarray(self._data)
-            pil_im = pil_im.convert("HSV")
-
-        # find the black pixels
-        nonblack_pixels = np.where(np.sum(self.data, axis=2) > 0)
-        r_data = self.r_data
-        g_data = self.g_data
-        b_data = self.b_data
-        if ignore_black:
-            r_data = r_data[nonblack_pixels[0], nonblack_pixels[1]]
-            g_data = g_data[nonblack_pixels[0], nonblack_pixels[1]]
-            b_data = b_data[nonblack_pixels[0], nonblack_pixels[1]]
+            conversion = cv2.COLOR_RGB2HSV_FULL
+            if self._encoding == "bgr8":
+                conversion = cv2.COLOR_BGR2HSV_FULL
+            return cv2.cvtColor(self._data, conversion)
+        if self._encoding == "bgr8":
+            return self._data[:, :, ::-1]
+        return self._data
+
+    @staticmethod
+    def _channel_modes(data, raw_data, ignore_black, scale):
+        """Computes the histogram mode of each channel of a stack of images
+        with a single call to np.bincount.
+
+        Parameters
+        ----------
+        data : :obj:`numpy.ndarray` of uint8
+            NxHxWx3 stack of the channel data to model.
 
-        # generate histograms for each channel
-        bounds = (0, np.iinfo(np.uint8).max + 1)
-        num_bins = bounds[1] / scale
-        r_hist, _ = np.histogram(r_data, bins=num_bins, range=bounds)
-        g_hist, _ = np.histogram(g_data, bins=num_bins, range=bounds)
-        b_hist, _ = np.histogram(b_data, bins=num_bins, range=bounds)
-        hists = (r_hist, g_hist, b_hist)
+        raw_data : :obj:`numpy.ndarray` of uint8
+            NxHxWx3 stack of the original image data, used to find black
+            pixels.
 
-        # find the thesholds as the modes of the image
-        modes = [0 for i in range(self.channels)]
-        for i in range(self.channels):
-            modes[i] = scale * np.argmax(hists[i])
+        ignore_black : bool
+            If True, the zero pixels will be ignored.
+
+        scale : int
+            Size of histogram bins.
 
-        return modes
+        Returns
+        -------
+        :obj:`numpy.ndarray` of int
+            Nx3 array of the channel modes of each image.
+        """
+        num_ims, num_channels = data.shape[0], data.shape[3]
+        num_bins = int(np.ceil((np.iinfo(np.uint8).max + 1) / scale))
+
+        # offset the quantized values so each image and channel has its own
+        # range of bins
+        im_inds = np.arange(num_ims).reshape(-1, 1, 1, 1)
+        bins = (data // scale).astype(np.int64)
+        bins += num_bins * np.arange(num_channels)
+        bins += num_bins * num_channels * im_inds
+        if ignore_black:
+            bins = bins[np.any(raw_data > 0, axis=3)]
+        hists = np.bincount(
+            bins.ravel(), minlength=num_ims * num_channels * num_bins
+        )
+        hists = hists.reshape(num_ims, num_channels, num_bins)
+        return scale * np.argmax(hists, axis=2)
 
     def draw_box(self, box):
         """Draw a white box on the image.
@@ -1475,7 +1618,7 @@ class ColorImage(Image):
 
         # fill in zero pixels with inpainted and resized image
         filled_data = inpainted_im.resize(orig_shape, interp="bilinear").data
-        new_data = self.data
+        new_data = self.data.copy()
         new_data[self.data == 0] = filled_data[self.data == 0]
         return ColorImage(new_data, frame=self.frame)
 
@@ -1965,26 +2108,201 @@ class DepthImage(Image):
         """
         return DepthImage(self.data.astype(np.float32), frame=self.frame)
 
-    def point_normal_cloud(self, camera_intr):
+    def sample_depths(self, pixels, ignore_zeros=True):
+        """Samples the depth at fractional pixel locations with bilinear
+        interpolation.
+
+        Parameters
+        ----------
+        pixels : :obj:`numpy.ndarray` or :obj:`autolab_core.ImageCoords`
+            Nx2 array of (row, column) pixel locations, or image coordinates
+            in the frame of this image.
+
+        ignore_zeros : bool
+            If True, zero (missing) depths are left out of the interpolation
+            and the weights of the remaining neighbors are renormalized.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            N array of interpolated depths. Locations outside the image, or
+            with no valid neighbors, have zero depth.
+
+        Raises
+        ------
+        ValueError
+            If the image coordinates are not in the frame of this image.
+        """
+        if isinstance(pixels, ImageCoords):
+            if pixels.frame != self._frame:
+                raise ValueError(
+                    "Cannot sample pixels in frame %s from image in frame %s"
+                    % (pixels.frame, self._frame)
+                )
+            rows = pixels.i_coords.astype(np.float64)
+            cols = pixels.j_coords.astype(np.float64)
+        else:
+            pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+            rows, cols = pixels[:, 0], pixels[:, 1]
+
+        depths = np.zeros(rows.shape[0], dtype=self._data.dtype)
+        valid = (
+            (rows >= 0)
+            & (rows <= self.height - 1)
+            & (cols >= 0)
+            & (cols <= self.width - 1)
+        )
+        rows = rows[valid]
+        cols = cols[valid]
+
+        # gather the four neighbors and their bilinear weights
+        r0 = np.clip(np.floor(rows).astype(int), 0, max(self.height - 2, 0))
+        c0 = np.clip(np.floor(cols).astype(int), 0, max(self.width - 2, 0))
+        r1 = np.minimum(r0 + 1, self.height - 1)
+        c1 = np.minimum(c0 + 1, self.width - 1)
+        dr = rows - r0
+        dc = cols - c0
+        data = self._data[:, :, 0]
+        values = np.array(
+            [data[r0, c0], data[r0, c1], data[r1, c0], data[r1, c1]]
+        )
+        weights = np.array(
+            [
+                (1 - dr) * (1 - dc),
+                (1 - dr) * dc,
+                dr * (1 - dc),
+                dr * dc,
+            ]
+        )
+        if ignore_zeros:
+            weights *= values != 0
+        total_weights = np.sum(weights, axis=0)
+        weighted_depths = np.sum(weights * values, axis=0)
+        np.divide(
+            weighted_depths,
+            total_weights,
+            out=weighted_depths,
+            where=total_weights > 0,
+        )
+        weighted_depths[total_weights == 0] = 0
+        depths[valid] = weighted_depths
+        return depths
+
+    def point_normal_cloud(
+        self, camera_intr, roi=None, stride=1, dtype=np.float64
+    ):
         """Computes a PointNormalCloud from the depth image.
 
+        Points and normals are computed directly from the depth data for
+        pinhole intrinsics, without intermediate point and normal cloud
+        images. Normals are the cross product of 3x3 Sobel derivatives of
+        the point image, as in PointCloudImage.normal_cloud_im.
+
         Parameters
         ----------
         camera_intr : :obj:`CameraIntrinsics`
             The camera parameters on which this depth image was taken.
 
+        roi : :obj:`autolab_core.Box`, optional
+            A box (in row, column coordinates) of pixels to compute points
+            and normals for. Defaults to the full image.
+
+        stride : int
+            Only every stride-th row and column of the region is computed.
+
+        dtype : :obj:`numpy.dtype`
+            Float type of the output, e.g. np.float32 for faster
+            computation.
+
         Returns
         -------
         :obj:`autolab_core.PointNormalCloud`
-            A PointNormalCloud created from the depth image.
-        """
-        point_cloud_im = camera_intr.deproject_to_image(self)
-        normal_cloud_im = point_cloud_im.normal_cloud_im()
-        point_cloud = point_cloud_im.to_point_cloud()
-        normal_cloud = normal_cloud_im.to_normal_cloud()
-        return PointNormalCloud(
-            point_cloud.data, normal_cloud.data, frame=self._frame
+            A PointNormalCloud created from the depth image, with points in
+            row-major pixel order.
+
+        Raises
+        ------
+        ValueError
+            If the region is empty or the depth image is not in the same
+            reference frame as the camera.
+        """
+        if stride < 1:
+            raise ValueError("Stride must be a positive integer")
+
+        # region of pixels to compute
+        start_row, start_col, end_row, end_col = 0, 0, self.height, self.width
+        if roi is not None:
+            start_row, start_col = np.round(roi.min_pt[:2]).astype(int)
+            end_row = start_row + roi.height
+            end_col = start_col + roi.width
+            start_row, end_row = np.clip([start_row, end_row], 0, self.height)
+            start_col, end_col = np.clip([start_col, end_col], 0, self.width)
+        if end_row <= start_row or end_col <= start_col:
+            raise ValueError("Region of interest is empty")
+        region = (slice(start_row, end_row), slice(start_col, end_col))
+
+        # intrinsics without deprojection rays take the image-based path
+        if not hasattr(camera_intr, "deprojection_rays"):
+            point_cloud_im = camera_intr.deproject_to_image(self)
+            normal_cloud_im = point_cloud_im.normal_cloud_im()
+            points = point_cloud_im.raw_data[region][::stride, ::stride]
+            normals = normal_cloud_im.raw_data[region][::stride, ::stride]
+            return PointNormalCloud(
+                points.reshape(-1, 3).T.astype(dtype),
+                normals.reshape(-1, 3).T.astype(dtype),
+                frame=self._frame,
+            )
+
+        if self._frame != camera_intr.frame:
+            raise ValueError(
+                "Cannot deproject points in frame %s from camera with frame %s"
+                % (self._frame, camera_intr.frame)
+            )
+
+        # deproject the region plus a one pixel border, reflected at the
+        # image border as in cv2.Sobel
+        def reflected_range(start, end, size):
+            inds = np.abs(np.arange(start - 1, end + 1))
+            return np.where(inds >= size, 2 * (size - 1) - inds, inds)
+
+        rows = reflected_range(start_row, end_row, self.height)[:, np.newaxis]
+        cols = reflected_range(start_col, end_col, self.width)
+        rays = camera_intr.deprojection_rays(
+            self.height, self.width, dtype=dtype
         )
+        depth = self._data[rows, cols, 0].astype(dtype)
+        point_data = rays[:, rows, cols]
+        point_data *= depth
+
+        # separable 3x3 Sobel derivatives at the strided pixels
+        height, width = end_row - start_row, end_col - start_col
+        up = point_data[:, 0:height:stride]
+        center = point_data[:, 1 : height + 1 : stride]
+        down = point_data[:, 2 : height + 2 : stride]
+        row_diff = down - up
+        row_smooth = up + 2 * center + down
+        left = slice(0, width, stride)
+        middle = slice(1, width + 1, stride)
+        right = slice(2, width + 2, stride)
+        grad_i = row_diff[:, :, left] + row_diff[:, :, right]
+        grad_i += 2 * row_diff[:, :, middle]
+        grad_j = row_smooth[:, :, right] - row_smooth[:, :, left]
+        points = center[:, :, middle].reshape(3, -1)
+        grad_i = grad_i.reshape(3, -1)
+        grad_j = grad_j.reshape(3, -1)
+
+        # normals from the cross product of the derivatives
+        normals = np.empty(points.shape, dtype=dtype)
+        for k in range(3):
+            k1, k2 = (k + 1) % 3, (k + 2) % 3
+            normals[k] = grad_i[k1] * grad_j[k2] - grad_i[k2] * grad_j[k1]
+
+        # normalize, pointing zero norm normals toward the camera
+        norms = np.sqrt(np.einsum("ij,ij->j", normals, normals))
+        np.divide(normals, norms, out=normals, where=norms > 0)
+        normals[2, norms == 0] = -1.0
+        normals *= points[2] != 0
+        return PointNormalCloud(points, normals, frame=self._frame)
 
     @staticmethod
     def open(filename, frame="unspecified"):
@@ -2273,11 +2591,16 @@ class BinaryImage(Image):
         """
         self._encoding = "passthrough"
         self._threshold = threshold
+        self._distance_im = None
         data = BINARY_IM_MAX_VAL * (data > threshold).astype(
             data.dtype
         )  # binarize
         Image.__init__(self, data, frame)
 
+    def _clear_cache(self):
+        """Clears the cached distance transform."""
+        self._distance_im = None
+
     def _check_valid_data(self, data):
         """Checks that the given data is a uint8 array with one channel.
 
@@ -2750,6 +3073,192 @@ class BinaryImage(Image):
 
         return pixel
 
+    def closest_nonzero_pixels(self, pixels, directions, w=13, t=0.5):
+        """Batched version of closest_nonzero_pixel. Each ray is marched
+        through the cached distance transform of the image, jumping ahead
+        by the distance to the nearest non-zero pixel rather than testing
+        every step of size t.
+
+        Parameters
+        ----------
+        pixels : :obj:`numpy.ndarray` of float
+            Nx2 array of initial pixel locations, or a single 2-vector
+            shared by all rays.
+
+        directions : :obj:`numpy.ndarray` of float
+            Nx2 array of 2D direction vectors, or a single 2-vector shared
+            by all rays.
+
+        w : int
+            A circular diameter in which to check for non-zero pixels.
+
+        t : float
+            The step size with which to move pixels along directions.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray` of float
+            Nx2 array of the first pixel locations along each ray at which
+            there exists some non-zero pixel within a diameter w. Rows are
+            NaN for rays that leave the image first.
+        """
+        if self._distance_im is None:
+            self._distance_im = self._distance_to_set(self.data > 0)
+        return self._march_rays(
+            self._distance_im, pixels, directions, w, t, stop_inside=True
+        )
+
+    def closest_allzero_pixels(self, pixels, directions, w=13, t=0.5):
+        """Batched version of closest_allzero_pixel, using the same cached
+        distance transform as closest_nonzero_pixels.
+
+        Parameters
+        ----------
+        pixels : :obj:`numpy.ndarray` of float
+            Nx2 array of initial pixel locations, or a single 2-vector
+            shared by all rays.
+
+        directions : :obj:`numpy.ndarray` of float
+            Nx2 array of 2D direction vectors, or a single 2-vector shared
+            by all rays.
+
+        w : int
+            A circular diameter in which to check for zero pixels.
+
+        t : float
+            The step size with which to move pixels along directions.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray` of float
+            Nx2 array of the first pixel locations along each ray at which
+            all pixels within a diameter w are zero. Rows are NaN for rays
+            that leave the image first.
+        """
+        if self._distance_im is None:
+            self._distance_im = self._distance_to_set(self.data > 0)
+        return self._march_rays(
+            self._distance_im, pixels, directions, w, t, stop_inside=False
+        )
+
+    def closest_pixels_to_set(
+        self, starts, pixel_set, directions, w=13, t=0.5
+    ):
+        """Batched version of closest_pixel_to_set. The distance transform
+        of pixel_set is computed once and shared by all rays.
+
+        Parameters
+        ----------
+        starts : :obj:`numpy.ndarray` of float
+            Nx2 array of initial pixel locations, or a single 2-vector
+            shared by all rays.
+
+        pixel_set : set of 2-tuples of int or :obj:`numpy.ndarray` of int
+            The pixels to check intersection with, as (row, col) tuples or
+            an Mx2 array.
+
+        directions : :obj:`numpy.ndarray` of float
+            Nx2 array of 2D direction vectors, or a single 2-vector shared
+            by all rays.
+
+        w : int
+            A circular diameter in which to check for pixels.
+
+        t : float
+            The step size with which to move pixels along directions.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray` of float
+            Nx2 array of the first pixel locations along each ray at which
+            some pixel of pixel_set lies within a diameter w. Rows are NaN
+            for rays that leave the image first.
+        """
+        set_px = np.array(list(pixel_set), dtype=np.int64).reshape(-1, 2)
+        in_bounds = (
+            (set_px[:, 0] >= 0)
+            & (set_px[:, 0] < self.height)
+            & (set_px[:, 1] >= 0)
+            & (set_px[:, 1] < self.width)
+        )
+        set_px = set_px[in_bounds]
+        mask = np.zeros([self.height, self.width], dtype=bool)
+        mask[set_px[:, 0], set_px[:, 1]] = True
+        return self._march_rays(
+            self._distance_to_set(mask),
+            starts,
+            directions,
+            w,
+            t,
+            stop_inside=True,
+        )
+
+    @staticmethod
+    def _distance_to_set(mask):
+        """Euclidean distance from every pixel to the nearest True pixel
+        of mask, or infinity everywhere if mask is empty."""
+        if not np.any(mask):
+            return np.full(mask.shape, np.inf)
+        return snd.distance_transform_edt(~mask)
+
+    def _march_rays(self, dist_im, pixels, directions, w, t, stop_inside):
+        """Marches rays through a distance field until the pixel at the
+        current location is within (stop_inside=True) or beyond
+        (stop_inside=False) a radius of w / 2 from the set encoded by the
+        field. Steps are multiples of t, so the returned locations match
+        those of stepping one t at a time, but steps that provably cannot
+        change the outcome are skipped.
+        """
+        pixels = np.atleast_2d(np.asarray(pixels, dtype=np.float64))
+        directions = np.atleast_2d(np.asarray(directions, dtype=np.float64))
+        pixels, directions = np.broadcast_arrays(pixels, directions)
+        pos = pixels.copy()
+        result = np.full(pos.shape, np.nan)
+
+        radius = w / 2.0
+        step = t * directions
+        step_len = np.linalg.norm(step, axis=1)
+        moving = step_len > 0
+        max_steps = np.zeros(step_len.shape)
+        max_steps[moving] = (
+            np.ceil((self.height + self.width) / step_len[moving]) + 1
+        )
+
+        # the distance field is sampled at the nearest pixel, which differs
+        # from the true distance at pos by at most sqrt(2) / 2, so a margin
+        # of 1.5 pixels keeps every skipped step conservative
+        margin = 1.5
+
+        active = np.arange(pos.shape[0])
+        while active.shape[0] > 0:
+            cur_pos = pos[active]
+            in_bounds = (
+                np.all(cur_pos >= radius, axis=1)
+                & (cur_pos[:, 0] + radius <= self.height - 1)
+                & (cur_pos[:, 1] + radius <= self.width - 1)
+            )
+            active = active[in_bounds]
+            cur_pos = cur_pos[in_bounds]
+
+            px = np.round(cur_pos).astype(np.int64)
+            dist = dist_im[px[:, 0], px[:, 1]]
+            if stop_inside:
+                done = dist <= radius
+                slack = dist - radius
+            else:
+                done = dist > radius
+                slack = radius - dist
+            result[active[done]] = cur_pos[done]
+
+            # rays with a zero direction stop after their start pixel
+            keep = ~done & moving[active]
+            active = active[keep]
+            num_steps = np.floor((slack[keep] - margin) / step_len[active])
+            num_steps = np.clip(num_steps, 1, max_steps[active])
+            jump = num_steps[:, np.newaxis] * step[active]
+            pos[active] = cur_pos[keep] + jump
+        return result
+
     def add_frame(
         self, left_boundary, right_boundary, upper_boundary, lower_boundary
     ):
@@ -3081,43 +3590,6 @@ class RgbdImage(Image):
             color_im_resized, depth_im_resized
         )
 
-    def crop(self, height, width, center_i=None, center_j=None):
-        """Crop the image centered around center_i, center_j.
-
-        Parameters
-        ----------
-        height : int
-            The height of the desired image.
-
-        width : int
-            The width of the desired image.
-
-        center_i : int
-            The center height point at which to crop. If not specified,
-            the center of the image is used.
-
-        center_j : int
-            The center width point at which to crop. If not specified,
-            the center of the image is used.
-
-        Returns
-        -------
-        :obj:`Image`
-            A cropped Image of the same type.
-        """
-        # crop channels separately
-        color_im_cropped = self.color.crop(
-            height, width, center_i=center_i, center_j=center_j
-        )
-        depth_im_cropped = self.depth.crop(
-            height, width, center_i=center_i, center_j=center_j
-        )
-
-        # return combination of cropped data
-        return RgbdImage.from_color_and_depth(
-            color_im_cropped, depth_im_cropped
-        )
-
     def transform(self, translation, theta, method="opencv"):
         """Create a new image by translating and rotating the current image.
 
@@ -3322,34 +3794,6 @@ class GdImage(Image):
             gray_im_resized, depth_im_resized
         )
 
-    def crop(self, height, width, center_i=None, center_j=None):
-        """Crop the image centered around center_i, center_j.
-
-        Parameters
-        ----------
-        height : int
-            The height of the desired image.
-
-        width : int
-            The width of the desired image.
-
-        center_i : int
-            The center height point at which to crop. If not specified,
-            the center of the image is used.
-
-        center_j : int
-            The center width point at which to crop. If not specified,
-            the center of the image is used.
-
-        Returns
-        -------
-        :obj:`Image`
-            A cropped Image of the same type.
-        """
-        gray_im_crop = self.gray.crop(height, width, center_i, center_j)
-        depth_im_crop = self.depth.crop(height, width, center_i, center_j)
-        return GdImage.from_grayscale_and_depth(gray_im_crop, depth_im_crop)
-
 
 class SegmentationImage(Image):
     """An image containing integer-valued segment labels."""
@@ -3883,3 +4327,195 @@ class NormalCloudImage(Image):
         """
         data = Image.load_data(filename)
         return NormalCloudImage(data, frame)
+
+
+class ImageAccumulator(object):
+    """Incrementally computes pixelwise statistics over a stream of images
+    without stacking every frame in memory.
+
+    Running min, max and mean are exact. The median is exact until more
+    than buffer_size frames have been added, after which it is estimated
+    with a remedian: every full buffer of frames is collapsed to its
+    median and passed to the next level, so memory grows only
+    logarithmically with the number of frames.
+
+    Attributes
+    ----------
+    buffer_size : int
+        number of frames held at each level of the median buffer
+    ignore_zeros : bool
+        whether zero-valued pixels are treated as missing
+    """
+
+    def __init__(self, buffer_size=16, ignore_zeros=False, track_median=True):
+        """Create an empty accumulator.
+
+        Parameters
+        ----------
+        buffer_size : int
+            The number of frames held at each level of the median buffer.
+            The median is exact for up to this many frames.
+
+        ignore_zeros : bool
+            If True, zero-valued pixels are treated as missing data and
+            excluded from all statistics. Pixels that are zero in every
+            frame are zero in the result.
+
+        track_median : bool
+            If False, frames are not buffered and only the min, max and
+            mean are available.
+
+        Raises
+        ------
+        ValueError
+            If the buffer size is less than 2.
+        """
+        if buffer_size < 2:
+            raise ValueError("Buffer size must be at least 2")
+        self.buffer_size = buffer_size
+        self.ignore_zeros = ignore_zeros
+        self.track_median = track_median
+
+        self._num_images = 0
+        self._template = None
+        self._dtype = None
+        self._min = None
+        self._max = None
+        self._sum = None
+        self._count = None
+        self._levels = []
+
+    @property
+    def num_images(self):
+        """int : The number of images added so far."""
+        return self._num_images
+
+    def add(self, image):
+        """Add an image to the accumulator.
+
+        Parameters
+        ----------
+        image : :obj:`Image` or :obj:`numpy.ndarray`
+            The image to add. All images must have the same shape.
+
+        Raises
+        ------
+        ValueError
+            If the image shape does not match previous images.
+        """
+        template = image if isinstance(image, Image) else None
+        if isinstance(image, Image):
+            image = image.raw_data
+        data = np.asarray(image, dtype=np.float64)
+
+        if self._num_images == 0:
+            self._template = template
+            self._dtype = image.dtype
+            self._min = np.full(data.shape, np.inf)
+            self._max = np.full(data.shape, -np.inf)
+            self._sum = np.zeros(data.shape)
+            self._count = np.zeros(data.shape)
+        elif data.shape != self._sum.shape:
+            raise ValueError(
+                "Image shape %s does not match accumulated shape %s"
+                % (str(data.shape), str(self._sum.shape))
+            )
+
+        if self.ignore_zeros:
+            data = np.where(data == 0, np.nan, data)
+            valid = ~np.isnan(data)
+            self._sum += np.where(valid, data, 0)
+            self._count += valid
+        else:
+            self._sum += data
+            self._count += 1
+        self._min = np.fmin(self._min, data)
+        self._max = np.fmax(self._max, data)
+        self._num_images += 1
+
+        if self.track_median:
+            self._push(data, 0)
+
+    def _push(self, data, level):
+        """Adds data to a level of the remedian buffer, collapsing full
+        levels into the next one."""
+        if level == len(self._levels):
+            self._levels.append([])
+        self._levels[level].append(data)
+        if len(self._levels[level]) == self.buffer_size:
+            median = self._median(np.array(self._levels[level]))
+            self._levels[level] = []
+            self._push(median, level + 1)
+
+    def _median(self, stacked_data):
+        """Exact median along the first axis, skipping missing data."""
+        if self.ignore_zeros:
+            if np.all(np.isnan(stacked_data)):
+                return stacked_data[0]
+            return np.nanmedian(stacked_data, axis=0)
+        return np.median(stacked_data, axis=0)
+
+    def _weighted_median(self):
+        """Weighted lower median of all buffered frames, where frames at
+        level l of the buffer each summarize buffer_size**l frames."""
+        values = []
+        weights = []
+        for level, buffered_data in enumerate(self._levels):
+            values.extend(buffered_data)
+            weights.extend([self.buffer_size**level] * len(buffered_data))
+        values = np.array(values)
+        weights = np.array(weights, dtype=np.float64).reshape(
+            (-1,) + (1,) * (values.ndim - 1)
+        )
+        weights = np.where(np.isnan(values), 0.0, weights)
+
+        order = np.argsort(values, axis=0)
+        values = np.take_along_axis(values, order, axis=0)
+        cum_weights = np.cumsum(
+            np.take_along_axis(weights, order, axis=0), axis=0
+        )
+        median_ind = np.argmax(cum_weights >= cum_weights[-1] / 2.0, axis=0)
+        return np.take_along_axis(values, median_ind[np.newaxis], axis=0)[0]
+
+    def result(self, statistic="median"):
+        """Compute a pixelwise statistic of all added images.
+
+        Parameters
+        ----------
+        statistic : :obj:`str`
+            One of "min", "max", "mean" or "median".
+
+        Returns
+        -------
+        :obj:`Image` or :obj:`numpy.ndarray`
+            The statistic as an Image of the same type and frame as the
+            first image added, or as an array if arrays were added.
+
+        Raises
+        ------
+        ValueError
+            If no images have been added or the statistic is not supported.
+        """
+        if self._num_images == 0:
+            raise ValueError("No images have been added")
+        if statistic == "min":
+            data = self._min
+        elif statistic == "max":
+            data = self._max
+        elif statistic == "mean":
+            with np.errstate(invalid="ignore"):
+                data = self._sum / self._count
+        elif statistic == "median":
+            if not self.track_median:
+                raise ValueError("Median is not tracked by this accumulator")
+            if len(self._levels) == 1:
+                data = self._median(np.array(self._levels[0]))
+            else:
+                data = self._weighted_median()
+        else:
+            raise ValueError("Statistic %s not supported" % (statistic))
+        data = np.where(np.isfinite(data), data, 0.0).astype(self._dtype)
+
+        if self._template is None:
+            return data
+        return type(self._template)(data, self._template.frame)
@@ -8,6 +8,7 @@ import json
 import os
 
 from .constants import INTR_EXTENSION
+from .camera_intrinsics import _pixels_and_depths, _render_depth
 from .image import DepthImage, PointCloudImage
 from .points import Point, PointCloud, ImageCoords
 
@@ -62,7 +63,7 @@ class OrthographicIntrinsics(object):
     @property
     def plane_height(self):
         """float : The height of the projection plane in pixels."""
-        return self._height
+        return self._plane_height
 
     @property
     def plane_width(self):
@@ -141,11 +142,10 @@ class OrthographicIntrinsics(object):
                 % (point_cloud.frame, self._frame)
             )
 
-        points_proj = self.S.dot(point_cloud.data) + self.t
+        points_proj = self.S.dot(point_cloud.data)
         if len(points_proj.shape) == 1:
             points_proj = points_proj[:, np.newaxis]
-        point_depths = np.tile(points_proj[2, :], [3, 1])
-        points_proj = np.divide(points_proj, point_depths)
+        points_proj = points_proj + self.t[:, np.newaxis]
         if round_px:
             points_proj = np.round(points_proj)
 
@@ -157,10 +157,19 @@ class OrthographicIntrinsics(object):
             data=points_proj[:2, :].astype(np.int16), frame=self._frame
         )
 
-    def project_to_image(self, point_cloud, round_px=True):
+    def project_to_image(
+        self,
+        point_cloud,
+        round_px=True,
+        splat_radius=0,
+        dtype=np.float64,
+        return_indices=False,
+    ):
         """Projects a point cloud onto the camera image plane and creates
         a depth image. Zero depth means no point projected into the camera
-        at that pixel location (i.e. infinite depth).
+        at that pixel location (i.e. infinite depth). When several points
+        project onto the same pixel, the nearest one is kept. Points with
+        nonpositive scaled depth are ignored.
 
         Parameters
         ----------
@@ -169,13 +178,28 @@ class OrthographicIntrinsics(object):
             A PointCloud or Point to project onto the camera image plane.
 
         round_px : bool
-            If True, projections are rounded to the nearest pixel.
+            If True, projections are rounded to the nearest pixel. Otherwise
+            they are truncated to the pixel that contains them.
+
+        splat_radius : int
+            Each point fills the square of pixels within this many pixels
+            of its projection.
+
+        dtype : :obj:`numpy.dtype`
+            Float type of the depth image.
+
+        return_indices : bool
+            If True, also returns the index of the point that filled each
+            pixel.
 
         Returns
         -------
         :obj:`DepthImage`
             A DepthImage generated from projecting the point cloud into the
             camera.
+        :obj:`numpy.ndarray`
+            HxW array of the index of the point that filled each pixel, or
+            -1 for empty pixels. Only returned if return_indices is True.
 
         Raises
         ------
@@ -195,28 +219,25 @@ class OrthographicIntrinsics(object):
                 % (point_cloud.frame, self._frame)
             )
 
-        points_proj = self.S.dot(point_cloud.data) + self.t
+        points_proj = self.S.dot(point_cloud.data)
         if len(points_proj.shape) == 1:
             points_proj = points_proj[:, np.newaxis]
-        point_depths = points_proj[2, :]
-        point_z = np.tile(point_depths, [3, 1])
-        points_proj = np.divide(points_proj, point_z)
-        if round_px:
-            points_proj = np.round(points_proj)
-        points_proj = points_proj[:2, :].astype(np.int16)
-
-        valid_ind = np.where(
-            (points_proj[0, :] >= 0)
-            & (points_proj[1, :] >= 0)
-            & (points_proj[0, :] < self.width)
-            & (points_proj[1, :] < self.height)
-        )[0]
-
-        depth_data = np.zeros([self.height, self.width])
-        depth_data[
-            points_proj[1, valid_ind], points_proj[0, valid_ind]
-        ] = point_depths[valid_ind]
-        return DepthImage(depth_data, frame=self.frame)
+        points_proj = points_proj + self.t[:, np.newaxis]
+
+        depth_data, index_data = _render_depth(
+            points_proj[:2, :],
+            points_proj[2, :],
+            self._plane_height,
+            self._plane_width,
+            round_px=round_px,
+            splat_radius=splat_radius,
+            dtype=dtype,
+            return_indices=return_indices,
+        )
+        depth_im = DepthImage(depth_data, frame=self.frame)
+        if return_indices:
+            return depth_im, index_data
+        return depth_im
 
     def deproject(self, depth_image):
         """Deprojects a DepthImage into a PointCloud.
@@ -324,6 +345,39 @@ class OrthographicIntrinsics(object):
         point_3d = np.linalg.inv(self.S).dot(point - self.t)
         return Point(data=point_3d, frame=self._frame)
 
+    def deproject_pixels(self, depths, pixels):
+        """Deprojects a set of pixels with given depths into 3D points.
+
+        Parameters
+        ----------
+        depths : :obj:`numpy.ndarray` or float or :obj:`DepthImage`
+            N array of depths at the pixels, a single depth for all of them,
+            or a depth image to sample the depths from with bilinear
+            interpolation.
+
+        pixels : :obj:`numpy.ndarray` or :obj:`autolab_core.ImageCoords`
+            Nx2 array of (x, y) pixel locations, which may be fractional, or
+            image coordinates in the frame of the camera.
+
+        Returns
+        -------
+        :obj:`autolab_core.PointCloud`
+            The deprojected 3D points.
+
+        Raises
+        ------
+        ValueError
+            If the pixels or depth image are not in the same reference frame
+            as the camera.
+        """
+        pixels, depths = _pixels_and_depths(pixels, depths, self._frame)
+        points_proj = np.empty((3, pixels.shape[1]))
+        points_proj[:2] = pixels
+        points_proj[2] = depths
+        points_proj -= self.t[:, np.newaxis]
+        points_3d = np.linalg.inv(self.S).dot(points_proj)
+        return PointCloud(data=points_3d, frame=self._frame)
+
     def save(self, filename):
         """Save the CameraIntrinsics object to a .intr file.
 
@@ -3,7 +3,10 @@ Classes for point set registration using variants of Iterated-Closest Point
 Author: Jeff Mahler
 """
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import time
+
 import numpy as np
 
 from .feature_matcher import PointToPlaneFeatureMatcher
@@ -21,11 +24,85 @@ class RegistrationResult(object):
         transformation from source to target frame
     cost : float
         numeric value of the registration objective for the given transform
+    iteration_costs : :obj:`list` of float
+        value of the objective on the sampled correspondences at the start
+        of each iteration
+    iteration_times : :obj:`list` of float
+        wall-clock duration of each iteration, in seconds
+    converged : bool
+        whether the solver stopped early because a convergence threshold
+        was met
     """
 
-    def __init__(self, T_source_target, cost):
+    def __init__(
+        self,
+        T_source_target,
+        cost,
+        iteration_costs=None,
+        iteration_times=None,
+        converged=False,
+    ):
         self.T_source_target = T_source_target
         self.cost = cost
+        self.iteration_costs = iteration_costs or []
+        self.iteration_times = iteration_times or []
+        self.converged = converged
+
+    @property
+    def num_iterations(self):
+        """int : number of iterations the solver ran"""
+        return len(self.iteration_times)
+
+
+def _subsample(points, normals, sample_size):
+    """Randomly samples sample_size points and normals with replacement,
+    or returns all of them unchanged if sample_size is None."""
+    if sample_size is None:
+        return points, normals
+    inds = np.random.choice(points.shape[0], size=sample_size)
+    return points[inds, :], normals[inds, :]
+
+
+def _point_to_plane_system(G, source_points, target_points, target_normals):
+    """Builds the Gauss-Newton normal equations of the point-to-plane and
+    point-to-point costs over all correspondences at once.
+
+    Parameters
+    ----------
+    G : :obj:`numpy.ndarray` of float
+        Nx3xK Jacobians of the transformed source points with respect to the
+        K pose parameters
+    source_points : Nx3 :obj:`numpy.ndarray`
+        corresponding source points
+    target_points : Nx3 :obj:`numpy.ndarray`
+        corresponding target points
+    target_normals : Nx3 :obj:`numpy.ndarray`
+        corresponding target normals
+
+    Returns
+    -------
+    :obj:`tuple` of :obj:`numpy.ndarray`
+        A and b for the point-to-plane cost followed by A and b for the
+        point-to-point cost, with shapes KxK and Kx1
+    """
+    diffs = target_points - source_points
+    Gn = np.einsum("nki,nk->ni", G, target_normals)
+    normal_diffs = np.einsum("nk,nk->n", target_normals, diffs)
+    A = Gn.T.dot(Gn)
+    b = Gn.T.dot(normal_diffs)[:, np.newaxis]
+    Ap = np.einsum("nki,nkj->ij", G, G)
+    bp = np.einsum("nki,nk->i", G, diffs)[:, np.newaxis]
+    return A, b, Ap, bp
+
+
+def _point_to_plane_costs(source_points, target_points, target_normals):
+    """Returns the mean point-to-plane and point-to-point costs of a set of
+    correspondences."""
+    diffs = source_points - target_points
+    alignment = np.einsum("nk,nk->n", diffs, target_normals)
+    point_plane_cost = np.mean(alignment**2)
+    point_dist_cost = np.mean(np.sum(diffs**2, axis=1))
+    return point_plane_cost, point_dist_cost
 
 
 class IterativeRegistrationSolver:
@@ -45,6 +122,8 @@ class IterativeRegistrationSolver:
         compute_total_cost=True,
         match_centroids=False,
         vis=False,
+        pose_tol=None,
+        cost_tol=None,
     ):
         """Iteratively register objects to one another.
 
@@ -66,6 +145,11 @@ class IterativeRegistrationSolver:
             whether or not to compute the total cost upon termination.
         match_centroids : bool
             whether or not to match the centroids of the point clouds
+        pose_tol : float
+            stop early once the pose update of an iteration is smaller
+        cost_tol : float
+            stop early once the cost changes by less than this between
+            iterations
 
         Returns
         -------
@@ -82,9 +166,12 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
     Attributes
     ----------
     sample_size : int
-        number of randomly sampled points to use per iteration
+        number of randomly sampled points to use per iteration, or None to
+        use all points. With all points the KD-tree of the matcher on the
+        target points is built once and reused across iterations
     cost_sample_size : int
-        number of randomly sampled points to use for cost evaluations
+        number of randomly sampled points to use for cost evaluations, or
+        None to use all points
     gamma : float
         weight of point-to-point objective relative to point-to-plane objective
     mu : float
@@ -100,6 +187,19 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
         self.mu_ = mu
         IterativeRegistrationSolver.__init__(self)
 
+    @staticmethod
+    def _converged(v, iteration_costs, pose_tol, cost_tol):
+        """Checks the early termination criteria after an iteration."""
+        if pose_tol is not None and np.linalg.norm(v) < pose_tol:
+            return True
+        if (
+            cost_tol is not None
+            and len(iteration_costs) > 1
+            and abs(iteration_costs[-1] - iteration_costs[-2]) < cost_tol
+        ):
+            return True
+        return False
+
     def register(
         self,
         source_point_cloud,
@@ -111,6 +211,9 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
         compute_total_cost=True,
         match_centroids=False,
         vis=False,
+        pose_tol=None,
+        cost_tol=None,
+        T_initial=None,
     ):
         """
         Iteratively register objects to one another using a modified version
@@ -136,11 +239,22 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
             whether or not to compute the total cost upon termination.
         match_centroids : bool
             whether or not to match the centroids of the point clouds
+        pose_tol : float
+            stop early once the norm of the Gauss-Newton step (rotation
+            vector and translation) falls below this value
+        cost_tol : float
+            stop early once the cost on the sampled correspondences changes
+            by less than this value between iterations. The cost is only
+            deterministic when sample_size is None.
+        T_initial : :obj:`RigidTransform`
+            initial guess of the transformation from source to target. If
+            given, match_centroids is ignored
 
         Returns
         -------
         :obj`RegistrationResult`
-            results containing source to target transformation and cost
+            results containing source to target transformation, cost and
+            per-iteration costs and times
         """
         # check valid data
         if not isinstance(source_point_cloud, PointCloud) or not isinstance(
@@ -190,24 +304,27 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
         target_mean_point = np.mean(orig_target_points, axis=0)
         R_sol = np.eye(3)
         t_sol = np.zeros([3, 1])  # init with diff between means
-        if match_centroids:
+        if T_initial is not None:
+            R_sol = T_initial.rotation.copy()
+            t_sol[:, 0] = T_initial.translation
+        elif match_centroids:
             t_sol[:, 0] = target_mean_point - source_mean_point
 
         # iterate through
+        iteration_costs = []
+        iteration_times = []
+        converged = False
         for i in range(num_iterations):
             logging.info("Point to plane ICP iteration %d" % (i))
+            iteration_start = time.time()
 
             # subsample points
-            source_subsample_inds = np.random.choice(
-                orig_source_points.shape[0], size=self.sample_size_
+            source_points, source_normals = _subsample(
+                orig_source_points, orig_source_normals, self.sample_size_
             )
-            source_points = orig_source_points[source_subsample_inds, :]
-            source_normals = orig_source_normals[source_subsample_inds, :]
-            target_subsample_inds = np.random.choice(
-                orig_target_points.shape[0], size=self.sample_size_
+            target_points, target_normals = _subsample(
+                orig_target_points, orig_target_normals, self.sample_size_
             )
-            target_points = orig_target_points[target_subsample_inds, :]
-            target_normals = orig_target_normals[target_subsample_inds, :]
 
             # transform source points
             source_points = (
@@ -236,25 +353,27 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
                 logging.warning("No correspondences found")
                 break
 
+            point_plane_cost, point_dist_cost = _point_to_plane_costs(
+                source_corr_points, target_corr_points, target_corr_normals
+            )
+            iteration_costs.append(
+                float(point_plane_cost + self.gamma_ * point_dist_cost)
+            )
+
             # create A and b matrices for Gauss-Newton step on joint cost
-            # function
-            A = np.zeros([6, 6])
-            b = np.zeros([6, 1])
-            Ap = np.zeros([6, 6])
-            bp = np.zeros([6, 1])
-            G = np.zeros([3, 6])
-            G[:, 3:] = np.eye(3)
-
-            for i in range(num_corrs):
-                s = source_corr_points[i : i + 1, :].T
-                t = target_corr_points[i : i + 1, :].T
-                n = target_corr_normals[i : i + 1, :].T
-                G[:, :3] = skew(s).T
-                A += G.T.dot(n).dot(n.T).dot(G)
-                b += G.T.dot(n).dot(n.T).dot(t - s)
-
-                Ap += G.T.dot(G)
-                bp += G.T.dot(t - s)
+            # function, where the Jacobian of each point is [skew(s).T | I]
+            s = source_corr_points
+            G = np.zeros([num_corrs, 3, 6])
+            G[:, 0, 1] = s[:, 2]
+            G[:, 0, 2] = -s[:, 1]
+            G[:, 1, 0] = -s[:, 2]
+            G[:, 1, 2] = s[:, 0]
+            G[:, 2, 0] = s[:, 1]
+            G[:, 2, 1] = -s[:, 0]
+            G[:, :, 3:] = np.eye(3)
+            A, b, Ap, bp = _point_to_plane_system(
+                G, source_corr_points, target_corr_points, target_corr_normals
+            )
             v = np.linalg.solve(
                 A + self.gamma_ * Ap + self.mu_ * np.eye(6),
                 b + self.gamma_ * bp,
@@ -262,14 +381,19 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
 
             # create pose values from the solution
             R = np.eye(3)
-            R = R + skew(v[:3])
-            U, S, V = np.linalg.svd(R.astype(np.float))
+            R = R + skew(v[:3, 0])
+            U, S, V = np.linalg.svd(R.astype(np.float64))
             R = U.dot(V)
             t = v[3:]
 
             # incrementally update the final transform
             R_sol = R.dot(R_sol)
             t_sol = R.dot(t_sol) + t
+            iteration_times.append(time.time() - iteration_start)
+
+            if self._converged(v, iteration_costs, pose_tol, cost_tol):
+                converged = True
+                break
 
         T_source_target = RigidTransform(
             R_sol,
@@ -296,7 +420,13 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
             valid_corrs = np.where(corrs.index_map != -1)[0]
             num_corrs = valid_corrs.shape[0]
             if num_corrs == 0:
-                return RegistrationResult(T_source_target, np.inf)
+                return RegistrationResult(
+                    T_source_target,
+                    np.inf,
+                    iteration_costs=iteration_costs,
+                    iteration_times=iteration_times,
+                    converged=converged,
+                )
 
             # get the corresponding points
             source_corr_points = corrs.source_points[valid_corrs, :]
@@ -308,21 +438,301 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
             ]
 
             # determine total cost
-            source_target_alignment = np.diag(
-                (source_corr_points - target_corr_points).dot(
-                    target_corr_normals.T
+            point_plane_cost, point_dist_cost = _point_to_plane_costs(
+                source_corr_points, target_corr_points, target_corr_normals
+            )
+            total_cost = point_plane_cost + self.gamma_ * point_dist_cost
+
+        return RegistrationResult(
+            T_source_target,
+            total_cost,
+            iteration_costs=iteration_costs,
+            iteration_times=iteration_times,
+            converged=converged,
+        )
+
+    def register_pyramid(
+        self,
+        source_point_cloud,
+        target_point_cloud,
+        source_normal_cloud,
+        target_normal_cloud,
+        voxel_sizes,
+        dist_threshs=None,
+        norm_thresh=0.75,
+        num_iterations=20,
+        match_centroids=False,
+        pose_tol=1e-4,
+        cost_tol=None,
+        T_initial=None,
+    ):
+        """Coarse-to-fine registration over a pyramid of voxel-downsampled
+        point clouds. Each level runs point to plane ICP on all points of
+        the level, starting from the result of the previous level and with
+        its own matcher, so the KD-tree on the target points of the level
+        is built once and reused across its iterations.
+
+        Parameters
+        ----------
+        source_point_cloud : :obj:`autolab_core.PointCloud`
+            source object points
+        target_point_cloud : :obj`autolab_core.PointCloud`
+            target object points
+        source_normal_cloud : :obj:`autolab_core.NormalCloud`
+            source object outward-pointing normals
+        target_normal_cloud : :obj:`autolab_core.NormalCloud`
+            target object outward-pointing normals
+        voxel_sizes : :obj:`list` of float
+            decreasing voxel sizes of the levels, coarsest first. A voxel
+            size of None uses the full resolution clouds
+        dist_threshs : :obj:`list` of float
+            distance threshold of the matcher at each level. Defaults to
+            twice the voxel size of the level
+        norm_thresh : float
+            normal alignment threshold of the matchers
+        num_iterations : int or :obj:`list` of int
+            maximum number of iterations per level
+        match_centroids : bool
+            whether or not to match the centroids of the point clouds
+        pose_tol : float
+            stop a level early once the norm of the Gauss-Newton step falls
+            below this value
+        cost_tol : float
+            stop a level early once the cost changes by less than this value
+            between iterations
+        T_initial : :obj:`RigidTransform`
+            initial guess of the transformation from source to target
+
+        Returns
+        -------
+        :obj`RegistrationResult`
+            results containing source to target transformation, the cost at
+            the finest level and the per-iteration costs and times of all
+            levels
+
+        Raises
+        ------
+        ValueError
+            If the voxel sizes are not decreasing, or the distance thresholds
+            are missing for a full resolution level.
+        """
+        num_levels = len(voxel_sizes)
+        sizes = [0 if v is None else v for v in voxel_sizes]
+        if num_levels == 0 or np.any(np.diff(sizes) > 0):
+            raise ValueError("Voxel sizes must be non-empty and decreasing")
+        if dist_threshs is None:
+            if voxel_sizes[-1] is None:
+                raise ValueError(
+                    "Distance thresholds required for full resolution levels"
                 )
+            dist_threshs = [2 * v for v in voxel_sizes]
+        if isinstance(num_iterations, int):
+            num_iterations = [num_iterations] * num_levels
+        if (
+            len(dist_threshs) != num_levels
+            or len(num_iterations) != num_levels
+        ):
+            raise ValueError(
+                "Need one distance threshold and iteration count per level"
             )
-            point_plane_cost = (1.0 / num_corrs) * np.sum(
-                source_target_alignment * source_target_alignment
+
+        level_solver = PointToPlaneICPSolver(
+            sample_size=None,
+            cost_sample_size=None,
+            gamma=self.gamma_,
+            mu=self.mu_,
+        )
+        T_source_target = T_initial
+        iteration_costs = []
+        iteration_times = []
+        for level, voxel_size in enumerate(voxel_sizes):
+            source_points = source_point_cloud
+            source_normals = source_normal_cloud
+            target_points = target_point_cloud
+            target_normals = target_normal_cloud
+            if voxel_size is not None:
+                source_points, inds = source_point_cloud.voxel_downsample(
+                    voxel_size
+                )
+                source_normals = source_normal_cloud.reduce_voxels(inds)
+                target_points, inds = target_point_cloud.voxel_downsample(
+                    voxel_size
+                )
+                target_normals = target_normal_cloud.reduce_voxels(inds)
+
+            logging.info(
+                "Point to plane ICP level %d with %d source points"
+                % (level, source_points.num_points)
             )
-            point_dist_cost = (1.0 / num_corrs) * np.sum(
-                np.linalg.norm(source_corr_points - target_corr_points, axis=1)
-                ** 2
+            matcher = PointToPlaneFeatureMatcher(
+                dist_thresh=dist_threshs[level], norm_thresh=norm_thresh
             )
-            total_cost = point_plane_cost + self.gamma_ * point_dist_cost
+            result = level_solver.register(
+                source_points,
+                target_points,
+                source_normals,
+                target_normals,
+                matcher,
+                num_iterations=num_iterations[level],
+                compute_total_cost=level == num_levels - 1,
+                match_centroids=match_centroids,
+                pose_tol=pose_tol,
+                cost_tol=cost_tol,
+                T_initial=T_source_target,
+            )
+            T_source_target = result.T_source_target
+            iteration_costs.extend(result.iteration_costs)
+            iteration_times.extend(result.iteration_times)
+
+        return RegistrationResult(
+            T_source_target,
+            result.cost,
+            iteration_costs=iteration_costs,
+            iteration_times=iteration_times,
+            converged=result.converged,
+        )
 
-        return RegistrationResult(T_source_target, total_cost)
+    def register_multistart(
+        self,
+        source_point_cloud,
+        target_point_cloud,
+        source_normal_cloud,
+        target_normal_cloud,
+        matcher,
+        T_initials,
+        num_iterations=20,
+        prune_iterations=5,
+        prune_ratio=2.0,
+        num_workers=None,
+        pose_tol=None,
+        cost_tol=None,
+    ):
+        """Registers the source to the target from several initial guesses
+        in parallel and ranks the results by cost.
+
+        Every hypothesis first runs for prune_iterations iterations. The
+        hypotheses whose cost is more than prune_ratio times the lowest cost
+        are then dropped and the rest run for the remaining iterations.
+        The hypotheses run in a thread pool and share the matcher. Instead
+        of resampling on every iteration, sample_size source points are
+        drawn once and matched against the full target in all hypotheses,
+        so the KD-tree of the matcher is built once and the costs used for
+        pruning and ranking are measured on the same points.
+
+        Parameters
+        ----------
+        source_point_cloud : :obj:`autolab_core.PointCloud`
+            source object points
+        target_point_cloud : :obj`autolab_core.PointCloud`
+            target object points
+        source_normal_cloud : :obj:`autolab_core.NormalCloud`
+            source object outward-pointing normals
+        target_normal_cloud : :obj:`autolab_core.NormalCloud`
+            target object outward-pointing normals
+        matcher : :obj:`PointToPlaneFeatureMatcher`
+            object to match the point sets
+        T_initials : :obj:`list` of :obj:`RigidTransform`
+            initial guesses of the transformation from source to target. A
+            :obj:`RigidTransformArray` may be given as well
+        num_iterations : int
+            the maximum number of iterations to run per hypothesis
+        prune_iterations : int
+            the number of iterations to run before pruning hypotheses
+        prune_ratio : float
+            hypotheses whose cost exceeds this multiple of the lowest cost
+            after prune_iterations are dropped. If None, none are dropped
+        num_workers : int
+            number of threads to use. Defaults to the ThreadPoolExecutor
+            default
+        pose_tol : float
+            stop a hypothesis early once the norm of the Gauss-Newton step
+            falls below this value
+        cost_tol : float
+            stop a hypothesis early once the cost changes by less than this
+            value between iterations
+
+        Returns
+        -------
+        :obj:`list` of :obj:`RegistrationResult`
+            the results of the hypotheses that were not dropped, sorted by
+            increasing cost on the sampled source points
+
+        Raises
+        ------
+        ValueError
+            If no initial guesses are given.
+        """
+        T_initials = list(T_initials)
+        if len(T_initials) == 0:
+            raise ValueError("At least one initial transform is required")
+
+        if self.sample_size_ is not None:
+            source_points = source_point_cloud.data.T
+            source_normals = source_normal_cloud.data.T
+            valid_inds = np.nonzero(np.linalg.norm(source_normals, axis=1))[0]
+            source_points, source_normals = _subsample(
+                source_points[valid_inds, :],
+                source_normals[valid_inds, :],
+                self.sample_size_,
+            )
+            source_point_cloud = PointCloud(
+                source_points.T, frame=source_point_cloud.frame
+            )
+            source_normal_cloud = NormalCloud(
+                source_normals.T, frame=source_normal_cloud.frame
+            )
+        hypothesis_solver = PointToPlaneICPSolver(
+            sample_size=None,
+            cost_sample_size=None,
+            gamma=self.gamma_,
+            mu=self.mu_,
+        )
+
+        def run(T_initial, iterations):
+            return hypothesis_solver.register(
+                source_point_cloud,
+                target_point_cloud,
+                source_normal_cloud,
+                target_normal_cloud,
+                matcher,
+                num_iterations=iterations,
+                pose_tol=pose_tol,
+                cost_tol=cost_tol,
+                T_initial=T_initial,
+            )
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            first_iterations = min(prune_iterations, num_iterations)
+            results = list(
+                executor.map(
+                    run, T_initials, [first_iterations] * len(T_initials)
+                )
+            )
+
+            # drop dominated hypotheses
+            if prune_ratio is not None:
+                best_cost = min(r.cost for r in results)
+                results = [
+                    r for r in results if r.cost <= prune_ratio * best_cost
+                ]
+
+            # continue the others
+            remaining_iterations = num_iterations - first_iterations
+            active = [r for r in results if not r.converged]
+            if remaining_iterations > 0 and len(active) > 0:
+                continued = executor.map(
+                    run,
+                    [r.T_source_target for r in active],
+                    [remaining_iterations] * len(active),
+                )
+                for first, second in zip(active, continued):
+                    first.T_source_target = second.T_source_target
+                    first.cost = second.cost
+                    first.iteration_costs.extend(second.iteration_costs)
+                    first.iteration_times.extend(second.iteration_times)
+                    first.converged = second.converged
+
+        return sorted(results, key=lambda r: r.cost)
 
     def register_2d(
         self,
@@ -334,6 +744,8 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
         num_iterations=1,
         compute_total_cost=True,
         vis=False,
+        pose_tol=None,
+        cost_tol=None,
     ):
         """
         Iteratively register objects to one another using a modified version
@@ -358,11 +770,18 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
             the number of iterations to run
         compute_total_cost : bool
             whether or not to compute the total cost upon termination.
+        pose_tol : float
+            stop early once the norm of the Gauss-Newton step falls below
+            this value
+        cost_tol : float
+            stop early once the cost on the sampled correspondences changes
+            by less than this value between iterations
 
         Returns
         -------
         :obj`RegistrationResult`
-            results containing source to target transformation and cost
+            results containing source to target transformation, cost and
+            per-iteration costs and times
         """
         if not isinstance(source_point_cloud, PointCloud) or not isinstance(
             target_point_cloud, PointCloud
@@ -412,20 +831,20 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
         t_sol = np.zeros([3, 1])
 
         # iterate through
+        iteration_costs = []
+        iteration_times = []
+        converged = False
         for i in range(num_iterations):
             logging.info("Point to plane ICP iteration %d" % (i))
+            iteration_start = time.time()
 
             # subsample points
-            source_subsample_inds = np.random.choice(
-                orig_source_points.shape[0], size=self.sample_size_
+            source_points, source_normals = _subsample(
+                orig_source_points, orig_source_normals, self.sample_size_
             )
-            source_points = orig_source_points[source_subsample_inds, :]
-            source_normals = orig_source_normals[source_subsample_inds, :]
-            target_subsample_inds = np.random.choice(
-                orig_target_points.shape[0], size=self.sample_size_
+            target_points, target_normals = _subsample(
+                orig_target_points, orig_target_normals, self.sample_size_
             )
-            target_points = orig_target_points[target_subsample_inds, :]
-            target_normals = orig_target_normals[target_subsample_inds, :]
 
             # transform source points
             source_points = (
@@ -453,26 +872,22 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
             if num_corrs == 0:
                 break
 
+            point_plane_cost, point_dist_cost = _point_to_plane_costs(
+                source_corr_points, target_corr_points, target_corr_normals
+            )
+            iteration_costs.append(
+                float(point_plane_cost + self.gamma_ * point_dist_cost)
+            )
+
             # create A and b matrices for Gauss-Newton step on joint cost
-            # function
-            A = np.zeros([3, 3])  # A and b for point to plane cost
-            b = np.zeros([3, 1])
-            Ap = np.zeros([3, 3])  # A and b for point to point cost
-            bp = np.zeros([3, 1])
-            G = np.zeros([3, 3])
-            G[:2, 1:] = np.eye(2)
-
-            for i in range(num_corrs):
-                s = source_corr_points[i : i + 1, :].T
-                t = target_corr_points[i : i + 1, :].T
-                n = target_corr_normals[i : i + 1, :].T
-                G[0, 0] = -s[1]
-                G[1, 0] = s[0]
-                A += G.T.dot(n).dot(n.T).dot(G)
-                b += G.T.dot(n).dot(n.T).dot(t - s)
-
-                Ap += G.T.dot(G)
-                bp += G.T.dot(t - s)
+            # function, over theta, tx and ty
+            G = np.zeros([num_corrs, 3, 3])
+            G[:, 0, 0] = -source_corr_points[:, 1]
+            G[:, 1, 0] = source_corr_points[:, 0]
+            G[:, :2, 1:] = np.eye(2)
+            A, b, Ap, bp = _point_to_plane_system(
+                G, source_corr_points, target_corr_points, target_corr_normals
+            )
             v = np.linalg.solve(
                 A + self.gamma_ * Ap + self.mu_ * np.eye(3),
                 b + self.gamma_ * bp,
@@ -480,14 +895,19 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
 
             # create pose values from the solution
             R = np.eye(3)
-            R = R + skew(np.array([[0], [0], [v[0, 0]]]))
-            U, S, V = np.linalg.svd(R.astype(np.float))
+            R = R + skew(np.array([0, 0, v[0, 0]]))
+            U, S, V = np.linalg.svd(R.astype(np.float64))
             R = U.dot(V)
             t = np.array([[v[1, 0]], [v[2, 0]], [0]])
 
             # incrementally update the final transform
             R_sol = R.dot(R_sol)
             t_sol = R.dot(t_sol) + t
+            iteration_times.append(time.time() - iteration_start)
+
+            if self._converged(v, iteration_costs, pose_tol, cost_tol):
+                converged = True
+                break
 
         # compute solution transform
         T_source_target = RigidTransform(
@@ -500,16 +920,12 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
         total_cost = 0
         if compute_total_cost:
             # subsample points
-            source_subsample_inds = np.random.choice(
-                orig_source_points.shape[0], size=self.cost_sample_size_
+            source_points, source_normals = _subsample(
+                orig_source_points, orig_source_normals, self.cost_sample_size_
             )
-            source_points = orig_source_points[source_subsample_inds, :]
-            source_normals = orig_source_normals[source_subsample_inds, :]
-            target_subsample_inds = np.random.choice(
-                orig_target_points.shape[0], size=self.cost_sample_size_
+            target_points, target_normals = _subsample(
+                orig_target_points, orig_target_normals, self.cost_sample_size_
             )
-            target_points = orig_target_points[target_subsample_inds, :]
-            target_normals = orig_target_normals[target_subsample_inds, :]
 
             # transform source points
             source_points = (
@@ -525,7 +941,13 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
             valid_corrs = np.where(corrs.index_map != -1)[0]
             num_corrs = valid_corrs.shape[0]
             if num_corrs == 0:
-                return RegistrationResult(T_source_target, np.inf)
+                return RegistrationResult(
+                    T_source_target,
+                    np.inf,
+                    iteration_costs=iteration_costs,
+                    iteration_times=iteration_times,
+                    converged=converged,
+                )
 
             # get the corresponding points
             source_corr_points = corrs.source_points[valid_corrs, :]
@@ -537,18 +959,15 @@ class PointToPlaneICPSolver(IterativeRegistrationSolver):
             ]
 
             # determine total cost
-            source_target_alignment = np.diag(
-                (source_corr_points - target_corr_points).dot(
-                    target_corr_normals.T
-                )
-            )
-            point_plane_cost = (1.0 / num_corrs) * np.sum(
-                source_target_alignment * source_target_alignment
-            )
-            point_dist_cost = (1.0 / num_corrs) * np.sum(
-                np.linalg.norm(source_corr_points - target_corr_points, axis=1)
-                ** 2
+            point_plane_cost, point_dist_cost = _point_to_plane_costs(
+                source_corr_points, target_corr_points, target_corr_normals
             )
             total_cost = point_plane_cost + self.gamma_ * point_dist_cost
 
-        return RegistrationResult(T_source_target, total_cost)
+        return RegistrationResult(
+            T_source_target,
+            total_cost,
+            iteration_costs=iteration_costs,
+            iteration_times=iteration_times,
+            converged=converged,
+        )
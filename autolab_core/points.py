@@ -11,6 +11,50 @@ import numpy as np
 from .primitives import Box
 
 
+def _voxel_indices(points, voxel_size):
+    """Returns the index of the voxel of a grid that contains each point,
+    with the occupied voxels numbered in lexicographic order of their grid
+    coordinates.
+
+    Parameters
+    ----------
+    points : :obj:`numpy.ndarray` of float
+        A 3 x #points array of points.
+    voxel_size : float
+        The edge length of the voxels.
+    """
+    keys = np.floor(points / voxel_size).astype(np.int64)
+    keys -= keys.min(axis=1, keepdims=True)
+    extents = keys.max(axis=1) + 1
+    if np.prod(extents.astype(np.float64)) < 2**62:
+        # hash the grid coordinates to a single integer
+        linear_keys = (keys[0] * extents[1] + keys[1]) * extents[2] + keys[2]
+        _, voxel_inds = np.unique(linear_keys, return_inverse=True)
+    else:
+        _, voxel_inds = np.unique(keys, axis=1, return_inverse=True)
+    return voxel_inds.ravel()
+
+
+def _voxel_means(data, voxel_inds):
+    """Returns the mean of the columns of data in each voxel.
+
+    Parameters
+    ----------
+    data : :obj:`numpy.ndarray`
+        A dim x #points array.
+    voxel_inds : :obj:`numpy.ndarray` of int
+        The voxel of each point.
+    """
+    num_voxels = voxel_inds.max() + 1 if voxel_inds.shape[0] > 0 else 0
+    counts = np.bincount(voxel_inds, minlength=num_voxels)
+    return np.array(
+        [
+            np.bincount(voxel_inds, weights=row, minlength=num_voxels)
+            for row in data
+        ]
+    ) / np.maximum(counts, 1)
+
+
 class BagOfPoints(object):
     """The abstract base class for collections of 3D point clouds."""
 
@@ -702,6 +746,41 @@ class PointCloud(BagOfPoints):
         subsampled_data = self._data[:, subsample_inds]
         return PointCloud(subsampled_data, self._frame), subsample_inds
 
+    def voxel_downsample(self, voxel_size):
+        """Returns a version of the PointCloud with a single point, the
+        centroid, for the points in each voxel of a grid.
+
+        Parameters
+        ----------
+        voxel_size : float
+            The edge length of the voxels.
+
+        Returns
+        -------
+        :obj:`PointCloud`
+            A downsampled point cloud with one point per occupied voxel.
+        :obj:`numpy.ndarray` of int
+            The index of the downsampled point for each point in the original
+            cloud, so the points in voxel i are np.where(voxel_inds == i)[0].
+            Other clouds of the same points can be reduced with it, e.g.
+            with NormalCloud.reduce_voxels.
+
+        Raises
+        ------
+        ValueError
+            If voxel_size is not positive.
+        """
+        if voxel_size <= 0:
+            raise ValueError("Voxel size must be positive")
+        if self.num_points == 0:
+            return self.copy(), np.zeros(0, dtype=np.intp)
+        voxel_inds = _voxel_indices(self._data, voxel_size)
+        voxel_data = _voxel_means(self._data, voxel_inds)
+        return (
+            PointCloud(voxel_data.astype(self._data.dtype), self._frame),
+            voxel_inds,
+        )
+
     def box_mask(self, box):
         """Return a PointCloud containing only points within the given Box.
 
@@ -1059,6 +1138,27 @@ class NormalCloud(BagOfVectors):
         subsampled_data = self._data[:, subsample_inds]
         return NormalCloud(subsampled_data, self._frame)
 
+    def reduce_voxels(self, voxel_inds):
+        """Returns the normalized average normal of each voxel.
+
+        Parameters
+        ----------
+        voxel_inds : :obj:`numpy.ndarray` of int
+            The voxel of each normal, as returned by
+            PointCloud.voxel_downsample.
+
+        Returns
+        -------
+        :obj:`NormalCloud`
+            A cloud with one normal per voxel. Voxels whose normals cancel
+            out get a zero normal.
+        """
+        voxel_data = _voxel_means(self._data, voxel_inds)
+        norms = np.linalg.norm(voxel_data, axis=0)
+        valid = norms > 0
+        voxel_data[:, valid] /= norms[valid]
+        return NormalCloud(voxel_data.astype(self._data.dtype), self._frame)
+
     def remove_zero_normals(self):
         """Removes normal vectors with a zero magnitude.
 
@@ -1270,6 +1370,23 @@ class RgbCloud(BagOfPoints):
         """
         return self._data[2, :]
 
+    def reduce_voxels(self, voxel_inds):
+        """Returns the average color of each voxel.
+
+        Parameters
+        ----------
+        voxel_inds : :obj:`numpy.ndarray` of int
+            The voxel of each color, as returned by
+            PointCloud.voxel_downsample.
+
+        Returns
+        -------
+        :obj:`RgbCloud`
+            A cloud with one color per voxel.
+        """
+        voxel_data = _voxel_means(self._data, voxel_inds)
+        return RgbCloud(np.round(voxel_data).astype(np.uint8), self._frame)
+
     @staticmethod
     def open(filename, frame="unspecified"):
         """Create a RgbCloud from data saved in a file.
@@ -1319,6 +1436,29 @@ class RgbPointCloud(object):
         """
         return self.point_cloud[i], self.rgb_cloud[i]
 
+    def voxel_downsample(self, voxel_size):
+        """Returns a version of the clouds with the centroid and average color
+        of the points in each voxel of a grid.
+
+        Parameters
+        ----------
+        voxel_size : float
+            The edge length of the voxels.
+
+        Returns
+        -------
+        :obj:`RgbPointCloud`
+            The downsampled clouds.
+        :obj:`numpy.ndarray` of int
+            The index of the downsampled point for each original point.
+        """
+        point_cloud, voxel_inds = self.point_cloud.voxel_downsample(voxel_size)
+        rgb_cloud = self.rgb_cloud.reduce_voxels(voxel_inds)
+        return (
+            RgbPointCloud(point_cloud.data, rgb_cloud.data, point_cloud.frame),
+            voxel_inds,
+        )
+
 
 class PointNormalCloud(object):
     """A combined set of 3D points and normal vectors."""
@@ -1378,6 +1518,31 @@ class PointNormalCloud(object):
         """
         return self.point_cloud[i], self.normal_cloud[i]
 
+    def voxel_downsample(self, voxel_size):
+        """Returns a version of the clouds with the centroid and normalized
+        average normal of the points in each voxel of a grid.
+
+        Parameters
+        ----------
+        voxel_size : float
+            The edge length of the voxels.
+
+        Returns
+        -------
+        :obj:`PointNormalCloud`
+            The downsampled clouds.
+        :obj:`numpy.ndarray` of int
+            The index of the downsampled point for each original point.
+        """
+        point_cloud, voxel_inds = self.point_cloud.voxel_downsample(voxel_size)
+        normal_cloud = self.normal_cloud.reduce_voxels(voxel_inds)
+        return (
+            PointNormalCloud(
+                point_cloud.data, normal_cloud.data, point_cloud.frame
+            ),
+            voxel_inds,
+        )
+
     def remove_zero_points(self):
         """Remove all elements where the norms and points are zero.
 
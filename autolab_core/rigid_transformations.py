@@ -17,7 +17,7 @@ from .points import (
     Direction,
     NormalCloud,
 )
-from .dual_quaternion import DualQuaternion
+from .dual_quaternion import DualQuaternion, DualQuaternionArray
 
 try:
     from geometry_msgs import msg
@@ -45,10 +45,44 @@ except ImportError:
 
 TF_EXTENSION = ".tf"
 STF_EXTENSION = ".stf"
+TF_ARRAY_EXTENSION = ".npz"
+TF_ARCHIVE_EXTENSIONS = [".npy", ".npz"]
+
+
+def _transform_archive_dtype(name_len, frame_len):
+    """Returns the structured dtype of transform archives with the given
+    maximum name and frame lengths. The fields are named like the arrays
+    of a saved RigidTransformArray.
+    """
+    return np.dtype(
+        [
+            ("names", "U%d" % (name_len)),
+            ("from_frame", "U%d" % (frame_len)),
+            ("to_frame", "U%d" % (frame_len)),
+            ("rotations", "<f8", (3, 3)),
+            ("translations", "<f8", (3,)),
+            ("scales", "<f8"),
+            ("similarity", "?"),
+        ]
+    )
 
 
 class RigidTransform(object):
-    """A Rigid Transformation from one frame to another."""
+    """A Rigid Transformation from one frame to another.
+
+    Derived representations such as the matrix, quaternion and euler angles
+    are computed on first access and cached until the rotation or
+    translation changes.
+    """
+
+    __slots__ = (
+        "_rotation",
+        "_translation",
+        "_from_frame",
+        "_to_frame",
+        "_cache",
+        "_cache_key",
+    )
 
     def __init__(
         self,
@@ -97,6 +131,74 @@ class RigidTransform(object):
         self._from_frame = str(from_frame)
         self._to_frame = str(to_frame)
 
+    @classmethod
+    def _from_trusted(cls, rotation, translation, from_frame, to_frame):
+        """Creates a transform from a rotation and translation that are
+        already known to be valid, such as the results of composition and
+        inversion, without validating or copying them.
+
+        Parameters
+        ----------
+        rotation : :obj:`numpy.ndarray` of float
+            A 3x3 float rotation matrix owned by the new transform.
+
+        translation : :obj:`numpy.ndarray` of float
+            A 3-entry float translation vector owned by the new transform.
+
+        from_frame : :obj:`str`
+            The from frame of the new transform.
+
+        to_frame : :obj:`str`
+            The to frame of the new transform.
+
+        Returns
+        -------
+        :obj:`RigidTransform`
+            The new transform.
+        """
+        T = cls.__new__(cls)
+        T._rotation = rotation
+        T._translation = translation
+        T._from_frame = from_frame
+        T._to_frame = to_frame
+        T._clear_cache()
+        return T
+
+    def _clear_cache(self):
+        """Clears the cached derived representations of the transform."""
+        self._cache = {}
+        self._cache_key = None
+
+    def _cached(self, name, compute):
+        """Returns a derived representation of the transform, computing and
+        caching it on first access.
+
+        The cache is also keyed on the raw rotation and translation values,
+        so in-place edits such as T.translation[2] = 0.5 that bypass the
+        setters still invalidate it.
+        """
+        key = self._rotation.tobytes() + self._translation.tobytes()
+        if key != self._cache_key:
+            self._cache = {}
+            self._cache_key = key
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if name not in ("_cache", "_cache_key"):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        # also accepts the __dict__ of transforms pickled before __slots__
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._clear_cache()
+
     def copy(self):
         """Returns a copy of the RigidTransform.
 
@@ -105,11 +207,11 @@ class RigidTransform(object):
         :obj:`RigidTransform`
             A deep copy of the RigidTransform.
         """
-        return RigidTransform(
-            np.copy(self.rotation),
-            np.copy(self.translation),
-            self.from_frame,
-            self.to_frame,
+        return RigidTransform._from_trusted(
+            np.copy(self._rotation),
+            np.copy(self._translation),
+            self._from_frame,
+            self._to_frame,
         )
 
     def _check_valid_rotation(self, rotation):
@@ -167,6 +269,7 @@ class RigidTransform(object):
 
         self._check_valid_rotation(rotation)
         self._rotation = rotation * 1.0
+        self._clear_cache()
 
     @property
     def translation(self):
@@ -183,6 +286,7 @@ class RigidTransform(object):
 
         self._check_valid_translation(translation)
         self._translation = translation.squeeze() * 1.0
+        self._clear_cache()
 
     @property
     def position(self):
@@ -197,6 +301,9 @@ class RigidTransform(object):
 
     @property
     def adjoint_tf(self):
+        return self._cached("adjoint_tf", self._compute_adjoint_tf).copy()
+
+    def _compute_adjoint_tf(self):
         A = np.zeros([6, 6])
         A[:3, :3] = self.rotation
         A[3:, :3] = utils.skew(self.translation).dot(self.rotation)
@@ -224,6 +331,9 @@ class RigidTransform(object):
     @property
     def euler_angles(self):
         """:obj:`tuple` of float: The three euler angles for the rotation."""
+        return self._cached("euler_angles", self._compute_euler_angles)
+
+    def _compute_euler_angles(self):
         q_wxyz = self.quaternion
         q_xyzw = np.roll(q_wxyz, -1)
         return transformations.euler_from_quaternion(q_xyzw)
@@ -232,7 +342,11 @@ class RigidTransform(object):
     def quaternion(self):
         """:obj:`numpy.ndarray` of float: A quaternion vector in wxyz
         layout."""
-        q_xyzw = transformations.quaternion_from_matrix(self.matrix)
+        return self._cached("quaternion", self._compute_quaternion).copy()
+
+    def _compute_quaternion(self):
+        matrix = self._cached("matrix", self._compute_matrix)
+        q_xyzw = transformations.quaternion_from_matrix(matrix)
         q_wxyz = np.roll(q_xyzw, 1)
         return q_wxyz
 
@@ -243,12 +357,16 @@ class RigidTransform(object):
         """
         qr = self.quaternion
         qd = np.append([0], self.translation / 2.0)
-        return DualQuaternion(qr, qd)
+        # qr comes from a rotation matrix, so it is unit norm already
+        return DualQuaternion(qr, qd, enforce_unit_norm=False)
 
     @property
     def axis_angle(self):
         """:obj:`numpy.ndarray` of float: The axis-angle representation for
         the rotation."""
+        return self._cached("axis_angle", self._compute_axis_angle).copy()
+
+    def _compute_axis_angle(self):
         qw, qx, qy, qz = self.quaternion
         theta = 2 * np.arccos(qw)
         omega = np.array([1, 0, 0])
@@ -278,6 +396,9 @@ class RigidTransform(object):
         followed by a zero, and the last column contains the translation
         vector followed by a one.
         """
+        return self._cached("matrix", self._compute_matrix).copy()
+
+    def _compute_matrix(self):
         return np.r_[np.c_[self._rotation, self._translation], [[0, 0, 0, 1]]]
 
     @property
@@ -350,15 +471,15 @@ class RigidTransform(object):
         interp_rotation = transformations.quaternion_slerp(
             self.quaternion, other_tf.quaternion, t
         )
-        interp_tf = RigidTransform(
-            rotation=interp_rotation,
-            translation=interp_translation,
-            from_frame=self.from_frame,
-            to_frame=self.to_frame,
+        interp_tf = RigidTransform._from_trusted(
+            RigidTransform.rotation_from_quaternion(interp_rotation),
+            interp_translation,
+            self.from_frame,
+            self.to_frame,
         )
         return interp_tf
 
-    def linear_trajectory_to(self, target_tf, traj_len):
+    def linear_trajectory_to(self, target_tf, traj_len, as_array=False):
         """Creates a trajectory of poses linearly interpolated from this tf
         to a target tf.
 
@@ -368,20 +489,25 @@ class RigidTransform(object):
             The RigidTransform to interpolate to.
         traj_len : int
             The number of RigidTransforms in the returned trajectory.
+        as_array : bool
+            If True, the trajectory is returned as a RigidTransformArray
+            instead of a list.
 
         Returns
         -------
-        :obj:`list` of :obj:`RigidTransform`
-            A list of interpolated transforms from this transform to
-            the target.
+        :obj:`list` of :obj:`RigidTransform` or :obj:`RigidTransformArray`
+            The interpolated transforms from this transform to the target,
+            all with this transform's frames.
         """
         if traj_len < 0:
             raise ValueError("Traj len must at least 0")
         ts = np.linspace(0.0, 1.0, traj_len)
-        traj = []
-        for t in ts:
-            traj.append(self.interpolate_with(target_tf, t))
-        return traj
+        traj = RigidTransformArray.interpolate(
+            self, target_tf.as_frames(self.from_frame, self.to_frame), ts
+        )
+        if as_array:
+            return traj
+        return traj.to_transforms()
 
     def apply(self, points):
         """Applies the rigid transformation to a set of 3D objects.
@@ -428,9 +554,7 @@ class RigidTransform(object):
             x = points.data
             if len(x.shape) == 1:
                 x = x[:, np.newaxis]
-            x_homog = np.r_[x, np.ones([1, points.num_points])]
-            x_homog_tf = self.matrix.dot(x_homog)
-            x_tf = x_homog_tf[0:3, :]
+            x_tf = self._rotation.dot(x) + self._translation[:, np.newaxis]
 
         # output in BagOfPoints format
         if isinstance(points, PointCloud):
@@ -470,12 +594,6 @@ class RigidTransform(object):
                 f"must match from frame of left hand side ({self.from_frame})"
             )
 
-        pose_tf = self.matrix.dot(other_tf.matrix)
-        (
-            rotation,
-            translation,
-        ) = RigidTransform.rotation_and_translation_from_matrix(pose_tf)
-
         if isinstance(other_tf, SimilarityTransform):
             return (
                 SimilarityTransform(
@@ -487,11 +605,12 @@ class RigidTransform(object):
                 )
                 * other_tf
             )
-        return RigidTransform(
-            rotation,
-            translation,
-            from_frame=other_tf.from_frame,
-            to_frame=self.to_frame,
+        rotation = self._rotation.dot(other_tf._rotation)
+        translation = (
+            self._rotation.dot(other_tf._translation) + self._translation
+        )
+        return RigidTransform._from_trusted(
+            rotation, translation, other_tf._from_frame, self._to_frame
         )
 
     def __mul__(self, rigid_object):
@@ -517,6 +636,15 @@ class RigidTransform(object):
         """
         if isinstance(rigid_object, RigidTransform):
             return self.dot(rigid_object)
+        if isinstance(rigid_object, RigidTransformArray):
+            if isinstance(self, SimilarityTransform):
+                raise ValueError(
+                    "Cannot compose SimilarityTransform with "
+                    "RigidTransformArray"
+                )
+            return RigidTransformArray.from_transforms([self]).dot(
+                rigid_object
+            )
         if isinstance(rigid_object, BagOfPoints):
             return self.apply(rigid_object)
         raise ValueError(
@@ -532,13 +660,10 @@ class RigidTransform(object):
         :obj:`RigidTransform`
             The inverse of this RigidTransform.
         """
-        inv_rotation = self.rotation.T
-        inv_translation = np.dot(-self.rotation.T, self.translation)
-        return RigidTransform(
-            inv_rotation,
-            inv_translation,
-            from_frame=self._to_frame,
-            to_frame=self._from_frame,
+        inv_rotation = self._rotation.T.copy()
+        inv_translation = -inv_rotation.dot(self._translation)
+        return RigidTransform._from_trusted(
+            inv_rotation, inv_translation, self._to_frame, self._from_frame
         )
 
     def save(self, filename):
@@ -623,8 +748,11 @@ class RigidTransform(object):
         :obj:`RigidTransform`
             The RigidTransform with new frames.
         """
-        return RigidTransform(
-            self.rotation, self.translation, from_frame, to_frame
+        return RigidTransform._from_trusted(
+            self._rotation.copy(),
+            self._translation.copy(),
+            str(from_frame),
+            str(to_frame),
         )
 
     def publish_to_ros(
@@ -1297,9 +1425,177 @@ class RigidTransform(object):
             rotation=R, translation=t, from_frame=from_frame, to_frame=to_frame
         )
 
+    @staticmethod
+    def save_archive(transforms, filename):
+        """Save many named transforms to a single binary file.
+
+        Unlike the .tf format, values are stored at full precision. A .npz
+        archive stores the arrays names, from_frame, to_frame, rotations,
+        translations, scales and similarity, a superset of the arrays saved
+        by RigidTransformArray.save. A .npy archive stores a structured
+        array with the same fields and can be memory-mapped by
+        load_archive.
+
+        Parameters
+        ----------
+        transforms : :obj:`dict` or :obj:`list` of :obj:`RigidTransform`
+            The transforms to save, keyed by name. The transforms in a list
+            are named by their index. SimilarityTransforms keep their scale.
+
+        filename : :obj:`str`
+            The file to save the transforms to.
+
+        Raises
+        ------
+        ValueError
+            If filename's extension isn't .npy or .npz, or an entry isn't a
+            RigidTransform.
+        """
+        _, file_ext = os.path.splitext(filename)
+        if file_ext.lower() not in TF_ARCHIVE_EXTENSIONS:
+            raise ValueError(
+                f"Extension {file_ext} not supported for transform archives. "
+                f"Must be one of {TF_ARCHIVE_EXTENSIONS}"
+            )
+        if not isinstance(transforms, dict):
+            transforms = {str(i): T for i, T in enumerate(transforms)}
+        for T in transforms.values():
+            if not isinstance(T, RigidTransform):
+                raise ValueError(
+                    "Can only archive RigidTransforms, got %s" % (type(T))
+                )
+
+        names = [str(name) for name in transforms.keys()]
+        tfs = list(transforms.values())
+        frames = [T.from_frame for T in tfs] + [T.to_frame for T in tfs]
+        name_len = max([1] + [len(n) for n in names])
+        frame_len = max([1] + [len(f) for f in frames])
+        records = np.zeros(
+            len(tfs), dtype=_transform_archive_dtype(name_len, frame_len)
+        )
+        records["names"] = names
+        records["from_frame"] = [T.from_frame for T in tfs]
+        records["to_frame"] = [T.to_frame for T in tfs]
+        records["rotations"] = [T.rotation for T in tfs]
+        records["translations"] = [T.translation for T in tfs]
+        records["scales"] = [getattr(T, "scale", 1.0) for T in tfs]
+        records["similarity"] = [
+            isinstance(T, SimilarityTransform) for T in tfs
+        ]
+
+        if file_ext.lower() == ".npy":
+            np.save(filename, records)
+        else:
+            np.savez(
+                filename,
+                **{field: records[field] for field in records.dtype.names},
+            )
+
+    @staticmethod
+    def load_archive(filename, as_array=False, mmap=False):
+        """Load named transforms saved with save_archive or
+        RigidTransformArray.save.
+
+        Parameters
+        ----------
+        filename : :obj:`str`
+            The file to load the transforms from.
+
+        as_array : bool
+            If True, returns the transforms as a single RigidTransformArray
+            instead of building transform objects.
+
+        mmap : bool
+            If True, memory-maps a .npy archive read-only instead of reading
+            it into memory. The arrays of a RigidTransformArray loaded with
+            as_array then stay memory-mapped.
+
+        Returns
+        -------
+        :obj:`dict` or :obj:`RigidTransformArray`
+            The transforms keyed by name, in the order they were saved, or
+            the RigidTransformArray of the archive if as_array is True.
+            Transforms saved by RigidTransformArray.save are named by their
+            index.
+
+        Raises
+        ------
+        ValueError
+            If filename's extension isn't .npy or .npz, mmap is requested
+            for a .npz archive, or as_array is requested for an archive with
+            SimilarityTransforms or with more than one pair of frames.
+        """
+        _, file_ext = os.path.splitext(filename)
+        if file_ext.lower() not in TF_ARCHIVE_EXTENSIONS:
+            raise ValueError(
+                f"Extension {file_ext} not supported for transform archives. "
+                f"Can only load extensions {TF_ARCHIVE_EXTENSIONS}"
+            )
+        if file_ext.lower() == ".npy":
+            records = np.load(filename, mmap_mode="r" if mmap else None)
+            data = {field: records[field] for field in records.dtype.names}
+        elif mmap:
+            raise ValueError("Only .npy transform archives can be mmapped")
+        else:
+            with np.load(filename) as npz:
+                data = {key: npz[key] for key in npz.files}
+
+        # arrays saved by RigidTransformArray.save share a single pair of
+        # frames and have no names or scales
+        num_transforms = data["rotations"].shape[0]
+        from_frames = np.broadcast_to(data["from_frame"], (num_transforms,))
+        to_frames = np.broadcast_to(data["to_frame"], (num_transforms,))
+        names = data.get("names", np.arange(num_transforms))
+        scales = data.get("scales", np.ones(num_transforms))
+        similarity = data.get(
+            "similarity", np.zeros(num_transforms, dtype=bool)
+        )
+
+        if as_array:
+            if np.any(similarity):
+                raise ValueError(
+                    "Cannot load SimilarityTransforms as a RigidTransformArray"
+                )
+            if len(set(from_frames)) > 1 or len(set(to_frames)) > 1:
+                raise ValueError(
+                    "Can only load transforms with the same frames as a "
+                    "RigidTransformArray"
+                )
+            from_frame = "world"
+            to_frame = "world"
+            if num_transforms > 0:
+                from_frame = str(from_frames[0])
+                to_frame = str(to_frames[0])
+            return RigidTransformArray._from_trusted(
+                data["rotations"], data["translations"], from_frame, to_frame
+            )
+
+        transforms = {}
+        rotations = np.array(data["rotations"], dtype=np.float64)
+        translations = np.array(data["translations"], dtype=np.float64)
+        for i in range(num_transforms):
+            tf_type = RigidTransform
+            if similarity[i]:
+                tf_type = SimilarityTransform
+            T = tf_type._from_trusted(
+                rotations[i],
+                translations[i],
+                str(from_frames[i]),
+                str(to_frames[i]),
+            )
+            if similarity[i]:
+                T._scale = float(scales[i])
+            transforms[str(names[i])] = T
+        return transforms
+
     def __eq__(self, other):
-        if isinstance(other, self.__class__):
-            return hash(self) == hash(other)
+        if type(other) is type(self):
+            return (
+                self._from_frame == other._from_frame
+                and self._to_frame == other._to_frame
+                and np.allclose(self._rotation, other._rotation)
+                and np.allclose(self._translation, other._translation)
+            )
         return False
 
     def __ne__(self, other):
@@ -1308,7 +1604,9 @@ class RigidTransform(object):
         return NotImplemented
 
     def __hash__(self):
-        return hash(str(self.__dict__))
+        # equality is up to floating point tolerance, so only the frames
+        # can be hashed consistently with it
+        return hash((self._from_frame, self._to_frame))
 
 
 class SimilarityTransform(RigidTransform):
@@ -1316,6 +1614,8 @@ class SimilarityTransform(RigidTransform):
     (rigid transformation + scaling)
     """
 
+    __slots__ = ("_scale",)
+
     def __init__(
         self,
         rotation=np.eye(3),
@@ -1368,9 +1668,18 @@ class SimilarityTransform(RigidTransform):
     @scale.setter
     def scale(self, scale):
         self._scale = scale
+        if hasattr(self, "_cache"):
+            self._clear_cache()
 
-    @property
-    def matrix(self):
+    def __eq__(self, other):
+        return RigidTransform.__eq__(self, other) and bool(
+            np.isclose(self._scale, other._scale)
+        )
+
+    def __hash__(self):
+        return RigidTransform.__hash__(self)
+
+    def _compute_matrix(self):
         matrix = np.r_[
             np.c_[self._rotation, self._translation], [[0, 0, 0, 1]]
         ]
@@ -1478,14 +1787,11 @@ class SimilarityTransform(RigidTransform):
         translation = self.translation + self.scale * self.rotation.dot(
             other_tf.translation
         )
-        scale = self.scale * other_scale
-        return SimilarityTransform(
-            rotation,
-            translation,
-            scale,
-            from_frame=other_tf.from_frame,
-            to_frame=self.to_frame,
+        composed_tf = SimilarityTransform._from_trusted(
+            rotation, translation, other_tf.from_frame, self.to_frame
         )
+        composed_tf._scale = self.scale * other_scale
+        return composed_tf
 
     def inverse(self):
         """Take the inverse of the similarity transform.
@@ -1495,16 +1801,14 @@ class SimilarityTransform(RigidTransform):
         :obj:`SimilarityTransform`
             The inverse of this SimilarityTransform.
         """
-        inv_rot = np.linalg.inv(self.rotation)
+        inv_rot = self.rotation.T.copy()
         inv_scale = 1.0 / self.scale
         inv_trans = -inv_scale * inv_rot.dot(self.translation)
-        return SimilarityTransform(
-            inv_rot,
-            inv_trans,
-            inv_scale,
-            from_frame=self._to_frame,
-            to_frame=self._from_frame,
+        inv_tf = SimilarityTransform._from_trusted(
+            inv_rot, inv_trans, self._to_frame, self._from_frame
         )
+        inv_tf._scale = inv_scale
+        return inv_tf
 
     def save(self, filename):
         """Save the SimliarityTransform to a file.
@@ -1670,3 +1974,659 @@ class SimilarityTransform(RigidTransform):
             f"to_frame={self.to_frame!r})"
         )
         return out
+
+
+class RigidTransformArray(object):
+    """An array of rigid transformations that share the same from and to
+    frames, stored as stacked rotations and translations so that
+    composition, inversion and application are vectorized over the array.
+    """
+
+    def __init__(
+        self,
+        rotations=None,
+        translations=None,
+        from_frame="unassigned",
+        to_frame="world",
+    ):
+        """Initialize a RigidTransformArray.
+
+        Parameters
+        ----------
+        rotations : :obj:`numpy.ndarray` of float
+            An Nx3x3 array of rotation matrices, or an Nx4 array of
+            quaternions in wxyz layout. Defaults to identity rotations.
+
+        translations : :obj:`numpy.ndarray` of float
+            An Nx3 array of translation vectors. Defaults to zero.
+
+        from_frame : :obj:`str`
+            A name for the frame of reference on which the transforms
+            operate.
+
+        to_frame : :obj:`str`
+            A name for the frame of reference to which the transforms
+            move objects.
+
+        Raises
+        ------
+        ValueError
+            If the frames are not strings, the arrays have the wrong shape or
+            different lengths, or a rotation matrix does not have
+            determinant 1.0.
+        """
+        if not isinstance(from_frame, str):
+            raise ValueError("Must provide string name of input frame of data")
+        if not isinstance(to_frame, str):
+            raise ValueError(
+                "Must provide string name of output frame of data"
+            )
+        if rotations is None and translations is None:
+            raise ValueError("Must provide rotations or translations")
+
+        if rotations is not None:
+            rotations = np.array(rotations, dtype=np.float64)
+            if rotations.ndim == 2 and rotations.shape[1] == 4:
+                norms = np.linalg.norm(rotations, axis=1)
+                if np.any(np.abs(norms - 1.0) > 1e-3):
+                    raise ValueError("Invalid quaternion. Must be norm 1.0")
+                rotations = RigidTransformArray.rotations_from_quaternions(
+                    rotations
+                )
+            if rotations.ndim != 3 or rotations.shape[1:] != (3, 3):
+                raise ValueError(
+                    "Rotations must be specified as an Nx3x3 or Nx4 ndarray"
+                )
+            if np.any(np.abs(np.linalg.det(rotations) - 1.0) > 1e-3):
+                raise ValueError(
+                    "Illegal rotation. Must have determinant == 1.0"
+                )
+        if translations is not None:
+            translations = np.array(translations, dtype=np.float64)
+            if translations.ndim != 2 or translations.shape[1] != 3:
+                raise ValueError(
+                    "Translations must be specified as an Nx3 ndarray"
+                )
+        if rotations is None:
+            rotations = np.tile(np.eye(3), [translations.shape[0], 1, 1])
+        if translations is None:
+            translations = np.zeros([rotations.shape[0], 3])
+        if rotations.shape[0] != translations.shape[0]:
+            raise ValueError(
+                "Got %d rotations and %d translations"
+                % (rotations.shape[0], translations.shape[0])
+            )
+
+        self._rotations = rotations
+        self._translations = translations
+        self._from_frame = from_frame
+        self._to_frame = to_frame
+
+    @staticmethod
+    def _from_trusted(rotations, translations, from_frame, to_frame):
+        """Creates a RigidTransformArray from arrays that are already known
+        to be valid, such as the results of composition and inversion,
+        without copying or validating them.
+        """
+        transforms = RigidTransformArray.__new__(RigidTransformArray)
+        transforms._rotations = rotations
+        transforms._translations = translations
+        transforms._from_frame = from_frame
+        transforms._to_frame = to_frame
+        return transforms
+
+    @property
+    def rotations(self):
+        """:obj:`numpy.ndarray` of float : Nx3x3 rotation matrices."""
+        return self._rotations
+
+    @property
+    def translations(self):
+        """:obj:`numpy.ndarray` of float : Nx3 translation vectors."""
+        return self._translations
+
+    @property
+    def from_frame(self):
+        """:obj:`str`: The identifier for the 'from' frame of reference."""
+        return self._from_frame
+
+    @property
+    def to_frame(self):
+        """:obj:`str`: The identifier for the 'to' frame of reference."""
+        return self._to_frame
+
+    @property
+    def frames(self):
+        """:obj:`str`: A string represeting the frame transform:
+        from {} to {}.
+        """
+        return "from {0} to {1}".format(self._from_frame, self._to_frame)
+
+    @property
+    def matrices(self):
+        """:obj:`numpy.ndarray` of float: Nx4x4 homogeneous matrices."""
+        matrices = np.zeros([len(self), 4, 4])
+        matrices[:, :3, :3] = self._rotations
+        matrices[:, :3, 3] = self._translations
+        matrices[:, 3, 3] = 1.0
+        return matrices
+
+    @property
+    def quaternions(self):
+        """:obj:`numpy.ndarray` of float: Nx4 quaternions in wxyz layout,
+        matching RigidTransform.quaternion.
+        """
+        q_xyzw = transformations.quaternion_from_matrix_batch(self._rotations)
+        return np.roll(q_xyzw, 1, axis=1)
+
+    @property
+    def euler_angles(self):
+        """:obj:`numpy.ndarray` of float: Nx3 euler angles (sxyz) of the
+        rotations, matching RigidTransform.euler_angles.
+        """
+        return transformations.euler_from_matrix_batch(self._rotations)
+
+    @property
+    def vecs(self):
+        """:obj:`numpy.ndarray` of float: Nx7 array of translations followed
+        by wxyz quaternions, matching RigidTransform.vec.
+        """
+        return np.c_[self._translations, self.quaternions]
+
+    @property
+    def dual_quaternions(self):
+        """:obj:`DualQuaternionArray`: The dual quaternions corresponding to
+        the transforms, matching RigidTransform.dual_quaternion.
+        """
+        qd = np.c_[np.zeros(len(self)), self._translations / 2.0]
+        return DualQuaternionArray._from_trusted(self.quaternions, qd)
+
+    def __len__(self):
+        return self._rotations.shape[0]
+
+    def __getitem__(self, key):
+        """Indexes the array.
+
+        Parameters
+        ----------
+        key : int, slice or :obj:`numpy.ndarray`
+            An integer index, or a slice, index array or boolean mask.
+
+        Returns
+        -------
+        :obj:`RigidTransform` or :obj:`RigidTransformArray`
+            A single transform for an integer index, and an array of
+            transforms otherwise.
+        """
+        if isinstance(key, (int, np.integer)):
+            return RigidTransform._from_trusted(
+                self._rotations[key].copy(),
+                self._translations[key].copy(),
+                self._from_frame,
+                self._to_frame,
+            )
+        return RigidTransformArray._from_trusted(
+            self._rotations[key],
+            self._translations[key],
+            self._from_frame,
+            self._to_frame,
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def copy(self):
+        """Returns a deep copy of the RigidTransformArray."""
+        return RigidTransformArray._from_trusted(
+            self._rotations.copy(),
+            self._translations.copy(),
+            self._from_frame,
+            self._to_frame,
+        )
+
+    def as_frames(self, from_frame, to_frame="world"):
+        """Return a shallow copy of this array with just the frames changed.
+
+        Parameters
+        ----------
+        from_frame : :obj:`str`
+            The new from_frame.
+
+        to_frame : :obj:`str`
+            The new to_frame.
+
+        Returns
+        -------
+        :obj:`RigidTransformArray`
+            The RigidTransformArray with new frames.
+        """
+        return RigidTransformArray._from_trusted(
+            self._rotations, self._translations, from_frame, to_frame
+        )
+
+    def to_transforms(self):
+        """Returns the transforms as a list.
+
+        Returns
+        -------
+        :obj:`list` of :obj:`RigidTransform`
+            The transforms in the array.
+        """
+        return list(self)
+
+    def inverse(self):
+        """Takes the inverse of every transform in the array.
+
+        Returns
+        -------
+        :obj:`RigidTransformArray`
+            The inverse transforms.
+        """
+        inv_rotations = self._rotations.transpose(0, 2, 1)
+        inv_translations = -np.einsum(
+            "nij,nj->ni", inv_rotations, self._translations
+        )
+        return RigidTransformArray._from_trusted(
+            np.ascontiguousarray(inv_rotations),
+            inv_translations,
+            self._to_frame,
+            self._from_frame,
+        )
+
+    def dot(self, other_tf):
+        """Composes the transforms in this array with other transforms.
+
+        The transforms in this array are on the left-hand side of the
+        composition. A single transform on either side is composed with
+        every transform on the other side, and two arrays of the same length
+        are composed elementwise.
+
+        Parameters
+        ----------
+        other_tf : :obj:`RigidTransform` or :obj:`RigidTransformArray`
+            The transforms to compose with.
+
+        Returns
+        -------
+        :obj:`RigidTransformArray`
+            The composed transforms.
+
+        Raises
+        ------
+        ValueError
+            If the to_frame of other_tf is not identical to this array's
+            from_frame, or the lengths of the arrays do not match.
+        """
+        if other_tf.to_frame != self._from_frame:
+            raise ValueError(
+                f"To frame of right hand side ({other_tf.to_frame}) "
+                f"must match from frame of left hand side ({self.from_frame})"
+            )
+        if isinstance(other_tf, SimilarityTransform):
+            raise ValueError(
+                "Cannot compose RigidTransformArray with SimilarityTransform"
+            )
+        if isinstance(other_tf, RigidTransform):
+            other_tf = RigidTransformArray.from_transforms([other_tf])
+        if not isinstance(other_tf, RigidTransformArray):
+            raise ValueError(
+                "Can only compose with RigidTransform or RigidTransformArray"
+            )
+        if len(self) != len(other_tf) and 1 not in (len(self), len(other_tf)):
+            raise ValueError(
+                "Cannot compose arrays of %d and %d transforms"
+                % (len(self), len(other_tf))
+            )
+
+        rotations = np.matmul(self._rotations, other_tf.rotations)
+        translations = (
+            np.einsum("nij,nj->ni", self._rotations, other_tf.translations)
+            + self._translations
+        )
+        return RigidTransformArray._from_trusted(
+            rotations, translations, other_tf.from_frame, self._to_frame
+        )
+
+    def apply(self, points):
+        """Applies every transform in the array to a set of 3D objects.
+
+        A single Point or Direction is mapped to a PointCloud or NormalCloud
+        with one column per transform. Other bags of points are mapped to a
+        list with one transformed bag per transform. Either way, all of the
+        transforms are applied with one batched matrix product.
+
+        Parameters
+        ----------
+        points : :obj:`BagOfPoints`
+            A set of objects to transform.
+
+        Returns
+        -------
+        :obj:`BagOfPoints` or :obj:`list` of :obj:`BagOfPoints`
+            The transformed objects.
+
+        Raises
+        ------
+        ValueError
+            If the input is not a Bag of 3D points or if the points are not in
+            this array's from_frame.
+        """
+        if not isinstance(points, BagOfPoints):
+            raise ValueError(
+                "Rigid transformations can only be applied to bags of points"
+            )
+        if points.dim != 3:
+            raise ValueError(
+                "Rigid transformations can only be applied to "
+                "3-dimensional points"
+            )
+        if points.frame != self._from_frame:
+            raise ValueError(
+                f"Cannot transform points in frame {points.frame} with "
+                f"rigid transformation from frame {self._from_frame} "
+                f"to frame {self._to_frame}"
+            )
+
+        x = points.data
+        if len(x.shape) == 1:
+            x = x[:, np.newaxis]
+        x_tf = np.matmul(self._rotations, x)
+        if not isinstance(points, BagOfVectors):
+            x_tf += self._translations[:, :, np.newaxis]
+
+        if isinstance(points, Point):
+            return PointCloud(x_tf[:, :, 0].T, frame=self._to_frame)
+        elif isinstance(points, Direction):
+            return NormalCloud(x_tf[:, :, 0].T, frame=self._to_frame)
+        elif isinstance(points, PointCloud):
+            return [PointCloud(x, frame=self._to_frame) for x in x_tf]
+        elif isinstance(points, NormalCloud):
+            return [NormalCloud(x, frame=self._to_frame) for x in x_tf]
+        raise ValueError("Type %s not yet supported" % (type(points)))
+
+    def __mul__(self, rigid_object):
+        """Composes with transforms or applies to a bag of points, as in
+        RigidTransform.__mul__.
+        """
+        if isinstance(rigid_object, (RigidTransform, RigidTransformArray)):
+            return self.dot(rigid_object)
+        if isinstance(rigid_object, BagOfPoints):
+            return self.apply(rigid_object)
+        raise ValueError(
+            "Cannot multiply rigid transform array with object of type %s"
+            % (type(rigid_object))
+        )
+
+    def save(self, filename):
+        """Save the RigidTransformArray to a .npz file.
+
+        Parameters
+        ----------
+        filename : :obj:`str`
+            The file to save the transforms to.
+
+        Raises
+        ------
+        ValueError
+            If filename's extension isn't .npz.
+        """
+        _, file_ext = os.path.splitext(filename)
+        if file_ext.lower() != TF_ARRAY_EXTENSION:
+            raise ValueError(
+                f"Extension {file_ext} not supported for RigidTransformArray. "
+                f"Must be stored with extension {TF_ARRAY_EXTENSION}"
+            )
+        np.savez(
+            filename,
+            rotations=self._rotations,
+            translations=self._translations,
+            from_frame=self._from_frame,
+            to_frame=self._to_frame,
+        )
+
+    @staticmethod
+    def load(filename):
+        """Load a RigidTransformArray from a .npz file. Archives saved by
+        RigidTransform.save_archive can be loaded as well if their
+        transforms are rigid and share the same frames.
+
+        Parameters
+        ----------
+        filename : :obj:`str`
+            The file to load the transforms from.
+
+        Returns
+        -------
+        :obj:`RigidTransformArray`
+            The RigidTransformArray read from the file.
+
+        Raises
+        ------
+        ValueError
+            If filename's extension isn't .npz, or the file holds
+            SimilarityTransforms or more than one pair of frames.
+        """
+        _, file_ext = os.path.splitext(filename)
+        if file_ext.lower() != TF_ARRAY_EXTENSION:
+            raise ValueError(
+                f"Extension {file_ext} not supported for RigidTransformArray. "
+                f"Can only load extension {TF_ARRAY_EXTENSION}"
+            )
+        return RigidTransform.load_archive(filename, as_array=True)
+
+    @staticmethod
+    def from_transforms(transforms):
+        """Creates a RigidTransformArray from a list of transforms.
+
+        Parameters
+        ----------
+        transforms : :obj:`list` of :obj:`RigidTransform`
+            Transforms that all have the same from and to frames.
+
+        Returns
+        -------
+        :obj:`RigidTransformArray`
+            The array of the transforms.
+
+        Raises
+        ------
+        ValueError
+            If the list is empty or the frames of the transforms differ.
+        """
+        if len(transforms) == 0:
+            raise ValueError("Must provide at least one transform")
+        from_frame = transforms[0].from_frame
+        to_frame = transforms[0].to_frame
+        for T in transforms:
+            if T.from_frame != from_frame or T.to_frame != to_frame:
+                raise ValueError(
+                    "All transforms must have the same frames, got "
+                    f"{T.frames} and from {from_frame} to {to_frame}"
+                )
+        return RigidTransformArray._from_trusted(
+            np.array([T.rotation for T in transforms], dtype=np.float64),
+            np.array([T.translation for T in transforms], dtype=np.float64),
+            from_frame,
+            to_frame,
+        )
+
+    @staticmethod
+    def from_matrices(matrices, from_frame="unassigned", to_frame="world"):
+        """Creates a RigidTransformArray from Nx4x4 homogeneous matrices."""
+        matrices = np.asarray(matrices, dtype=np.float64)
+        return RigidTransformArray(
+            matrices[:, :3, :3], matrices[:, :3, 3], from_frame, to_frame
+        )
+
+    @staticmethod
+    def from_vecs(vecs, from_frame="unassigned", to_frame="world"):
+        """Creates a RigidTransformArray from an Nx7 array of translations
+        followed by wxyz quaternions, as in RigidTransform.from_vec.
+        """
+        vecs = np.asarray(vecs, dtype=np.float64)
+        return RigidTransformArray(
+            vecs[:, 3:], vecs[:, :3], from_frame, to_frame
+        )
+
+    @staticmethod
+    def from_euler_angles(
+        euler_angles,
+        translations=None,
+        from_frame="unassigned",
+        to_frame="world",
+    ):
+        """Creates a RigidTransformArray from an Nx3 array of euler angles
+        (sxyz), as returned by euler_angles.
+        """
+        euler_angles = np.asarray(euler_angles, dtype=np.float64)
+        rotations = transformations.euler_matrix_batch(
+            euler_angles[:, 0], euler_angles[:, 1], euler_angles[:, 2]
+        )[:, :3, :3]
+        return RigidTransformArray(
+            rotations, translations, from_frame, to_frame
+        )
+
+    def mean(self, weights=None):
+        """Averages the transforms by blending their dual quaternions, as
+        in DualQuaternionArray.blend.
+
+        Parameters
+        ----------
+        weights : :obj:`numpy.ndarray` of float
+            An N array of weights for the transforms. Defaults to uniform
+            weights.
+
+        Returns
+        -------
+        :obj:`RigidTransform`
+            The weighted average transform, with the frames of this array.
+        """
+        dq = self.dual_quaternions.blend(weights)
+        return RigidTransform.transform_from_dual_quaternion(
+            dq, self._from_frame, self._to_frame
+        )
+
+    @staticmethod
+    def transforms_from_dual_quaternions(
+        dqs, from_frame="unassigned", to_frame="world"
+    ):
+        """Create a RigidTransformArray from a DualQuaternionArray.
+
+        Parameters
+        ----------
+        dqs : :obj:`DualQuaternionArray`
+            The dual quaternions to convert. Their qr are normalized.
+
+        from_frame : :obj:`str`
+            A name for the frame of reference on which the transforms
+            operate.
+
+        to_frame : :obj:`str`
+            A name for the frame of reference to which the transforms
+            move objects.
+
+        Returns
+        -------
+        :obj:`RigidTransformArray`
+            The RigidTransformArray made from the dual quaternions.
+        """
+        dqs = dqs.normalized
+        return RigidTransformArray._from_trusted(
+            RigidTransformArray.rotations_from_quaternions(dqs.qr),
+            2 * dqs.qd[:, 1:],
+            from_frame,
+            to_frame,
+        )
+
+    @staticmethod
+    def interpolate(T0, T1, ts, method="slerp"):
+        """Interpolates between two transforms at many steps at once.
+
+        Parameters
+        ----------
+        T0 : :obj:`RigidTransform`
+            The first RigidTransform to interpolate.
+
+        T1 : :obj:`RigidTransform`
+            The second RigidTransform to interpolate.
+
+        ts : :obj:`numpy.ndarray` of float
+            The interpolation steps in [0,1]. 0 favors T0, 1 favors T1.
+
+        method : :obj:`str`
+            How to interpolate the rotations. 'slerp' matches
+            RigidTransform.interpolate_with, and 'dq' blends the dual
+            quaternions linearly as in RigidTransform.interpolate. The
+            translations are interpolated linearly either way.
+
+        Returns
+        -------
+        :obj:`RigidTransformArray`
+            The interpolated transforms, with the frames of T0.
+
+        Raises
+        ------
+        ValueError
+            If the to_frame of the two RigidTransforms are not identical, a
+            step is outside [0,1] or the method is not supported.
+        """
+        if T0.to_frame != T1.to_frame:
+            raise ValueError(
+                "Cannot interpolate between 2 transforms with different "
+                f"to frames! Got T1 {T0.to_frame} and T2 {T1.to_frame}"
+            )
+        ts = np.asarray(ts, dtype=np.float64).ravel()
+        if np.any((ts < 0) | (ts > 1)):
+            raise ValueError("Must interpolate between 0 and 1")
+
+        q0 = T0.quaternion
+        q1 = T1.quaternion
+        if method == "slerp":
+            q_wxyz = transformations.quaternion_slerp_batch(q0, q1, ts)
+        elif method == "dq":
+            q_wxyz = np.outer(1.0 - ts, q0) + np.outer(ts, q1)
+            q_wxyz /= np.linalg.norm(q_wxyz, axis=1)[:, np.newaxis]
+        else:
+            raise ValueError("Interpolation method %s not supported" % method)
+
+        translations = np.outer(1.0 - ts, T0.translation) + np.outer(
+            ts, T1.translation
+        )
+        return RigidTransformArray._from_trusted(
+            RigidTransformArray.rotations_from_quaternions(q_wxyz),
+            translations,
+            T0.from_frame,
+            T0.to_frame,
+        )
+
+    @staticmethod
+    def rotations_from_quaternions(q_wxyz):
+        """Convert an Nx4 array of wxyz quaternions to rotation matrices.
+
+        Parameters
+        ----------
+        q_wxyz : :obj:`numpy.ndarray` of float
+            Quaternions in wxyz order.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray` of float
+            Nx3x3 rotation matrices made from the quaternions.
+        """
+        q_xyzw = np.roll(np.asarray(q_wxyz, dtype=np.float64), -1, axis=1)
+        return transformations.quaternion_matrix_batch(q_xyzw)[:, :3, :3]
+
+    def __str__(self):
+        return "RigidTransformArray of {0} transforms from {1} to {2}".format(
+            len(self), self._from_frame, self._to_frame
+        )
+
+    def __repr__(self):
+        out = (
+            f"RigidTransformArray(rotations=np.{self._rotations!r}, "
+            f"translations=np.{self._translations!r}, "
+            f"from_frame={self._from_frame!r}, "
+            f"to_frame={self._to_frame!r})"
+        )
+        return out
@@ -1051,6 +1051,65 @@ def euler_matrix(ai, aj, ak, axes="sxyz"):
     return M
 
 
+def euler_matrix_batch(ai, aj, ak, axes="sxyz"):
+    """Return homogeneous rotation matrices from arrays of Euler angles.
+
+    Batched version of euler_matrix. Returns an array of shape (N, 4, 4).
+
+    >>> ai, aj, ak = numpy.random.random((3, 10))
+    >>> R = euler_matrix_batch(ai, aj, ak, 'syxz')
+    >>> numpy.allclose(R[3], euler_matrix(ai[3], aj[3], ak[3], 'syxz'))
+    True
+
+    """
+    try:
+        firstaxis, parity, repetition, frame = _AXES2TUPLE[axes]
+    except (AttributeError, KeyError):
+        _ = _TUPLE2AXES[axes]
+        firstaxis, parity, repetition, frame = axes
+
+    i = firstaxis
+    j = _NEXT_AXIS[i + parity]
+    k = _NEXT_AXIS[i - parity + 1]
+
+    ai = numpy.asarray(ai, dtype=numpy.float64).ravel()
+    aj = numpy.asarray(aj, dtype=numpy.float64).ravel()
+    ak = numpy.asarray(ak, dtype=numpy.float64).ravel()
+    if frame:
+        ai, ak = ak, ai
+    if parity:
+        ai, aj, ak = -ai, -aj, -ak
+
+    si, sj, sk = numpy.sin(ai), numpy.sin(aj), numpy.sin(ak)
+    ci, cj, ck = numpy.cos(ai), numpy.cos(aj), numpy.cos(ak)
+    cc, cs = ci * ck, ci * sk
+    sc, ss = si * ck, si * sk
+
+    M = numpy.zeros((ai.shape[0], 4, 4))
+    M[:, 3, 3] = 1.0
+    if repetition:
+        M[:, i, i] = cj
+        M[:, i, j] = sj * si
+        M[:, i, k] = sj * ci
+        M[:, j, i] = sj * sk
+        M[:, j, j] = -cj * ss + cc
+        M[:, j, k] = -cj * cs - sc
+        M[:, k, i] = -sj * ck
+        M[:, k, j] = cj * sc + cs
+        M[:, k, k] = cj * cc - ss
+    else:
+        M[:, i, i] = cj * ck
+        M[:, i, j] = sj * sc - cs
+        M[:, i, k] = sj * cc + ss
+        M[:, j, i] = cj * sk
+        M[:, j, j] = sj * ss + cc
+        M[:, j, k] = sj * cs - sc
+        M[:, k, i] = -sj
+        M[:, k, j] = cj * si
+        M[:, k, k] = cj * ci
+    return M
+
+
 def euler_from_matrix(matrix, axes="sxyz"):
     """Return Euler angles from rotation matrix for specified axis sequence.
 
@@ -1109,6 +1168,57 @@ def euler_from_matrix(matrix, axes="sxyz"):
     return ax, ay, az
 
 
+def euler_from_matrix_batch(matrices, axes="sxyz"):
+    """Return Euler angles from an array of rotation matrices.
+
+    Batched version of euler_from_matrix. Accepts an array of shape
+    (N, 3, 3) or (N, 4, 4) and returns an array of shape (N, 3).
+
+    >>> R = euler_matrix_batch(*numpy.random.random((3, 10)), axes='syxz')
+    >>> angles = euler_from_matrix_batch(R, 'syxz')
+    >>> numpy.allclose(angles[3], euler_from_matrix(R[3], 'syxz'))
+    True
+
+    """
+    try:
+        firstaxis, parity, repetition, frame = _AXES2TUPLE[axes.lower()]
+    except (AttributeError, KeyError):
+        _ = _TUPLE2AXES[axes]
+        firstaxis, parity, repetition, frame = axes
+
+    i = firstaxis
+    j = _NEXT_AXIS[i + parity]
+    k = _NEXT_AXIS[i - parity + 1]
+
+    M = numpy.asarray(matrices, dtype=numpy.float64)[:, :3, :3]
+    if repetition:
+        sy = numpy.sqrt(M[:, i, j] * M[:, i, j] + M[:, i, k] * M[:, i, k])
+        regular = sy > _EPS
+        ax = numpy.where(
+            regular,
+            numpy.arctan2(M[:, i, j], M[:, i, k]),
+            numpy.arctan2(-M[:, j, k], M[:, j, j]),
+        )
+        ay = numpy.arctan2(sy, M[:, i, i])
+        az = numpy.where(regular, numpy.arctan2(M[:, j, i], -M[:, k, i]), 0.0)
+    else:
+        cy = numpy.sqrt(M[:, i, i] * M[:, i, i] + M[:, j, i] * M[:, j, i])
+        regular = cy > _EPS
+        ax = numpy.where(
+            regular,
+            numpy.arctan2(M[:, k, j], M[:, k, k]),
+            numpy.arctan2(-M[:, j, k], M[:, j, j]),
+        )
+        ay = numpy.arctan2(-M[:, k, i], cy)
+        az = numpy.where(regular, numpy.arctan2(M[:, j, i], M[:, i, i]), 0.0)
+
+    if parity:
+        ax, ay, az = -ax, -ay, -az
+    if frame:
+        ax, az = az, ax
+    return numpy.stack([ax, ay, az], axis=1)
+
+
 def euler_from_quaternion(quaternion, axes="sxyz"):
     """Return Euler angles from quaternion for specified axis sequence.
 
@@ -1120,6 +1230,20 @@ def euler_from_quaternion(quaternion, axes="sxyz"):
     return euler_from_matrix(quaternion_matrix(quaternion), axes)
 
 
+def euler_from_quaternion_batch(quaternions, axes="sxyz"):
+    """Return Euler angles from an array of quaternions.
+
+    Batched version of euler_from_quaternion. Accepts an array of shape
+    (N, 4) and returns an array of shape (N, 3).
+
+    >>> angles = euler_from_quaternion_batch([[0.06146124, 0, 0, 0.99810947]])
+    >>> numpy.allclose(angles, [[0.123, 0, 0]])
+    True
+
+    """
+    return euler_from_matrix_batch(quaternion_matrix_batch(quaternions), axes)
+
+
 def quaternion_from_euler(ai, aj, ak, axes="sxyz"):
     """Return quaternion from Euler angles and axis sequence.
 
@@ -1177,6 +1301,68 @@ def quaternion_from_euler(ai, aj, ak, axes="sxyz"):
     return quaternion
 
 
+def quaternion_from_euler_batch(ai, aj, ak, axes="sxyz"):
+    """Return quaternions from arrays of Euler angles.
+
+    Batched version of quaternion_from_euler. ai, aj and ak are arrays of
+    shape (N,), and the result has shape (N, 4).
+
+    >>> q = quaternion_from_euler_batch([1, 0], [2, 0], [3, 0], 'ryxz')
+    >>> numpy.allclose(q[0], [0.310622, -0.718287, 0.444435, 0.435953])
+    True
+    >>> numpy.allclose(q[1], [0, 0, 0, 1])
+    True
+
+    """
+    try:
+        firstaxis, parity, repetition, frame = _AXES2TUPLE[axes.lower()]
+    except (AttributeError, KeyError):
+        _ = _TUPLE2AXES[axes]
+        firstaxis, parity, repetition, frame = axes
+
+    i = firstaxis
+    j = _NEXT_AXIS[i + parity]
+    k = _NEXT_AXIS[i - parity + 1]
+
+    ai = numpy.array(ai, dtype=numpy.float64, ndmin=1)
+    aj = numpy.array(aj, dtype=numpy.float64, ndmin=1)
+    ak = numpy.array(ak, dtype=numpy.float64, ndmin=1)
+    if frame:
+        ai, ak = ak, ai
+    if parity:
+        aj = -aj
+
+    ai = ai / 2.0
+    aj = aj / 2.0
+    ak = ak / 2.0
+    ci = numpy.cos(ai)
+    si = numpy.sin(ai)
+    cj = numpy.cos(aj)
+    sj = numpy.sin(aj)
+    ck = numpy.cos(ak)
+    sk = numpy.sin(ak)
+    cc = ci * ck
+    cs = ci * sk
+    sc = si * ck
+    ss = si * sk
+
+    quaternions = numpy.empty((ai.shape[0], 4), dtype=numpy.float64)
+    if repetition:
+        quaternions[:, i] = cj * (cs + sc)
+        quaternions[:, j] = sj * (cc + ss)
+        quaternions[:, k] = sj * (cs - sc)
+        quaternions[:, 3] = cj * (cc - ss)
+    else:
+        quaternions[:, i] = cj * sc - sj * cs
+        quaternions[:, j] = cj * ss + sj * cc
+        quaternions[:, k] = cj * cs - sj * sc
+        quaternions[:, 3] = cj * cc + sj * ss
+    if parity:
+        quaternions[:, j] *= -1
+
+    return quaternions
+
+
 def quaternion_about_axis(angle, axis):
     """Return quaternion for rotation about axis.
 
@@ -1234,6 +1420,40 @@ def quaternion_matrix(quaternion):
     )
 
 
+def quaternion_matrix_batch(quaternions):
+    """Return homogeneous rotation matrices from an array of quaternions.
+
+    Batched version of quaternion_matrix. Accepts an array of shape (N, 4)
+    and returns an array of shape (N, 4, 4).
+
+    >>> q = [[0.06146124, 0, 0, 0.99810947], [0, 0, 0, 0]]
+    >>> R = quaternion_matrix_batch(q)
+    >>> numpy.allclose(R[0], rotation_matrix(0.123, (1, 0, 0)))
+    True
+    >>> numpy.allclose(R[1], numpy.identity(4))
+    True
+
+    """
+    q = numpy.array(quaternions, dtype=numpy.float64)[:, :4]
+    nq = numpy.sum(q * q, axis=1)
+    valid = nq >= _EPS
+    q[valid] *= numpy.sqrt(2.0 / nq[valid])[:, numpy.newaxis]
+    q[~valid] = 0.0
+    q = q[:, :, numpy.newaxis] * q[:, numpy.newaxis, :]
+    M = numpy.zeros((q.shape[0], 4, 4))
+    M[:, 0, 0] = 1.0 - q[:, 1, 1] - q[:, 2, 2]
+    M[:, 0, 1] = q[:, 0, 1] - q[:, 2, 3]
+    M[:, 0, 2] = q[:, 0, 2] + q[:, 1, 3]
+    M[:, 1, 0] = q[:, 0, 1] + q[:, 2, 3]
+    M[:, 1, 1] = 1.0 - q[:, 0, 0] - q[:, 2, 2]
+    M[:, 1, 2] = q[:, 1, 2] - q[:, 0, 3]
+    M[:, 2, 0] = q[:, 0, 2] - q[:, 1, 3]
+    M[:, 2, 1] = q[:, 1, 2] + q[:, 0, 3]
+    M[:, 2, 2] = 1.0 - q[:, 0, 0] - q[:, 1, 1]
+    M[:, 3, 3] = 1.0
+    return M
+
+
 def quaternion_from_matrix(matrix):
     """Return quaternion from rotation matrix.
 
@@ -1266,6 +1486,51 @@ def quaternion_from_matrix(matrix):
     return q
 
 
+def quaternion_from_matrix_batch(matrices):
+    """Return quaternions from an array of rotation matrices.
+
+    Batched version of quaternion_from_matrix. Accepts an array of shape
+    (N, 3, 3) or (N, 4, 4) and returns an array of shape (N, 4).
+
+    >>> R = numpy.array([rotation_matrix(0.123, (1, 2, 3))] * 2)
+    >>> q = quaternion_from_matrix_batch(R)
+    >>> numpy.allclose(q[1], [0.0164262, 0.0328524, 0.0492786, 0.9981095])
+    True
+
+    """
+    matrices = numpy.asarray(matrices, dtype=numpy.float64)
+    n = matrices.shape[0]
+    M = numpy.zeros((n, 4, 4))
+    M[:, :3, :3] = matrices[:, :3, :3]
+    M[:, 3, 3] = matrices[:, 3, 3] if matrices.shape[1] == 4 else 1.0
+    q = numpy.empty((n, 4), dtype=numpy.float64)
+    t = numpy.trace(M, axis1=1, axis2=2)
+
+    # rotations with a positive trace
+    trace_case = t > M[:, 3, 3]
+    q[:, 3] = t
+    q[:, 2] = M[:, 1, 0] - M[:, 0, 1]
+    q[:, 1] = M[:, 0, 2] - M[:, 2, 0]
+    q[:, 0] = M[:, 2, 1] - M[:, 1, 2]
+
+    # remaining rotations, pivoting on the largest diagonal entry
+    ind = numpy.flatnonzero(~trace_case)
+    Mr = M[ind]
+    i = numpy.where(Mr[:, 1, 1] > Mr[:, 0, 0], 1, 0)
+    i = numpy.where(Mr[:, 2, 2] > Mr[numpy.arange(ind.shape[0]), i, i], 2, i)
+    j = (i + 1) % 3
+    k = (i + 2) % 3
+    r = numpy.arange(ind.shape[0])
+    tr = Mr[r, i, i] - (Mr[r, j, j] + Mr[r, k, k]) + Mr[:, 3, 3]
+    t[ind] = tr
+    q[ind, i] = tr
+    q[ind, j] = Mr[r, i, j] + Mr[r, j, i]
+    q[ind, k] = Mr[r, k, i] + Mr[r, i, k]
+    q[ind, 3] = Mr[r, k, j] - Mr[r, j, k]
+    q *= (0.5 / numpy.sqrt(t * M[:, 3, 3]))[:, numpy.newaxis]
+    return q
+
+
 def quaternion_multiply(quaternion1, quaternion0):
     """Return multiplication of two quaternions.
 
@@ -1314,6 +1579,67 @@ def quaternion_inverse(quaternion):
     return quaternion_conjugate(quaternion) / numpy.dot(quaternion, quaternion)
 
 
+def quaternion_multiply_batch(quaternion1, quaternion0):
+    """Return multiplications of arrays of quaternions.
+
+    Batched version of quaternion_multiply. The arguments are arrays of
+    shape (4,) or (N, 4), broadcast against each other, and the result has
+    shape (N, 4).
+
+    >>> q = quaternion_multiply_batch([[1, -2, 3, 4]], [[-5, 6, 7, 8]] * 2)
+    >>> numpy.allclose(q, [[-44, -14, 48, 28]] * 2)
+    True
+
+    """
+    q0 = numpy.array(quaternion0, dtype=numpy.float64, ndmin=2)
+    q1 = numpy.array(quaternion1, dtype=numpy.float64, ndmin=2)
+    x0, y0, z0, w0 = q0[:, 0], q0[:, 1], q0[:, 2], q0[:, 3]
+    x1, y1, z1, w1 = q1[:, 0], q1[:, 1], q1[:, 2], q1[:, 3]
+    return numpy.stack(
+        (
+            x1 * w0 + y1 * z0 - z1 * y0 + w1 * x0,
+            -x1 * z0 + y1 * w0 + z1 * x0 + w1 * y0,
+            x1 * y0 - y1 * x0 + z1 * w0 + w1 * z0,
+            -x1 * x0 - y1 * y0 - z1 * z0 + w1 * w0,
+        ),
+        axis=1,
+    )
+
+
+def quaternion_conjugate_batch(quaternions):
+    """Return conjugates of an array of quaternions.
+
+    Batched version of quaternion_conjugate for arrays of shape (N, 4).
+
+    >>> q0 = random_quaternion()
+    >>> q1 = quaternion_conjugate_batch([q0])
+    >>> numpy.allclose(q1[0], quaternion_conjugate(q0))
+    True
+
+    """
+    q = numpy.array(quaternions, dtype=numpy.float64, ndmin=2)
+    q[:, :3] *= -1.0
+    return q
+
+
+def quaternion_inverse_batch(quaternions):
+    """Return inverses of an array of quaternions.
+
+    Batched version of quaternion_inverse for arrays of shape (N, 4).
+
+    >>> q0 = random_quaternion()
+    >>> q1 = quaternion_inverse_batch([q0])
+    >>> numpy.allclose(quaternion_multiply_batch(q0, q1), [[0, 0, 0, 1]])
+    True
+
+    """
+    q = numpy.array(quaternions, dtype=numpy.float64, ndmin=2)
+    return (
+        quaternion_conjugate_batch(q)
+        / numpy.sum(q * q, axis=1)[:, numpy.newaxis]
+    )
+
+
 def quaternion_slerp(quat0, quat1, fraction, spin=0, shortestpath=True):
     """Return spherical linear interpolation between two quaternions.
 
@@ -1355,6 +1681,54 @@ def quaternion_slerp(quat0, quat1, fraction, spin=0, shortestpath=True):
     return q0
 
 
+def quaternion_slerp_batch(quat0, quat1, fraction, spin=0, shortestpath=True):
+    """Return spherical linear interpolations between quaternions.
+
+    Batched version of quaternion_slerp. quat0 and quat1 are arrays of shape
+    (4,) or (N, 4) and fraction is a scalar or an array of shape (N,); they
+    are broadcast against each other. Returns an array of shape (N, 4).
+
+    >>> q0 = random_quaternion()
+    >>> q1 = random_quaternion()
+    >>> q = quaternion_slerp_batch(q0, q1, [0.0, 0.5, 1.0])
+    >>> numpy.allclose(q[0], q0) and numpy.allclose(q[2], q1)
+    True
+    >>> numpy.allclose(q[1], quaternion_slerp(q0, q1, 0.5))
+    True
+
+    """
+    q0 = numpy.atleast_2d(numpy.array(quat0, dtype=numpy.float64))[:, :4]
+    q1 = numpy.atleast_2d(numpy.array(quat1, dtype=numpy.float64))[:, :4]
+    fraction = numpy.atleast_1d(numpy.asarray(fraction, dtype=numpy.float64))
+    q0 = q0 / numpy.sqrt(numpy.sum(q0 * q0, axis=1))[:, numpy.newaxis]
+    q1 = q1 / numpy.sqrt(numpy.sum(q1 * q1, axis=1))[:, numpy.newaxis]
+    q0, q1 = numpy.broadcast_arrays(q0, q1)
+    n = numpy.broadcast(q0[:, 0], fraction).shape[0]
+    q0 = numpy.broadcast_to(q0, (n, 4))
+    q1 = numpy.broadcast_to(q1, (n, 4))
+    fraction = numpy.broadcast_to(fraction, (n,))
+
+    d = numpy.sum(q0 * q1, axis=1)
+    flip = shortestpath & (d < 0.0)
+    d = numpy.where(flip, -d, d)
+    q1_path = numpy.where(flip[:, numpy.newaxis], -q1, q1)
+    angle = numpy.arccos(numpy.clip(d, -1.0, 1.0)) + spin * math.pi
+    degenerate = (numpy.abs(numpy.abs(d) - 1.0) < _EPS) | (
+        numpy.abs(angle) < _EPS
+    )
+    angle = numpy.where(degenerate, 1.0, angle)
+    isin = 1.0 / numpy.sin(angle)
+    w0 = numpy.sin((1.0 - fraction) * angle) * isin
+    w1 = numpy.sin(fraction * angle) * isin
+    q = w0[:, numpy.newaxis] * q0 + w1[:, numpy.newaxis] * q1_path
+
+    # match the early returns of quaternion_slerp
+    q = numpy.where(degenerate[:, numpy.newaxis], q0, q)
+    q = numpy.where((fraction == 1.0)[:, numpy.newaxis], q1, q)
+    q = numpy.where((fraction == 0.0)[:, numpy.newaxis], q0, q)
+    return q
+
+
 def random_quaternion(rand=None):
     """Return uniform random unit quaternion.
 
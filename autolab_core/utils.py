@@ -126,7 +126,7 @@ def skew(xi):
     """
     S = np.array(
         [[0, -xi[2], xi[1]], [xi[2], 0, -xi[0]], [-xi[1], xi[0], 0]],
-        dtype=np.float,
+        dtype=np.float64,
     )
     return S
 
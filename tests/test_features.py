@@ -0,0 +1,190 @@
+"""
+Copyright ©2017. The Regents of the University of California (Regents).
+All Rights Reserved. Permission to use, copy, modify, and distribute this
+software and its documentation for educational, research, and not-for-profit
+purposes, without fee and without a signed licensing agreement, is hereby
+granted, provided that the above copyright notice, this paragraph and the
+following two paragraphs appear in all copies, modifications, and
+distributions. Contact The Office of Technology Licensing, UC Berkeley,
+2150 Shattuck Avenue, Suite 510, Berkeley, CA 94720-1620, (510) 643-7201,
+otl@berkeley.edu, http://ipira.berkeley.edu/industry-info for commercial
+licensing opportunities.
+
+IN NO EVENT SHALL REGENTS BE LIABLE TO ANY PARTY FOR DIRECT, INDIRECT,
+SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST PROFITS,
+ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+REGENTS HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+REGENTS SPECIFICALLY DISCLAIMS ANY WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+PURPOSE. THE SOFTWARE AND ACCOMPANYING DOCUMENTATION, IF ANY, PROVIDED
+HEREUNDER IS PROVIDED "AS IS". REGENTS HAS NO OBLIGATION TO PROVIDE
+MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+Test the bags of features
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from autolab_core import (
+    BagOfFeatures,
+    BruteForceFeatureIndex,
+    IVFFeatureIndex,
+    LocalFeature,
+    MVCNNFeature,
+    RigidTransform,
+    SHOTFeature,
+)
+
+from .constants import NUM_POINTS
+
+
+class FeaturesTest(unittest.TestCase):
+    def test_local_features(self):
+        descriptors = np.random.rand(NUM_POINTS, 8)
+        keypoints = np.random.rand(NUM_POINTS, 3)
+        normals = np.random.rand(NUM_POINTS, 3)
+        features = [
+            SHOTFeature(d, np.eye(3), p, n)
+            for d, p, n in zip(descriptors, keypoints, normals)
+        ]
+
+        bag = BagOfFeatures(features[:10])
+        bag.extend(features[10:-1])
+        bag.add(features[-1])
+        self.assertEqual(bag.num_features, NUM_POINTS)
+        self.assertTrue(np.array_equal(bag.descriptors, descriptors))
+        self.assertTrue(np.array_equal(bag.keypoints, keypoints))
+        self.assertTrue(np.array_equal(bag.normals, normals))
+        self.assertEqual(bag.reference_frames.shape, (NUM_POINTS, 3, 3))
+        self.assertFalse(bag.descriptors.flags.writeable)
+
+        feature = bag.feature(5)
+        self.assertIsInstance(feature, SHOTFeature)
+        self.assertTrue(np.array_equal(feature.descriptor, descriptors[5]))
+        self.assertTrue(np.shares_memory(feature.keypoint, bag.keypoints))
+        subset = bag.feature_subset(np.array([1, 3]))
+        self.assertTrue(np.array_equal(subset[1].normal, normals[3]))
+        with self.assertRaises(ValueError):
+            bag.feature(NUM_POINTS)
+        with self.assertRaises(ValueError):
+            bag.add(LocalFeature(np.zeros(4), None, np.zeros(3), None))
+        with self.assertRaises(ValueError):
+            bag.add(MVCNNFeature("key", np.zeros(8)))
+
+        bulk = BagOfFeatures.from_arrays(
+            descriptors, keypoints=keypoints, normals=normals
+        )
+        self.assertTrue(np.array_equal(bulk.keypoints, keypoints))
+        self.assertIsInstance(bulk.feature(0), LocalFeature)
+        with self.assertRaises(ValueError):
+            BagOfFeatures.from_arrays(descriptors, poses=[None] * NUM_POINTS)
+        with self.assertRaises(ValueError):
+            BagOfFeatures.from_arrays(
+                descriptors,
+                keypoints=keypoints,
+                keys=["key"] * NUM_POINTS,
+            )
+        with self.assertRaises(ValueError):
+            BagOfFeatures.from_arrays(descriptors, feature_type=MVCNNFeature)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "features.npz")
+            bag.save(filename)
+            loaded = BagOfFeatures.load(filename)
+        self.assertEqual(loaded.num_features, NUM_POINTS)
+        self.assertTrue(np.array_equal(loaded.descriptors, descriptors))
+        self.assertTrue(np.array_equal(loaded.normals, normals))
+        self.assertIsInstance(loaded.feature(0), SHOTFeature)
+
+    def test_global_features(self):
+        descriptors = np.random.rand(NUM_POINTS, 16)
+        keys = ["object_%d" % (i) for i in range(NUM_POINTS)]
+        poses = [
+            (
+                RigidTransform(
+                    translation=np.random.rand(3),
+                    from_frame="obj",
+                    to_frame="cam",
+                )
+                if i % 2
+                else None
+            )
+            for i in range(NUM_POINTS)
+        ]
+        bag = BagOfFeatures(
+            [
+                MVCNNFeature(k, d, T)
+                for k, d, T in zip(keys, descriptors, poses)
+            ]
+        )
+        self.assertEqual(list(bag.keys), keys)
+        self.assertIs(bag.feature(1).pose, poses[1])
+        with self.assertRaises(ValueError):
+            bag.keypoints
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "features.npz")
+            bag.save(filename)
+            loaded = BagOfFeatures.load(filename)
+        self.assertEqual(list(loaded.keys), keys)
+        self.assertTrue(np.array_equal(loaded.descriptors, descriptors))
+        self.assertIsNone(loaded.feature(0).pose)
+        self.assertEqual(loaded.feature(1).pose, poses[1])
+        self.assertIsInstance(loaded.feature(1), MVCNNFeature)
+
+    def test_feature_index(self):
+        descriptors = np.random.rand(NUM_POINTS, 16)
+        keys = ["view_%d" % (i) for i in range(NUM_POINTS)]
+        poses = [
+            RigidTransform(translation=np.random.rand(3))
+            for _ in range(NUM_POINTS)
+        ]
+        bag = BagOfFeatures.from_arrays(descriptors, keys=keys, poses=poses)
+        queries = np.random.rand(10, 16)
+        all_dists = np.linalg.norm(
+            queries[:, None] - descriptors[None, :], axis=2
+        )
+        expected = np.argsort(all_dists, axis=1)[:, :5]
+
+        index = BruteForceFeatureIndex(bag, chunk_size=7)
+        dists, inds = index.search(queries, k=5)
+        self.assertTrue(np.array_equal(inds, expected))
+        self.assertTrue(np.allclose(dists, np.sort(all_dists, axis=1)[:, :5]))
+        dists, inds = index.search(queries[0], k=NUM_POINTS + 1)
+        self.assertEqual(inds[0, -1], -1)
+        self.assertEqual(dists[0, -1], np.inf)
+
+        # probing every list is exact
+        index = IVFFeatureIndex(bag, num_lists=8, seed=0)
+        index.num_probes = 8
+        _, inds = index.search(queries, k=5)
+        self.assertTrue(np.array_equal(inds, expected))
+        keys_out, poses_out, _ = index.retrieve(queries, k=5)
+        self.assertEqual(keys_out[0, 0], keys[expected[0, 0]])
+        self.assertIs(poses_out[0, 0], poses[expected[0, 0]])
+
+        index.num_probes = 2
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "index.npz")
+            index.save(filename)
+            loaded = IVFFeatureIndex.load(filename)
+        self.assertEqual(loaded.num_lists, 8)
+        self.assertEqual(loaded.num_probes, 2)
+        self.assertTrue(
+            np.array_equal(
+                loaded.search(queries, k=5)[1], index.search(queries, k=5)[1]
+            )
+        )
+        with self.assertRaises(ValueError):
+            index.search(np.zeros(3))
+        with self.assertRaises(ValueError):
+            IVFFeatureIndex(bag, num_lists=8, num_probes=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,6 +9,8 @@ import unittest
 
 from .constants import IM_HEIGHT, IM_WIDTH, BINARY_THRESH, COLOR_IM_FILEROOT
 from autolab_core import (
+    Box,
+    CameraIntrinsics,
     ColorImage,
     DepthImage,
     BinaryImage,
@@ -16,7 +18,14 @@ from autolab_core import (
     GrayscaleImage,
     PointCloudImage,
     NormalCloudImage,
+    RgbdImage,
+    ImageAccumulator,
+    PointCloud,
+    MultiCameraProjector,
+    RigidTransform,
+    ImageCoords,
 )
+from autolab_core.orthographic_intrinsics import OrthographicIntrinsics
 
 
 class TestImage(unittest.TestCase):
@@ -291,6 +300,545 @@ class TestImage(unittest.TestCase):
         im2 = im.mask_by_ind(ind)
         self.assertEqual(np.sum(im2[1, 1]), 0.0)
 
+    def test_crop(self, height=20, width=30):
+        color_data = (255.0 * np.random.rand(IM_HEIGHT, IM_WIDTH, 3)).astype(
+            np.uint8
+        )
+        depth_data = np.random.rand(IM_HEIGHT, IM_WIDTH).astype(np.float32)
+        color_im = ColorImage(color_data, encoding="bgr8")
+        depth_im = DepthImage(depth_data)
+        ci, cj = 40, 60
+
+        # views share data with the original image and are read-only
+        crop_im = color_im.crop(height, width, ci, cj)
+        view_im = color_im.crop(height, width, ci, cj, copy=False)
+        self.assertTrue(np.all(crop_im.data == view_im.data))
+        self.assertTrue(np.all(view_im.data == color_data[30:50, 45:75]))
+        self.assertEqual(view_im.encoding, "bgr8")
+        self.assertFalse(crop_im.is_view)
+        self.assertTrue(view_im.is_view)
+        self.assertTrue(np.shares_memory(view_im.data, color_im.data))
+        with self.assertRaises(ValueError):
+            view_im.data[0, 0] = 0
+        view_copy = view_im.copy()
+        self.assertFalse(view_copy.is_view)
+        view_copy.data[0, 0] = 0
+
+        # crops past the border are zero-padded
+        border_im = depth_im.crop(height, width, 0, 0, copy=False)
+        self.assertEqual(border_im.shape, (height, width, 1))
+        self.assertTrue(np.all(border_im.data[: height // 2] == 0))
+        self.assertTrue(
+            np.all(
+                border_im.data[height // 2 :, width // 2 :]
+                == depth_data[: height // 2, : width // 2]
+            )
+        )
+
+        # multi-channel images crop all channels
+        rgbd_im = RgbdImage.from_color_and_depth(
+            ColorImage(color_data), depth_im
+        )
+        rgbd_crop = rgbd_im.crop(height, width, ci, cj, copy=False)
+        self.assertTrue(
+            np.all(rgbd_crop.color.data == color_data[30:50, 45:75])
+        )
+        self.assertTrue(
+            np.all(rgbd_crop.depth.data == depth_data[30:50, 45:75])
+        )
+
+    def test_accumulator(self, num_images=40, buffer_size=8):
+        depth_data = np.random.rand(num_images, IM_HEIGHT, IM_WIDTH).astype(
+            np.float32
+        )
+        depth_data[depth_data < 0.1] = 0
+        depth_ims = [DepthImage(d) for d in depth_data]
+
+        # exact statistics for small numbers of images
+        median_im = DepthImage.median_images(depth_ims[:5])
+        self.assertTrue(
+            np.allclose(median_im.data, np.median(depth_data[:5], axis=0))
+        )
+        min_im = DepthImage.min_images(depth_ims)
+        nonzero_data = np.where(depth_data > 0, depth_data, np.inf)
+        self.assertTrue(np.allclose(min_im.data, np.min(nonzero_data, axis=0)))
+
+        # running statistics and approximate median
+        accumulator = ImageAccumulator(buffer_size=buffer_size)
+        for depth_im in depth_ims:
+            accumulator.add(depth_im)
+        self.assertEqual(accumulator.num_images, num_images)
+        self.assertTrue(isinstance(accumulator.result("mean"), DepthImage))
+        self.assertTrue(
+            np.allclose(
+                accumulator.result("mean").data, np.mean(depth_data, axis=0)
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                accumulator.result("max").data, np.max(depth_data, axis=0)
+            )
+        )
+        median_error = np.abs(
+            accumulator.result("median").data - np.median(depth_data, axis=0)
+        )
+        self.assertLess(np.mean(median_error), 0.1)
+
+    def test_foreground_mask(self, tolerance=10, scale=8):
+        background = np.array([40, 120, 200], dtype=np.uint8)
+        color_data = np.tile(background, [IM_HEIGHT, IM_WIDTH, 1])
+        color_data[30:50, 30:50] = (255.0 * np.random.rand(20, 20, 3)).astype(
+            np.uint8
+        )
+        color_data[:5, :5] = 0
+        im = ColorImage(color_data)
+
+        # compare against per-channel histograms
+        nonblack = np.any(color_data > 0, axis=2)
+        modes = [
+            scale
+            * np.argmax(
+                np.histogram(
+                    color_data[nonblack][:, i],
+                    bins=256 // scale,
+                    range=(0, 256),
+                )[0]
+            )
+            for i in range(3)
+        ]
+        bgmodel = im.background_model(scale=scale)
+        self.assertEqual(bgmodel, modes)
+
+        binary_im = im.foreground_mask(tolerance, scale=scale)
+        lower = np.array(modes) - tolerance
+        upper = np.array(modes) + tolerance
+        expected = (
+            np.any((color_data < lower) | (color_data > upper), axis=2)
+            & nonblack
+        )
+        self.assertTrue(np.all((binary_im.data > 0) == expected))
+
+        # batch masks match single masks
+        ims = [im, ColorImage(color_data[::-1].copy())]
+        binary_ims = ColorImage.foreground_mask_batch(
+            ims, tolerance, scale=scale
+        )
+        for single_im, batch_im in zip(ims, binary_ims):
+            self.assertTrue(
+                np.all(
+                    single_im.foreground_mask(tolerance, scale=scale).data
+                    == batch_im.data
+                )
+            )
+
+    def test_point_normal_cloud(self, stride=3):
+        camera_intr = CameraIntrinsics(
+            "camera",
+            fx=100.0,
+            fy=110.0,
+            cx=IM_WIDTH / 2.0,
+            cy=IM_HEIGHT / 2.0,
+            height=IM_HEIGHT,
+            width=IM_WIDTH,
+        )
+        rows, cols = np.mgrid[0:IM_HEIGHT, 0:IM_WIDTH]
+        depth_data = 1.0 + 0.1 * np.sin(cols / 10.0) + 0.05 * rows / IM_HEIGHT
+        depth_data[10:20, 30:40] = 0
+        depth_im = DepthImage(depth_data.astype(np.float32), "camera")
+
+        # compare to the image-based pipeline
+        point_cloud_im = camera_intr.deproject_to_image(depth_im)
+        point_data = point_cloud_im.raw_data
+        normal_data = point_cloud_im.normal_cloud_im().raw_data
+        point_normal_cloud = depth_im.point_normal_cloud(camera_intr)
+        self.assertTrue(
+            np.allclose(
+                point_normal_cloud.points.data, point_data.reshape(-1, 3).T
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                point_normal_cloud.normals.data, normal_data.reshape(-1, 3).T
+            )
+        )
+
+        # region of interest and stride
+        roi = Box(np.array([5, 20]), np.array([45, 70]))
+        region = (slice(5, 45, stride), slice(20, 70, stride))
+        point_normal_cloud = depth_im.point_normal_cloud(
+            camera_intr, roi=roi, stride=stride, dtype=np.float32
+        )
+        self.assertEqual(point_normal_cloud.points.data.dtype, np.float32)
+        self.assertTrue(
+            np.allclose(
+                point_normal_cloud.points.data,
+                point_data[region].reshape(-1, 3).T,
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                point_normal_cloud.normals.data,
+                normal_data[region].reshape(-1, 3).T,
+                atol=1e-4,
+            )
+        )
+
+    def test_deproject(self):
+        camera_intr = CameraIntrinsics(
+            "camera",
+            fx=100.0,
+            fy=110.0,
+            cx=IM_WIDTH / 2.0,
+            cy=IM_HEIGHT / 2.0,
+            skew=0.5,
+            height=IM_HEIGHT,
+            width=IM_WIDTH,
+        )
+        depth_data = np.random.uniform(0.5, 1.5, size=[IM_HEIGHT, IM_WIDTH])
+        depth_data[depth_data < 0.7] = 0
+        depth_im = DepthImage(depth_data.astype(np.float32), "camera")
+
+        # reference deprojection of homogeneous pixels
+        rows, cols = np.mgrid[0:IM_HEIGHT, 0:IM_WIDTH]
+        pixels = np.c_[cols.ravel(), rows.ravel(), np.ones(rows.size)].T
+        true_points = np.linalg.inv(camera_intr.K).dot(pixels)
+        true_points *= depth_im.data.ravel()
+
+        point_cloud = camera_intr.deproject(depth_im)
+        self.assertEqual(point_cloud.data.dtype, np.float64)
+        self.assertTrue(np.allclose(point_cloud.data, true_points))
+        point_cloud = camera_intr.deproject(depth_im, dtype=np.float32)
+        self.assertEqual(point_cloud.data.dtype, np.float32)
+        self.assertTrue(np.allclose(point_cloud.data, true_points, atol=1e-5))
+        point_cloud = camera_intr.deproject(depth_im, nonzero_only=True)
+        nonzero = depth_im.data.ravel() > 0
+        self.assertTrue(np.allclose(point_cloud.data, true_points[:, nonzero]))
+
+        # rays are cached, and new intrinsics get their own rays
+        rays = camera_intr.deprojection_rays()
+        self.assertIs(rays, camera_intr.deprojection_rays())
+        self.assertFalse(rays.flags.writeable)
+        cropped_intr = camera_intr.crop(20, 30, 25, 40)
+        cropped_rays = cropped_intr.deprojection_rays()
+        self.assertEqual(cropped_rays.shape, (3, 20, 30))
+        self.assertTrue(
+            np.allclose(
+                cropped_rays[:, 2, 3],
+                np.linalg.inv(cropped_intr.K).dot([3.0, 2.0, 1.0]),
+            )
+        )
+        camera_intr.cx = camera_intr.cx + 1
+        self.assertFalse(np.allclose(camera_intr.deprojection_rays(), rays))
+
+    def test_deproject_pixels(self, num_pixels=50):
+        camera_intr = CameraIntrinsics(
+            "camera",
+            fx=100.0,
+            fy=110.0,
+            cx=IM_WIDTH / 2.0,
+            cy=IM_HEIGHT / 2.0,
+            height=IM_HEIGHT,
+            width=IM_WIDTH,
+        )
+        rows, cols = np.mgrid[0:IM_HEIGHT, 0:IM_WIDTH]
+        depth_data = 1.0 + 0.01 * rows + 0.02 * cols
+        depth_im = DepthImage(depth_data, "camera")
+        point_cloud = camera_intr.deproject(depth_im)
+
+        # integer pixels match the dense deprojection
+        pixels = np.c_[
+            np.random.randint(0, IM_WIDTH, size=num_pixels),
+            np.random.randint(0, IM_HEIGHT, size=num_pixels),
+        ]
+        ind = pixels[:, 1] * IM_WIDTH + pixels[:, 0]
+        depths = depth_data[pixels[:, 1], pixels[:, 0]]
+        points = camera_intr.deproject_pixels(depths, pixels)
+        self.assertTrue(np.allclose(points.data, point_cloud.data[:, ind]))
+        image_coords = ImageCoords(pixels.T, "camera")
+        points = camera_intr.deproject_pixels(depth_im, image_coords)
+        self.assertTrue(np.allclose(points.data, point_cloud.data[:, ind]))
+
+        # bilinear sampling is exact for planar depth, and skips zeros
+        pixels = np.random.uniform(0, IM_HEIGHT - 1, size=[num_pixels, 2])
+        depths = depth_im.sample_depths(pixels)
+        self.assertTrue(
+            np.allclose(
+                depths, 1.0 + 0.01 * pixels[:, 0] + 0.02 * pixels[:, 1]
+            )
+        )
+        depth_data[::2] = 0
+        depth_im = DepthImage(depth_data, "camera")
+        depths = depth_im.sample_depths(pixels)
+        self.assertTrue(np.all(depths > 0))
+        self.assertTrue(
+            np.allclose(
+                depth_im.sample_depths([[-1, 0], [2.5, 3.0]]), [0, 1.09]
+            )
+        )
+
+        # orthographic pixels project back to themselves
+        ortho_intr = OrthographicIntrinsics(
+            "camera", 1.0, 1.0, 1.0, IM_HEIGHT, IM_WIDTH
+        )
+        pixels = np.random.randint(0, IM_HEIGHT, size=[num_pixels, 2])
+        points = ortho_intr.deproject_pixels(0.5, pixels)
+        self.assertTrue(np.all(ortho_intr.project(points).data == pixels.T))
+
+    def test_distortion(self):
+        import cv2
+
+        dist_coeffs = np.array([-0.2, 0.05, 0.001, -0.002, 0.01])
+        camera_intr = CameraIntrinsics(
+            "camera",
+            fx=100.0,
+            fy=110.0,
+            cx=IM_WIDTH / 2.0,
+            cy=IM_HEIGHT / 2.0,
+            height=IM_HEIGHT,
+            width=IM_WIDTH,
+            dist_coeffs=dist_coeffs,
+        )
+        self.assertTrue(camera_intr.is_distorted)
+
+        # projection matches opencv
+        point_data = np.random.uniform(-0.3, 0.3, size=[3, 100])
+        point_data[2] += 1.0
+        point_cloud = PointCloud(point_data, "camera")
+        pixels = camera_intr.project(point_cloud).data
+        true_pixels, _ = cv2.projectPoints(
+            point_data.T, np.zeros(3), np.zeros(3), camera_intr.K, dist_coeffs
+        )
+        self.assertTrue(
+            np.allclose(pixels, np.round(true_pixels[:, 0].T).astype(int))
+        )
+
+        # deprojection through the distorted rays inverts projection
+        rays = camera_intr.deprojection_rays()
+        depth_data = np.random.uniform(0.5, 1.5, size=[IM_HEIGHT, IM_WIDTH])
+        depth_im = DepthImage(depth_data, "camera")
+        point_cloud = camera_intr.deproject(depth_im)
+        self.assertTrue(
+            np.allclose(
+                point_cloud.data, rays.reshape(3, -1) * depth_data.ravel()
+            )
+        )
+        pixels = camera_intr._distort_pixels(
+            camera_intr.K.dot(rays.reshape(3, -1))[:2]
+        )
+        rows, cols = np.mgrid[0:IM_HEIGHT, 0:IM_WIDTH]
+        self.assertTrue(np.allclose(pixels, [cols.ravel(), rows.ravel()]))
+
+        # undistorted images agree with the pinhole model
+        undistorted_im = camera_intr.undistort(depth_im)
+        self.assertEqual(undistorted_im.shape, depth_im.shape)
+        map_x, map_y = camera_intr.undistort_maps()
+        center = (IM_HEIGHT // 2, IM_WIDTH // 2)
+        self.assertTrue(np.isclose(map_x[center], center[1]))
+        self.assertTrue(np.isclose(map_y[center], center[0]))
+        self.assertFalse(camera_intr.without_distortion().is_distorted)
+
+        # distortion survives save and load
+        filename = "tests/data/test_distortion.intr"
+        if not os.path.exists(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        camera_intr.save(filename)
+        loaded_intr = CameraIntrinsics.load(filename)
+        os.remove(filename)
+        os.rmdir(os.path.dirname(filename))
+        self.assertTrue(np.allclose(loaded_intr.dist_coeffs, dist_coeffs))
+        self.assertTrue(
+            np.allclose(
+                loaded_intr.crop(20, 30, 25, 40).dist_coeffs, dist_coeffs
+            )
+        )
+
+    def test_project_to_image(self):
+        camera_intr = CameraIntrinsics(
+            "camera",
+            fx=100.0,
+            cx=IM_WIDTH / 2.0,
+            cy=IM_HEIGHT / 2.0,
+            height=IM_HEIGHT,
+            width=IM_WIDTH,
+        )
+
+        # the nearest of several points on one pixel is kept
+        point_data = np.array(
+            [[0.0, 0.0, 2.0], [0.0, 0.0, 1.0], [0.0, 0.0, 3.0], [0, 0, -1.0]]
+        ).T
+        point_cloud = PointCloud(point_data, "camera")
+        depth_im, index_im = camera_intr.project_to_image(
+            point_cloud, dtype=np.float32, return_indices=True
+        )
+        center = (IM_HEIGHT // 2, IM_WIDTH // 2)
+        self.assertEqual(depth_im.data.dtype, np.float32)
+        self.assertEqual(depth_im[center], 1.0)
+        self.assertEqual(index_im[center], 1)
+        self.assertEqual(np.count_nonzero(depth_im.data), 1)
+        self.assertEqual(np.count_nonzero(index_im >= 0), 1)
+
+        # splats fill a square around each point
+        depth_im, index_im = camera_intr.project_to_image(
+            point_cloud, splat_radius=2, return_indices=True
+        )
+        self.assertEqual(np.count_nonzero(depth_im.data), 25)
+        self.assertTrue(np.all(index_im[index_im >= 0] == 1))
+
+        # random clouds match a brute force z-buffer
+        point_data = np.random.uniform(-0.5, 0.5, size=[3, 1000])
+        point_data[2] += 1.0
+        point_cloud = PointCloud(point_data, "camera")
+        depth_im, index_im = camera_intr.project_to_image(
+            point_cloud, return_indices=True
+        )
+        pixels = camera_intr.project(point_cloud).data
+        true_depth = np.zeros([IM_HEIGHT, IM_WIDTH])
+        for (j, i), z in zip(pixels.T, point_data[2]):
+            if 0 <= i < IM_HEIGHT and 0 <= j < IM_WIDTH:
+                if true_depth[i, j] == 0 or z < true_depth[i, j]:
+                    true_depth[i, j] = z
+        self.assertTrue(np.allclose(depth_im.data, true_depth))
+        filled = index_im >= 0
+        self.assertTrue(
+            np.allclose(point_data[2, index_im[filled]], true_depth[filled])
+        )
+
+        # orthographic projection
+        ortho_intr = OrthographicIntrinsics(
+            "camera", 1.0, 1.0, 1.0, IM_HEIGHT, IM_WIDTH
+        )
+        depth_im = ortho_intr.project_to_image(
+            PointCloud(
+                np.array([[0.0, 0.0, 0.1], [0.0, 0.0, -0.2]]).T, "camera"
+            )
+        )
+        self.assertEqual(depth_im.shape[:2], (IM_HEIGHT, IM_WIDTH))
+        self.assertTrue(np.isclose(depth_im[center], 0.3))
+
+    def test_multi_camera_projector(self, num_cameras=4):
+        camera_intrs = []
+        T_camera_world = []
+        for i in range(num_cameras):
+            frame = "camera_%d" % (i)
+            camera_intrs.append(
+                CameraIntrinsics(
+                    frame,
+                    fx=100.0 + i,
+                    cx=IM_WIDTH / 2.0,
+                    cy=IM_HEIGHT / 2.0,
+                    height=IM_HEIGHT,
+                    width=IM_WIDTH,
+                )
+            )
+            T_camera_world.append(
+                RigidTransform(
+                    RigidTransform.random_rotation(),
+                    RigidTransform.random_translation(),
+                    from_frame=frame,
+                    to_frame="world",
+                )
+            )
+        projector = MultiCameraProjector(camera_intrs, T_camera_world)
+        self.assertEqual(projector.P.shape, (num_cameras, 3, 4))
+
+        # compare with projecting into each camera separately
+        point_cloud = PointCloud(np.random.uniform(-1, 1, [3, 500]), "world")
+        image_coords = projector.project(point_cloud)
+        depth_ims, index_ims = projector.project_to_image(
+            point_cloud, return_indices=True
+        )
+        for i in range(num_cameras):
+            point_cloud_cam = T_camera_world[i].inverse() * point_cloud
+            true_coords = camera_intrs[i].project(point_cloud_cam)
+            true_depth_im, true_index_im = camera_intrs[i].project_to_image(
+                point_cloud_cam, return_indices=True
+            )
+            self.assertEqual(image_coords[i].frame, camera_intrs[i].frame)
+            self.assertTrue(np.all(image_coords[i].data == true_coords.data))
+            self.assertTrue(np.allclose(depth_ims[i].data, true_depth_im.data))
+            self.assertTrue(np.all(index_ims[i] == true_index_im))
+
+        # shared intrinsics
+        T_camera_world = [
+            RigidTransform(
+                T.rotation,
+                T.translation,
+                from_frame="camera",
+                to_frame="world",
+            )
+            for T in T_camera_world
+        ]
+        camera_intr = CameraIntrinsics(
+            "camera", fx=100.0, height=IM_HEIGHT, width=IM_WIDTH
+        )
+        projector = MultiCameraProjector(camera_intr, T_camera_world)
+        self.assertEqual(projector.num_cameras, num_cameras)
+        with self.assertRaises(ValueError):
+            MultiCameraProjector(camera_intrs, T_camera_world)
+
+    def test_closest_pixels(self, num_rays=50, w=7, t=0.5):
+        binary_data = np.zeros([IM_HEIGHT, IM_WIDTH], dtype=np.uint8)
+        binary_data[40:60, 45:55] = 255
+        binary_data[20:25, 70:80] = 255
+        im = BinaryImage(binary_data)
+
+        starts = np.c_[
+            np.random.uniform(w, IM_HEIGHT - w, size=num_rays),
+            np.random.uniform(w, IM_WIDTH - w, size=num_rays),
+        ]
+        angles = np.random.uniform(0, 2 * np.pi, size=num_rays)
+        directions = np.c_[np.cos(angles), np.sin(angles)]
+
+        # brute force reference, testing every step along each ray
+        nonzero_px = np.c_[np.where(binary_data > 0)]
+        radius = w / 2.0
+
+        def march(start, direction, stop_inside):
+            pixel = start.copy()
+            while True:
+                if (
+                    np.any(pixel < radius)
+                    or pixel[0] + radius > IM_HEIGHT - 1
+                    or pixel[1] + radius > IM_WIDTH - 1
+                ):
+                    return np.full(2, np.nan)
+                px = np.round(pixel)
+                dist = np.min(np.linalg.norm(nonzero_px - px, axis=1))
+                if (dist <= radius) == stop_inside:
+                    return pixel
+                pixel = pixel + t * direction
+
+        nonzero = im.closest_nonzero_pixels(starts, directions, w=w, t=t)
+        allzero = im.closest_allzero_pixels(starts, directions, w=w, t=t)
+        for k in range(num_rays):
+            self.assertTrue(
+                np.allclose(
+                    nonzero[k],
+                    march(starts[k], directions[k], True),
+                    equal_nan=True,
+                )
+            )
+            self.assertTrue(
+                np.allclose(
+                    allzero[k],
+                    march(starts[k], directions[k], False),
+                    equal_nan=True,
+                )
+            )
+
+        pixel_set = set(zip(*np.where(binary_data > 0)))
+        to_set = im.closest_pixels_to_set(starts, pixel_set, directions, w, t)
+        self.assertTrue(np.allclose(to_set, nonzero, equal_nan=True))
+
+        # rays with a zero direction only check their start pixel
+        starts = np.array([[50.0, 50.0], [IM_HEIGHT - w, w]])
+        nonzero = im.closest_nonzero_pixels(starts, np.zeros(2), w=w, t=t)
+        allzero = im.closest_allzero_pixels(starts, np.zeros(2), w=w, t=t)
+        self.assertTrue(np.array_equal(nonzero[0], starts[0]))
+        self.assertTrue(np.all(np.isnan(nonzero[1])))
+        self.assertTrue(np.all(np.isnan(allzero[0])))
+        self.assertTrue(np.array_equal(allzero[1], starts[1]))
+
     def test_indexing(self, height=50, width=100):
         color_data = (255 * np.random.rand(height, width, 3)).astype(np.uint8)
         im = ColorImage(color_data, "a")
@@ -31,7 +31,9 @@ from autolab_core import (
     ImageCoords,
     Point,
     PointCloud,
+    PointNormalCloud,
     RgbCloud,
+    RgbPointCloud,
 )
 
 
@@ -193,6 +195,41 @@ class PointsTest(unittest.TestCase):
         p_b_float = 2.5 / p_b
         assert np.allclose(p_b_float._data, 2.5 / p_b._data)
 
+    def test_voxel_downsample(self, num_points=1000):
+        data = np.random.rand(3, num_points)
+        normals = np.random.randn(3, num_points)
+        normals = normals / np.linalg.norm(normals, axis=0)
+        colors = np.random.randint(0, 256, (3, num_points)).astype(np.uint8)
+        p_a = PointCloud(data, "a")
+
+        p_down, voxel_inds = p_a.voxel_downsample(0.25)
+        assert p_down.num_points == 64
+        assert p_down.frame == "a"
+        assert voxel_inds.shape == (num_points,)
+        keys = np.floor(data / 0.25)
+        for i in range(p_down.num_points):
+            in_voxel = voxel_inds == i
+            assert np.all(keys[:, in_voxel] == keys[:, in_voxel][:, :1])
+            assert np.allclose(
+                p_down.data[:, i], np.mean(data[:, in_voxel], axis=1)
+            )
+
+        pn_down, _ = PointNormalCloud(data, normals, "a").voxel_downsample(
+            0.25
+        )
+        assert np.allclose(pn_down.points.data, p_down.data)
+        assert np.allclose(np.linalg.norm(pn_down.normals.data, axis=0), 1)
+
+        rgb_down, _ = RgbPointCloud(data, colors, "a").voxel_downsample(0.25)
+        assert rgb_down.rgb_cloud.data.dtype == np.uint8
+        assert np.allclose(
+            rgb_down.rgb_cloud.data[:, 0],
+            np.mean(colors[:, voxel_inds == 0], axis=1),
+            atol=0.5,
+        )
+
+        self.assertRaises(ValueError, p_a.voxel_downsample, 0)
+
 
 if __name__ == "__main__":
     unittest.main()
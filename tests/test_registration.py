@@ -13,6 +13,9 @@ from autolab_core import (
     NormalCloud,
     PointToPlaneICPSolver,
     PointToPlaneFeatureMatcher,
+    RawDistanceFeatureMatcher,
+    BagOfFeatures,
+    LocalFeature,
 )
 
 
@@ -57,6 +60,92 @@ class TestRegistration(unittest.TestCase):
         self.assertTrue(
             np.allclose(tf.matrix, result.T_source_target.matrix, atol=1e-3)
         )
+        self.assertEqual(result.num_iterations, NUM_ITERS)
+        self.assertEqual(len(result.iteration_costs), NUM_ITERS)
+        self.assertFalse(result.converged)
+        self.assertLess(result.iteration_costs[-1], result.iteration_costs[0])
+
+        # early termination
+        result = solver.register(
+            source_point_cloud,
+            target_point_cloud,
+            source_normal_cloud,
+            target_normal_cloud,
+            matcher,
+            num_iterations=NUM_ITERS,
+            pose_tol=1.0,
+        )
+        self.assertTrue(result.converged)
+        self.assertEqual(result.num_iterations, 1)
+
+        # coarse-to-fine registration
+        result = solver.register_pyramid(
+            source_point_cloud,
+            target_point_cloud,
+            source_normal_cloud,
+            target_normal_cloud,
+            voxel_sizes=[0.25, None],
+            dist_threshs=[0.5, 0.05],
+            pose_tol=1e-6,
+        )
+        self.assertTrue(
+            np.allclose(tf.matrix, result.T_source_target.matrix, atol=1e-3)
+        )
+        self.assertGreater(result.num_iterations, 1)
+        with self.assertRaises(ValueError):
+            solver.register_pyramid(
+                source_point_cloud,
+                target_point_cloud,
+                source_normal_cloud,
+                target_normal_cloud,
+                voxel_sizes=[0.1, 0.2],
+            )
+
+        # multi-start registration
+        T_far = RigidTransform(
+            rotation=RigidTransform.x_axis_rotation(np.pi),
+            from_frame="world",
+            to_frame="world",
+        )
+        results = solver.register_multistart(
+            source_point_cloud,
+            target_point_cloud,
+            source_normal_cloud,
+            target_normal_cloud,
+            matcher,
+            [T_far, RigidTransform(from_frame="world", to_frame="world")],
+            num_iterations=NUM_ITERS,
+            prune_ratio=None,
+            num_workers=2,
+        )
+        self.assertEqual(len(results), 2)
+        self.assertLessEqual(results[0].cost, results[1].cost)
+        self.assertTrue(
+            np.allclose(
+                tf.matrix, results[0].T_source_target.matrix, atol=1e-3
+            )
+        )
+        self.assertEqual(results[0].num_iterations, NUM_ITERS)
+
+        # the flipped hypothesis is dropped after the first iterations
+        results = solver.register_multistart(
+            source_point_cloud,
+            target_point_cloud,
+            source_normal_cloud,
+            target_normal_cloud,
+            matcher,
+            [T_far, RigidTransform(from_frame="world", to_frame="world")],
+            num_iterations=NUM_ITERS,
+            prune_iterations=5,
+            prune_ratio=2.0,
+            num_workers=2,
+        )
+        self.assertEqual(len(results), 1)
+        self.assertTrue(
+            np.allclose(
+                tf.matrix, results[0].T_source_target.matrix, atol=1e-3
+            )
+        )
 
         # 2d registration
         theta = 0.1 * np.random.rand()
@@ -86,6 +175,104 @@ class TestRegistration(unittest.TestCase):
             np.allclose(tf.matrix, result.T_source_target.matrix, atol=1e-3)
         )
 
+        # full-resolution registration
+        solver = PointToPlaneICPSolver(sample_size=None, cost_sample_size=None)
+        result = solver.register_2d(
+            source_point_cloud,
+            target_point_cloud,
+            source_normal_cloud,
+            target_normal_cloud,
+            matcher,
+            num_iterations=NUM_ITERS,
+        )
+        self.assertTrue(
+            np.allclose(tf.matrix, result.T_source_target.matrix, atol=1e-3)
+        )
+
+    def test_point_to_plane_matcher(self):
+        np.random.seed(102)
+        source_points = np.random.rand(NUM_POINTS, 3)
+        target_points = np.random.rand(NUM_POINTS, 3)
+        source_normals = np.random.randn(NUM_POINTS, 3)
+        source_normals /= np.linalg.norm(source_normals, axis=1)[:, None]
+        target_normals = np.random.randn(NUM_POINTS, 3)
+        target_normals /= np.linalg.norm(target_normals, axis=1)[:, None]
+
+        # dense reference
+        dists = np.linalg.norm(
+            source_points[:, None] - target_points[None, :], axis=2
+        )
+        ip = source_normals.dot(target_normals.T)
+        abs_diff = np.abs(
+            source_points.dot(target_normals.T)
+            - np.sum(target_points * target_normals, axis=1)
+        )
+        abs_diff[(dists > 0.2) | (ip < 0.5)] = np.inf
+        expected = np.argmin(abs_diff, axis=1)
+        expected[np.isinf(np.min(abs_diff, axis=1))] = -1
+
+        matcher = PointToPlaneFeatureMatcher(dist_thresh=0.2, norm_thresh=0.5)
+        for _ in range(2):
+            corrs = matcher.match(
+                source_points, target_points, source_normals, target_normals
+            )
+            self.assertTrue(np.array_equal(corrs.index_map, expected))
+        self.assertGreater(corrs.num_matches, 0)
+
+        matcher = PointToPlaneFeatureMatcher(
+            dist_thresh=0.2, norm_thresh=0.5, max_neighbors=NUM_POINTS
+        )
+        corrs = matcher.match(
+            source_points, target_points, source_normals, target_normals
+        )
+        self.assertTrue(np.array_equal(corrs.index_map, expected))
+
+    def test_raw_distance_matcher(self):
+        np.random.seed(103)
+        source_descriptors = np.random.rand(NUM_POINTS, 8)
+        perm = np.random.permutation(NUM_POINTS)
+        target_descriptors = source_descriptors[perm] + 1e-3
+        keypoints = np.random.rand(NUM_POINTS, 3)
+
+        # make one target ambiguous between two sources
+        target_descriptors[0] = (
+            source_descriptors[perm[0]] + source_descriptors[perm[1]]
+        ) / 2
+        source_features = BagOfFeatures(
+            [
+                LocalFeature(d, None, p, None)
+                for d, p in zip(source_descriptors, keypoints)
+            ]
+        )
+        target_features = BagOfFeatures(
+            [
+                LocalFeature(d, None, p, None)
+                for d, p in zip(target_descriptors, keypoints[perm])
+            ]
+        )
+
+        expected = np.argsort(perm)
+        for matcher in [
+            RawDistanceFeatureMatcher(),
+            RawDistanceFeatureMatcher(chunk_size=7),
+            RawDistanceFeatureMatcher(use_kdtree=True),
+        ]:
+            corrs = matcher.match(source_features, target_features)
+            valid = corrs.index_map != -1
+            self.assertGreater(corrs.num_matches, NUM_POINTS - 3)
+            self.assertTrue(
+                np.array_equal(corrs.index_map[valid], expected[valid])
+            )
+            self.assertTrue(
+                np.allclose(corrs.source_points, corrs.target_points)
+            )
+
+        # the ambiguous match fails the ratio test
+        matcher = RawDistanceFeatureMatcher(ratio=0.8)
+        corrs = matcher.match(source_features, target_features)
+        self.assertNotIn(0, corrs.index_map)
+        self.assertEqual(corrs.num_matches, NUM_POINTS - 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -24,11 +24,22 @@ MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 Test correct functionality of the rigid transform class
 Authors: Jeff Mahler
 """
-import numpy as np
+import os
+import pickle
+import tempfile
 import unittest
 
+import numpy as np
+
 from autolab_core import Point, PointCloud, Direction
-from autolab_core import RigidTransform, SimilarityTransform
+from autolab_core import (
+    DualQuaternion,
+    DualQuaternionArray,
+    FrameGraph,
+    RigidTransform,
+    RigidTransformArray,
+    SimilarityTransform,
+)
 
 
 class RigidTransformTest(unittest.TestCase):
@@ -284,6 +295,401 @@ class RigidTransformTest(unittest.TestCase):
             traj = T_a.linear_trajectory_to(T_b, i)
             self.assertEqual(len(traj), i, "Trajectory has incorrect length")
 
+        ts = np.r_[0.0, np.random.rand(10), 1.0]
+        T_b = T_b.as_frames("w", "a")
+        for method, interp in [
+            ("slerp", T_a.interpolate_with),
+            ("dq", lambda T, t: RigidTransform.interpolate(T_a, T, t)),
+        ]:
+            traj = RigidTransformArray.interpolate(T_a, T_b, ts, method)
+            self.assertEqual(traj.frames, T_a.frames)
+            self.assertTrue(
+                np.allclose(traj.matrices, [interp(T_b, t).matrix for t in ts])
+            )
+
+    def test_cached_representations(self):
+        T = RigidTransform(
+            RigidTransform.random_rotation(),
+            RigidTransform.random_translation(),
+            "a",
+            "b",
+        )
+        q = T.quaternion
+        self.assertTrue(np.allclose(T.quaternion, q))
+
+        # modifying returned values does not corrupt the cache
+        T.matrix[0, 3] = 100.0
+        self.assertFalse(np.allclose(T.matrix[0, 3], 100.0))
+
+        # setters and in-place edits both invalidate the cache
+        R = RigidTransform.random_rotation()
+        T.rotation = R
+        self.assertTrue(
+            np.allclose(T.quaternion, RigidTransform(R).quaternion)
+        )
+        T.translation[2] = 5.0
+        self.assertEqual(T.matrix[2, 3], 5.0)
+
+        T2 = pickle.loads(pickle.dumps(T))
+        self.assertEqual(T, T2)
+        self.assertEqual(hash(T), hash(T2))
+        self.assertTrue(np.allclose(T2.matrix, T.matrix))
+        with self.assertRaises(AttributeError):
+            T.foo = 1.0
+
+        # equality tolerates floating point round off
+        for _ in range(10):
+            T = RigidTransform(
+                RigidTransform.random_rotation(),
+                RigidTransform.random_translation(),
+                "a",
+                "b",
+            )
+            self.assertEqual(T, T.inverse().inverse())
+            self.assertEqual(hash(T), hash(T.inverse().inverse()))
+        T2 = T.copy()
+        T2.translation = T2.translation + 1.0
+        self.assertNotEqual(T, T2)
+        self.assertNotEqual(T, T.as_frames("a", "c"))
+        S = SimilarityTransform(T.rotation, T.translation, 2.0, "a", "b")
+        self.assertEqual(S, S.inverse().inverse())
+        self.assertNotEqual(
+            S, SimilarityTransform(T.rotation, T.translation, 3.0, "a", "b")
+        )
+        self.assertNotEqual(T, S)
+        self.assertNotEqual(S, T)
+
+    def test_archive(self, num_transforms=10):
+        transforms = {}
+        for i in range(num_transforms):
+            transforms["T_%d" % (i)] = RigidTransform(
+                RigidTransform.random_rotation(),
+                RigidTransform.random_translation(),
+                "a%d" % (i),
+                "world",
+            )
+        transforms["S"] = SimilarityTransform(
+            RigidTransform.random_rotation(),
+            RigidTransform.random_translation(),
+            scale=2.5,
+            from_frame="object",
+            to_frame="camera",
+        )
+
+        dirname = tempfile.mkdtemp()
+        for ext in [".npy", ".npz"]:
+            filename = os.path.join(dirname, "transforms" + ext)
+            RigidTransform.save_archive(transforms, filename)
+            loaded = RigidTransform.load_archive(filename)
+            self.assertEqual(list(loaded.keys()), list(transforms.keys()))
+            for name, T in transforms.items():
+                self.assertEqual(type(loaded[name]), type(T))
+                self.assertEqual(loaded[name].frames, T.frames)
+                self.assertTrue(np.array_equal(loaded[name].matrix, T.matrix))
+            os.remove(filename)
+
+        # bulk loading into a transform array
+        filename = os.path.join(dirname, "transforms.npy")
+        RigidTransform.save_archive(transforms, filename)
+        with self.assertRaises(ValueError):
+            RigidTransform.load_archive(filename, as_array=True)
+        # drop the similarity transform, which arrays cannot hold
+        same_frames = [T.as_frames("a", "world") for T in loaded.values()]
+        RigidTransform.save_archive(same_frames[:-1], filename)
+        T_arr = RigidTransform.load_archive(filename, as_array=True, mmap=True)
+        self.assertIsInstance(T_arr.rotations, np.memmap)
+        self.assertEqual(T_arr.frames, "from a to world")
+        self.assertTrue(
+            np.array_equal(T_arr.rotations[0], transforms["T_0"].rotation)
+        )
+        del T_arr
+        os.remove(filename)
+
+        # archives and transform arrays read each other's files
+        filename = os.path.join(dirname, "transforms.npz")
+        RigidTransform.save_archive(same_frames[:-1], filename)
+        T_arr = RigidTransformArray.load(filename)
+        self.assertEqual(T_arr.frames, "from a to world")
+        self.assertTrue(
+            np.array_equal(T_arr[1].matrix, transforms["T_1"].matrix)
+        )
+        T_arr.save(filename)
+        loaded = RigidTransform.load_archive(filename)
+        self.assertEqual(
+            list(loaded.keys()), ["%d" % (i) for i in range(num_transforms)]
+        )
+        self.assertEqual(loaded["1"].frames, "from a to world")
+        self.assertTrue(
+            np.array_equal(loaded["1"].matrix, transforms["T_1"].matrix)
+        )
+        RigidTransform.save_archive(transforms, filename)
+        with self.assertRaises(ValueError):
+            RigidTransformArray.load(filename)
+        os.remove(filename)
+        os.rmdir(dirname)
+
+        with self.assertRaises(ValueError):
+            RigidTransform.save_archive(transforms, "transforms.tf")
+
+    def test_transform_array(self, num_transforms=20, num_points=10):
+        transforms = [
+            RigidTransform(
+                RigidTransform.random_rotation(),
+                RigidTransform.random_translation(),
+                "a",
+                "b",
+            )
+            for _ in range(num_transforms)
+        ]
+        T_arr = RigidTransformArray.from_transforms(transforms)
+        self.assertEqual(len(T_arr), num_transforms)
+        self.assertEqual(T_arr[3].frames, transforms[3].frames)
+        self.assertTrue(np.allclose(T_arr[3].matrix, transforms[3].matrix))
+        self.assertEqual(len(T_arr[2:5]), 3)
+
+        # conversions
+        self.assertTrue(np.allclose(T_arr.vecs, [T.vec for T in transforms]))
+        self.assertTrue(
+            np.allclose(
+                T_arr.euler_angles, [T.euler_angles for T in transforms]
+            )
+        )
+        for T_arr2 in [
+            RigidTransformArray.from_vecs(T_arr.vecs, "a", "b"),
+            RigidTransformArray.from_matrices(T_arr.matrices, "a", "b"),
+            RigidTransformArray.from_euler_angles(
+                T_arr.euler_angles, T_arr.translations, "a", "b"
+            ),
+        ]:
+            self.assertTrue(np.allclose(T_arr2.matrices, T_arr.matrices))
+
+        # composition and inversion
+        T_c_a = RigidTransform(
+            RigidTransform.random_rotation(),
+            RigidTransform.random_translation(),
+            "c",
+            "a",
+        )
+        for T_composed, T_expected in [
+            (T_arr * T_c_a, [T * T_c_a for T in transforms]),
+            (T_arr.inverse() * T_arr, [T.inverse() * T for T in transforms]),
+            (T_arr.inverse(), [T.inverse() for T in transforms]),
+            (
+                T_c_a.inverse() * T_arr.inverse(),
+                [T_c_a.inverse() * T.inverse() for T in transforms],
+            ),
+        ]:
+            self.assertEqual(T_composed.frames, T_expected[0].frames)
+            self.assertTrue(
+                np.allclose(
+                    T_composed.matrices, [T.matrix for T in T_expected]
+                )
+            )
+        with self.assertRaises(ValueError):
+            T_arr * T_arr
+        with self.assertRaises(ValueError):
+            T_arr[:3] * T_arr.inverse()
+
+        # similarity transforms would lose their scale
+        S_b_d = SimilarityTransform(
+            RigidTransform.random_rotation(),
+            RigidTransform.random_translation(),
+            2.0,
+            "b",
+            "d",
+        )
+        with self.assertRaises(ValueError):
+            S_b_d * T_arr
+        with self.assertRaises(ValueError):
+            T_arr.inverse() * S_b_d.inverse()
+
+        # application
+        x_a = PointCloud(np.random.rand(3, num_points), "a")
+        x_b = T_arr * x_a
+        self.assertEqual(len(x_b), num_transforms)
+        for x, T in zip(x_b, transforms):
+            self.assertEqual(x.frame, "b")
+            self.assertTrue(np.allclose(x.data, (T * x_a).data))
+        p_b = T_arr * Point(x_a.data[:, 0], "a")
+        self.assertTrue(np.allclose(p_b.data.T, [x.data[:, 0] for x in x_b]))
+        v_b = T_arr * Direction(np.array([0.0, 0.0, 1.0]), "a")
+        self.assertTrue(
+            np.allclose(v_b.data.T, [T.rotation[:, 2] for T in transforms])
+        )
+
+        # invalid rotations
+        with self.assertRaises(ValueError):
+            RigidTransformArray(2 * T_arr.rotations, T_arr.translations)
+        with self.assertRaises(ValueError):
+            RigidTransformArray(T_arr.rotations, T_arr.translations[:3])
+
+        # saving
+        filename = os.path.join(tempfile.mkdtemp(), "transforms.npz")
+        T_arr.save(filename)
+        T_arr2 = RigidTransformArray.load(filename)
+        self.assertEqual(T_arr2.frames, T_arr.frames)
+        self.assertTrue(np.allclose(T_arr2.matrices, T_arr.matrices))
+        os.remove(filename)
+        os.rmdir(os.path.dirname(filename))
+
+    def test_dual_quaternion_array(self, num_transforms=10):
+        transforms = [
+            RigidTransform(
+                RigidTransform.random_rotation(),
+                RigidTransform.random_translation(),
+                "a",
+                "b",
+            )
+            for _ in range(num_transforms)
+        ]
+        T_arr = RigidTransformArray.from_transforms(transforms)
+        dqs = T_arr.dual_quaternions
+        self.assertEqual(len(dqs), num_transforms)
+        for i, T in enumerate(transforms):
+            self.assertTrue(np.allclose(dqs[i].qr, T.dual_quaternion.qr))
+            self.assertTrue(np.allclose(dqs[i].qd, T.dual_quaternion.qd))
+        self.assertTrue(
+            np.allclose(
+                dqs.norm[0], [T.dual_quaternion.norm[0] for T in transforms]
+            )
+        )
+        T_arr2 = RigidTransformArray.transforms_from_dual_quaternions(
+            dqs, "a", "b"
+        )
+        self.assertTrue(np.allclose(T_arr2.matrices, T_arr.matrices))
+
+        # blending two transforms matches interpolation of the aligned
+        # quaternions, whichever sign they are given with
+        qd = dqs.qd[:2]
+        qr = dqs.qr[:2].copy()
+        qr[1] *= np.sign(qr[0].dot(qr[1]))
+        dq_interp = DualQuaternion.interpolate(
+            DualQuaternion(qr[0], qd[0]), DualQuaternion(qr[1], qd[1]), 0.25
+        )
+        qr[1] *= -1.0
+        pair = DualQuaternionArray(qr, qd)
+        dq = pair.blend([0.75, 0.25])
+        self.assertTrue(
+            np.allclose(
+                RigidTransform.transform_from_dual_quaternion(dq).matrix,
+                RigidTransform.transform_from_dual_quaternion(
+                    dq_interp
+                ).matrix,
+            )
+        )
+        blends = pair.blend([[1.0, 0.0], [0.75, 0.25]])
+        self.assertTrue(np.allclose(blends.qr[1], dq.qr))
+        self.assertTrue(
+            np.allclose(T_arr[:1].mean().matrix, transforms[0].matrix)
+        )
+        self.assertTrue(
+            np.allclose(
+                T_arr.mean().translation,
+                np.mean([T.translation for T in transforms], axis=0),
+            )
+        )
+
+        # multiplication of pure rotations matches DualQuaternion
+        rotations = RigidTransformArray(T_arr.rotations).dual_quaternions
+        products = rotations * rotations[::-1]
+        for i in range(num_transforms):
+            product = rotations[i] * rotations[num_transforms - 1 - i]
+            self.assertTrue(np.allclose(products.qr[i], product.qr))
+        self.assertTrue(
+            np.allclose((rotations * rotations.conjugate).qr, [1, 0, 0, 0])
+        )
+
+    def test_frame_graph(self):
+        def random_tf(from_frame, to_frame):
+            return RigidTransform(
+                RigidTransform.random_rotation(),
+                RigidTransform.random_translation(),
+                from_frame,
+                to_frame,
+            )
+
+        T_camera_world = random_tf("camera", "world")
+        T_object_camera = random_tf("object", "camera")
+        T_world_tool = random_tf("world", "tool")
+        graph = FrameGraph()
+        graph.add_transform(T_camera_world)
+        graph.add_transform(T_object_camera)
+        graph.add_transform(T_world_tool.inverse())
+
+        T_object_tool = graph.lookup("object", "tool")
+        self.assertEqual(T_object_tool.frames, "from object to tool")
+        self.assertTrue(
+            np.allclose(
+                T_object_tool.matrix,
+                (T_world_tool * T_camera_world * T_object_camera).matrix,
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                graph.lookup("tool", "object").matrix,
+                T_object_tool.inverse().matrix,
+            )
+        )
+        # modifying an added transform leaves the stored edge untouched
+        T_camera_object = T_object_camera.inverse()
+        T_object_camera.translation = T_object_camera.translation + 1.0
+        self.assertTrue(
+            np.allclose(
+                graph.lookup("camera", "object").matrix,
+                T_camera_object.matrix,
+            )
+        )
+        T_object_camera.translation = T_object_camera.translation - 1.0
+
+        # modifying a looked up transform leaves the cached one untouched
+        T_object_tool = graph.lookup("object", "tool")
+        T_object_tool.translation = T_object_tool.translation + 1.0
+        self.assertTrue(
+            np.allclose(
+                graph.lookup("object", "tool").matrix,
+                (T_world_tool * T_camera_world * T_object_camera).matrix,
+            )
+        )
+        with self.assertRaises(ValueError):
+            graph.add_transform(random_tf("object", "tool"))
+        with self.assertRaises(ValueError):
+            graph.lookup("object", "table")
+
+        # updating an edge invalidates the cached lookups through it
+        T_camera_world = random_tf("camera", "world")
+        graph.add_transform(T_camera_world)
+        self.assertTrue(
+            np.allclose(
+                graph.lookup("object", "tool").matrix,
+                (T_world_tool * T_camera_world * T_object_camera).matrix,
+            )
+        )
+
+        # timestamped edges are interpolated
+        T0 = random_tf("object", "camera")
+        T1 = random_tf("object", "camera")
+        graph.add_transform(T0, stamp=1.0)
+        graph.add_transform(T1, stamp=3.0)
+        T_object_camera = RigidTransform.interpolate(T0, T1, 0.25)
+        self.assertTrue(
+            np.allclose(
+                graph.lookup("object", "world", stamp=1.5).matrix,
+                (T_camera_world * T_object_camera).matrix,
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                graph.lookup("object", "world").matrix,
+                (T_camera_world * T1).matrix,
+            )
+        )
+        with self.assertRaises(ValueError):
+            graph.lookup("object", "world", stamp=4.0)
+
+        graph.remove_transform("world", "camera")
+        self.assertFalse(graph.can_lookup("object", "tool"))
+        self.assertTrue(graph.can_lookup("world", "tool"))
+
 
 if __name__ == "__main__":
     unittest.main()
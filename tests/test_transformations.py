@@ -0,0 +1,123 @@
+"""
+Copyright ©2017. The Regents of the University of California (Regents).
+All Rights Reserved. Permission to use, copy, modify, and distribute this
+software and its documentation for educational, research, and not-for-profit
+purposes, without fee and without a signed licensing agreement, is hereby
+granted, provided that the above copyright notice, this paragraph and the
+following two paragraphs appear in all copies, modifications, and
+distributions. Contact The Office of Technology Licensing, UC Berkeley,
+2150 Shattuck Avenue, Suite 510, Berkeley, CA 94720-1620, (510) 643-7201,
+otl@berkeley.edu, http://ipira.berkeley.edu/industry-info for commercial
+licensing opportunities.
+
+IN NO EVENT SHALL REGENTS BE LIABLE TO ANY PARTY FOR DIRECT, INDIRECT,
+SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST PROFITS,
+ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+REGENTS HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+REGENTS SPECIFICALLY DISCLAIMS ANY WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+PURPOSE. THE SOFTWARE AND ACCOMPANYING DOCUMENTATION, IF ANY, PROVIDED
+HEREUNDER IS PROVIDED "AS IS". REGENTS HAS NO OBLIGATION TO PROVIDE
+MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+Test that the batched transformations match their scalar versions
+"""
+
+import numpy as np
+import unittest
+
+from autolab_core import transformations as tr
+
+
+class TransformationsTest(unittest.TestCase):
+    def setUp(self, num=100):
+        self.quaternions = np.array(
+            [tr.random_quaternion() for _ in range(num)]
+        )
+        self.quaternions[0] = [0, 0, 0, 1]
+        self.matrices = np.array(
+            [tr.quaternion_matrix(q) for q in self.quaternions]
+        )
+        self.angles = np.random.uniform(-np.pi, np.pi, size=(num, 3))
+        # gimbal lock
+        self.angles[1, 1] = np.pi / 2
+
+    def test_quaternion_matrix(self):
+        self.assertTrue(
+            np.allclose(
+                tr.quaternion_matrix_batch(self.quaternions), self.matrices
+            )
+        )
+        q = np.array([tr.quaternion_from_matrix(M) for M in self.matrices])
+        self.assertTrue(
+            np.array_equal(tr.quaternion_from_matrix_batch(self.matrices), q)
+        )
+        self.assertTrue(
+            np.array_equal(
+                tr.quaternion_from_matrix_batch(self.matrices[:, :3, :3]), q
+            )
+        )
+
+    def test_euler(self):
+        for axes in tr._AXES2TUPLE.keys():
+            ai, aj, ak = self.angles.T
+            M = [tr.euler_matrix(*a, axes=axes) for a in self.angles]
+            self.assertTrue(
+                np.allclose(tr.euler_matrix_batch(ai, aj, ak, axes), M)
+            )
+            q = [tr.quaternion_from_euler(*a, axes=axes) for a in self.angles]
+            self.assertTrue(
+                np.allclose(
+                    tr.quaternion_from_euler_batch(ai, aj, ak, axes), q
+                )
+            )
+            e = [tr.euler_from_matrix(M, axes) for M in self.matrices]
+            self.assertTrue(
+                np.allclose(tr.euler_from_matrix_batch(self.matrices, axes), e)
+            )
+            e = [tr.euler_from_quaternion(q, axes) for q in self.quaternions]
+            self.assertTrue(
+                np.allclose(
+                    tr.euler_from_quaternion_batch(self.quaternions, axes), e
+                )
+            )
+
+    def test_quaternion_algebra(self):
+        q0 = self.quaternions
+        q1 = np.roll(self.quaternions, 1, axis=0)
+        self.assertTrue(
+            np.allclose(
+                tr.quaternion_multiply_batch(q1, q0),
+                [tr.quaternion_multiply(a, b) for a, b in zip(q1, q0)],
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                tr.quaternion_conjugate_batch(q0),
+                [tr.quaternion_conjugate(q) for q in q0],
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                tr.quaternion_inverse_batch(2 * q0),
+                [tr.quaternion_inverse(2 * q) for q in q0],
+            )
+        )
+
+        fractions = np.random.rand(q0.shape[0])
+        fractions[:2] = [0.0, 1.0]
+        q1[2] = -q0[2]
+        self.assertTrue(
+            np.allclose(
+                tr.quaternion_slerp_batch(q0, q1, fractions),
+                [
+                    tr.quaternion_slerp(a, b, t)
+                    for a, b, t in zip(q0, q1, fractions)
+                ],
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
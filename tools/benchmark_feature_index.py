@@ -0,0 +1,163 @@
+"""
+Copyright ©2017. The Regents of the University of California (Regents).
+All Rights Reserved. Permission to use, copy, modify, and distribute this
+software and its documentation for educational, research, and not-for-profit
+purposes, without fee and without a signed licensing agreement, is hereby
+granted, provided that the above copyright notice, this paragraph and the
+following two paragraphs appear in all copies, modifications, and
+distributions. Contact The Office of Technology Licensing, UC Berkeley,
+2150 Shattuck Avenue, Suite 510, Berkeley, CA 94720-1620, (510) 643-7201,
+otl@berkeley.edu, http://ipira.berkeley.edu/industry-info for commercial
+licensing opportunities.
+
+IN NO EVENT SHALL REGENTS BE LIABLE TO ANY PARTY FOR DIRECT, INDIRECT,
+SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST PROFITS,
+ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+REGENTS HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+REGENTS SPECIFICALLY DISCLAIMS ANY WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+PURPOSE. THE SOFTWARE AND ACCOMPANYING DOCUMENTATION, IF ANY, PROVIDED
+HEREUNDER IS PROVIDED "AS IS". REGENTS HAS NO OBLIGATION TO PROVIDE
+MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+Benchmarks the recall and latency of the feature indexes.
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from autolab_core import (
+    BagOfFeatures,
+    BruteForceFeatureIndex,
+    IVFFeatureIndex,
+)
+
+
+def clustered_descriptors(num_descriptors, dim, num_clusters, rng):
+    """Samples descriptors from a mixture of gaussians, which resembles
+    real descriptors more closely than uniform noise."""
+    centers = rng.standard_normal([num_clusters, dim])
+    labels = rng.integers(num_clusters, size=num_descriptors)
+    return centers[labels] + rng.standard_normal([num_descriptors, dim])
+
+
+def timed_search(index, queries, k):
+    """Returns the neighbor indices of the queries and the milliseconds
+    spent per query."""
+    start = time.time()
+    _, inds = index.search(queries, k=k)
+    return inds, 1000.0 * (time.time() - start) / queries.shape[0]
+
+
+def recall(inds, true_inds):
+    """Returns the fraction of the true neighbors that were found."""
+    found = [
+        np.intersect1d(row, true_row).shape[0]
+        for row, true_row in zip(inds, true_inds)
+    ]
+    return float(np.sum(found)) / true_inds.size
+
+
+if __name__ == "__main__":
+    # initialize logging
+    logging.getLogger().setLevel(logging.INFO)
+
+    # parse args
+    parser = argparse.ArgumentParser(
+        description="Benchmarks recall@k and query latency of the feature "
+        "indexes for several numbers of probes"
+    )
+    parser.add_argument(
+        "--features",
+        type=str,
+        default=None,
+        help="bag of features to index. Random clustered descriptors are "
+        "used if not given",
+    )
+    parser.add_argument(
+        "--num_features",
+        type=int,
+        default=100000,
+        help="number of random descriptors to index",
+    )
+    parser.add_argument(
+        "--dim", type=int, default=64, help="dimension of random descriptors"
+    )
+    parser.add_argument(
+        "--num_clusters",
+        type=int,
+        default=1000,
+        help="number of clusters of the random descriptors",
+    )
+    parser.add_argument(
+        "--num_queries",
+        type=int,
+        default=1000,
+        help="number of held out descriptors to query with",
+    )
+    parser.add_argument(
+        "--k", type=int, default=10, help="number of neighbors per query"
+    )
+    parser.add_argument(
+        "--num_lists",
+        type=int,
+        default=None,
+        help="number of lists of the IVF index",
+    )
+    parser.add_argument(
+        "--num_probes",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16, 32],
+        help="numbers of probes to benchmark",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    # hold out the queries from the indexed descriptors
+    if args.features is not None:
+        descriptors = BagOfFeatures.load(args.features).descriptors
+    else:
+        descriptors = clustered_descriptors(
+            args.num_features + args.num_queries,
+            args.dim,
+            args.num_clusters,
+            rng,
+        )
+    descriptors = descriptors[rng.permutation(descriptors.shape[0])]
+    queries = descriptors[: args.num_queries]
+    bag = BagOfFeatures.from_arrays(descriptors[args.num_queries :])
+    logging.info(
+        "Indexing %d descriptors of dimension %d"
+        % (bag.num_features, descriptors.shape[1])
+    )
+
+    # exact neighbors
+    start = time.time()
+    brute_index = BruteForceFeatureIndex(bag)
+    logging.info("Built brute force index in %.3f sec" % (time.time() - start))
+    true_inds, brute_ms = timed_search(brute_index, queries, args.k)
+
+    start = time.time()
+    ivf_index = IVFFeatureIndex(bag, num_lists=args.num_lists, seed=args.seed)
+    logging.info(
+        "Built IVF index with %d lists in %.3f sec"
+        % (ivf_index.num_lists, time.time() - start)
+    )
+
+    print(
+        "%-12s %10s %10s %12s"
+        % ("index", "probes", "recall@%d" % args.k, "ms/query")
+    )
+    print("%-12s %10s %10.3f %12.3f" % ("brute", "-", 1.0, brute_ms))
+    for num_probes in args.num_probes:
+        ivf_index.num_probes = num_probes
+        inds, ivf_ms = timed_search(ivf_index, queries, args.k)
+        print(
+            "%-12s %10d %10.3f %12.3f"
+            % ("ivf", num_probes, recall(inds, true_inds), ivf_ms)
+        )